@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Adaptive design-space sweep for Thoth PCB/cache parameters
+
+Starts from a coarse grid over the chosen dimensions, then repeatedly
+bisects the grid edges across which the target metric changes most,
+until no edge changes by more than --min-change of the metric's observed
+range or the --budget of simulations is spent. Knees and cliffs along each
+one-dimensional slice are reported at the end.
+
+Every run goes through ExperimentRunner (batched gem5 launches, results
+store), stored under the experiment id adaptive_<metric>.
+
+Usage:
+    ./adaptive_sweep.py --dims burst_size pcb_capacity --metric overflowRate
+    ./adaptive_sweep.py --dims num_sets --metric writeAmplification --budget 30
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+
+from run_experiments import ExperimentRunner
+
+# name: (config key, low, high, unit suffix, baseline)
+# Integer ranges are sampled geometrically; the suffix turns a value into
+# the config's parameter string (e.g. 500 -> '500us').
+DIMENSIONS = {
+    "burst_size": ("burst_size", 10, 1000, "", 100),
+    "burst_interval": ("burst_interval", 100, 10000, "us", 1000),
+    "request_latency": ("request_latency", 1, 100, "us", 4),
+    "pcb_capacity": ("metadata_cache.pcb_capacity", 16, 4096, "", 256),
+    "num_sets": ("metadata_cache.num_sets", 256, 16384, "", 4096),
+    "num_ways": ("metadata_cache.num_ways", 1, 16, "", 4),
+}
+
+METRICS = ("overflowRate", "writeAmplification", "coalescingEfficiency",
+           "plubOverhead")
+
+
+def geometric_points(low, high, count):
+    if count <= 1:
+        return [low]
+    ratio = (high / low) ** (1.0 / (count - 1))
+    points = sorted({int(round(low * ratio ** i)) for i in range(count)})
+    return points
+
+
+class AdaptiveSweep:
+    def __init__(self, runner, dims, metric, budget, min_change, coarse):
+        self.runner = runner
+        self.dims = dims
+        self.metric = metric
+        self.budget = budget
+        self.min_change = min_change
+        self.coarse = coarse
+        self.exp_id = f"adaptive_{metric}"
+        self.values = {}    # point tuple -> metric value (None if failed)
+        self.runs = 0
+        self.round = 0
+
+    def point_params(self, point, name):
+        params = {"name": name}
+        for dim in DIMENSIONS:
+            key, _, _, suffix, baseline = DIMENSIONS[dim]
+            value = point[self.dims.index(dim)] if dim in self.dims else baseline
+            params[key] = f"{value}{suffix}" if suffix else value
+        return params
+
+    def evaluate(self, points):
+        """Simulate points (one batched launch) and record the metric"""
+        points = [p for p in points if p not in self.values]
+        points = points[:self.budget - self.runs]
+        if not points:
+            return 0
+
+        names = {}
+        variations = []
+        for point in points:
+            name = f"p{self.runs + len(variations):04d}"
+            names[name] = point
+            variations.append(self.point_params(point, name))
+
+        results = self.runner.run_experiment_set(self.exp_id, {
+            "name": f"Adaptive sweep round {self.round}",
+            "description": f"{len(points)} points refining {self.metric}",
+            "variations": variations,
+        })
+        self.round += 1
+        self.runs += len(points)
+
+        for point in points:
+            self.values[point] = None
+        for result in results:
+            self.values[names[result["name"]]] = result.get(self.metric, 0.0)
+        return len(points)
+
+    def lines(self):
+        """1-D slices: (dim index, other coords) -> sorted evaluated points"""
+        lines = {}
+        for point, value in self.values.items():
+            if value is None:
+                continue
+            for d in range(len(self.dims)):
+                others = point[:d] + point[d + 1:]
+                lines.setdefault((d, others), []).append(point)
+        for pts in lines.values():
+            pts.sort()
+        return lines
+
+    def metric_range(self):
+        valid = [v for v in self.values.values() if v is not None]
+        return (max(valid) - min(valid)) if valid else 0.0
+
+    def edges(self):
+        """Adjacent point pairs along each slice, largest change first"""
+        scale = self.metric_range() or 1.0
+        edges = []
+        for (d, _), pts in self.lines().items():
+            for a, b in zip(pts, pts[1:]):
+                change = abs(self.values[b] - self.values[a]) / scale
+                edges.append((change, d, a, b))
+        edges.sort(key=lambda e: (-e[0], -(e[3][e[1]] / e[2][e[1]])))
+        return edges
+
+    def midpoint(self, d, a, b):
+        mid = int(round(math.sqrt(a[d] * b[d])))
+        if mid <= a[d] or mid >= b[d]:
+            return None     # Resolution exhausted on this edge
+        return a[:d] + (mid,) + a[d + 1:]
+
+    def run(self):
+        axes = []
+        for dim in self.dims:
+            _, low, high, _, _ = DIMENSIONS[dim]
+            axes.append(geometric_points(low, high, self.coarse))
+        grid = list(itertools.product(*axes))
+        print(f"🧭 Coarse grid: {len(grid)} points over {', '.join(self.dims)}")
+        self.evaluate(grid)
+
+        batch = max(1, self.runner.jobs)
+        while self.runs < self.budget:
+            refine = []
+            for change, d, a, b in self.edges():
+                if change < self.min_change:
+                    break
+                mid = self.midpoint(d, a, b)
+                if mid is not None and mid not in self.values and mid not in refine:
+                    refine.append(mid)
+                if len(refine) >= batch:
+                    break
+            if not refine:
+                print("✅ No edge left above the change threshold")
+                break
+            print(f"🔍 Refining {len(refine)} edges (runs so far: {self.runs})")
+            self.evaluate(refine)
+
+        return self.report()
+
+    def report(self):
+        """Knees (largest slope change) and cliffs (sharp, unresolved jumps)"""
+        scale = self.metric_range() or 1.0
+        knees, cliffs = [], []
+
+        for (d, others), pts in self.lines().items():
+            fixed = {dim: others[i if i < d else i - 1]
+                     for i, dim in enumerate(self.dims) if i != d}
+            xs = [math.log(p[d]) for p in pts]
+            ys = [self.values[p] for p in pts]
+
+            for i in range(len(pts) - 1):
+                change = abs(ys[i + 1] - ys[i]) / scale
+                if change >= self.min_change and \
+                   self.midpoint(d, pts[i], pts[i + 1]) is None:
+                    cliffs.append({"dim": self.dims[d], "fixed": fixed,
+                                   "between": [pts[i][d], pts[i + 1][d]],
+                                   "values": [ys[i], ys[i + 1]]})
+
+            best = None
+            for i in range(1, len(pts) - 1):
+                left = (ys[i] - ys[i - 1]) / (xs[i] - xs[i - 1])
+                right = (ys[i + 1] - ys[i]) / (xs[i + 1] - xs[i])
+                bend = abs(right - left)
+                if best is None or bend > best[0]:
+                    best = (bend, i)
+            if best and best[0] > 0:
+                i = best[1]
+                knees.append({"dim": self.dims[d], "fixed": fixed,
+                              "at": pts[i][d], "value": ys[i],
+                              "slope_change": best[0]})
+
+        distinct = [len({p[d] for p in self.values}) for d in range(len(self.dims))]
+        factorial = math.prod(distinct)
+        report = {
+            "metric": self.metric,
+            "dims": self.dims,
+            "runs": self.runs,
+            "equivalent_factorial_runs": factorial,
+            "points": [dict(zip(self.dims, p), **{self.metric: v})
+                       for p, v in sorted(self.values.items())],
+            "knees": sorted(knees, key=lambda k: -k["slope_change"]),
+            "cliffs": cliffs,
+        }
+
+        report_file = self.runner.results_dir / f"{self.exp_id}_report.json"
+        with open(report_file, "w") as f:
+            json.dump(report, f, indent=2)
+
+        print("\n" + "=" * 70)
+        print(f"📈 Adaptive sweep of {self.metric}: {self.runs} runs "
+              f"(full grid at this resolution: {factorial})")
+        for knee in report["knees"][:5]:
+            print(f"   Knee  {knee['dim']}={knee['at']} "
+                  f"({self.metric}={knee['value']:.3f}) with {knee['fixed']}")
+        for cliff in cliffs[:5]:
+            print(f"   Cliff {cliff['dim']} in {cliff['between']}: "
+                  f"{cliff['values'][0]:.3f} → {cliff['values'][1]:.3f} with {cliff['fixed']}")
+        print(f"   Report: {report_file}")
+        print("=" * 70)
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Adaptive Thoth design-space sweep")
+    parser.add_argument("--dims", nargs="+", default=["burst_size", "pcb_capacity"],
+                        choices=sorted(DIMENSIONS), help="Dimensions to explore")
+    parser.add_argument("--metric", default="overflowRate", choices=METRICS,
+                        help="Metric whose sharp changes drive refinement")
+    parser.add_argument("--budget", type=int, default=60,
+                        help="Total simulations allowed")
+    parser.add_argument("--coarse", type=int, default=3,
+                        help="Coarse grid points per dimension")
+    parser.add_argument("--min-change", type=float, default=0.1,
+                        help="Refine edges whose change exceeds this fraction of the metric's range")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Concurrent simulations (also points refined per round)")
+    args = parser.parse_args()
+
+    runner = ExperimentRunner(jobs=args.jobs)
+    if not os.path.exists(runner.gem5_binary):
+        print(f"❌ Error: gem5 binary not found at {runner.gem5_binary}")
+        return
+
+    sweep = AdaptiveSweep(runner, args.dims, args.metric, args.budget,
+                          args.min_change, args.coarse)
+    sweep.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,457 @@
+"""
+Shared building blocks for the Thoth example configs.
+
+Import from a config in configs/example with:
+
+    from m5.util import addToPath
+    addToPath('../')
+    from common import ThothConfig
+"""
+
+import json
+import math
+import os
+import re
+import sys
+import time
+
+import m5
+
+from m5.objects import *
+from m5.util import convert
+
+from common.ThothMetrics import rusage_metrics, t_critical_95
+
+NVMAIN_CONFIG = 'ext/NVMain/Config/PCM_ISSCC_2012_4GB.config'
+
+
+def build_nvm_channels(system, cache, nvm_range, num_channels=1,
+                       intlv_size='256B', nvmain_config=NVMAIN_CONFIG):
+    """Attach num_channels NVMainControl channels behind cache.nvmain_port
+
+    A single channel connects directly as system.nvmain. Several channels
+    split nvm_range by address interleaving at intlv_size granularity and
+    sit behind system.nvm_xbar as system.nvmain0..N-1, each with its own
+    bandwidth and queueing stats. The cache keeps one write in flight per
+    channel, and costs crash recovery with the channels' latencies.
+    """
+    if num_channels == 1:
+        system.nvmain = NVMainControl(nvmain_config=nvmain_config,
+                                      range=nvm_range)
+        cache.nvmain_port = system.nvmain.port
+        cache.nvm_channels = [system.nvmain]
+        return [system.nvmain]
+
+    if num_channels & (num_channels - 1):
+        raise ValueError(f"NVM channel count must be a power of two, "
+                         f"got {num_channels}")
+
+    intlv_bytes = int(convert.toMemorySize(str(intlv_size)))
+    if intlv_bytes < 64 or intlv_bytes & (intlv_bytes - 1):
+        raise ValueError(f"NVM interleave must be a power of two >= 64B, "
+                         f"got {intlv_size}")
+
+    intlv_low_bit = int(math.log2(intlv_bytes))
+    intlv_bits = int(math.log2(num_channels))
+
+    channels = [
+        NVMainControl(
+            nvmain_config=nvmain_config,
+            range=AddrRange(nvm_range.start, size=nvm_range.size(),
+                            intlvHighBit=intlv_low_bit + intlv_bits - 1,
+                            xorHighBit=0,
+                            intlvBits=intlv_bits,
+                            intlvMatch=i))
+        for i in range(num_channels)
+    ]
+
+    system.nvm_xbar = NoncoherentXBar(width=64, frontend_latency=1,
+                                      forward_latency=1,
+                                      response_latency=1)
+    system.nvmain = channels
+    cache.nvmain_port = system.nvm_xbar.cpu_side_ports
+    for channel in channels:
+        channel.port = system.nvm_xbar.mem_side_ports
+    cache.max_outstanding_writes = num_channels
+    cache.nvm_channels = channels
+
+    return channels
+
+
+def add_param_options(parser):
+    """Add --set and --params-json to a config's argparse parser
+
+    Both address knobs as OBJ.PARAM, where OBJ is a role in the config
+    (e.g. traffic_gen, metadata_cache) and PARAM any parameter of that
+    SimObject, or of the config's own "run" options.
+    """
+    parser.add_argument('--set', dest='param_sets', action='append',
+                        default=[], metavar='OBJ.PARAM=VALUE',
+                        help="Override one parameter (repeatable)")
+    parser.add_argument('--params-json', metavar='FILE_OR_JSON',
+                        help='Overrides as {"OBJ": {"PARAM": value}}, '
+                             'inline or in a file; --set wins on conflict')
+
+
+def load_overrides(args):
+    """Merge --params-json and --set into {obj: {param: value}}"""
+    overrides = {}
+
+    if args.params_json:
+        text = args.params_json
+        if os.path.exists(text):
+            with open(text) as f:
+                text = f.read()
+        data = json.loads(text)
+        if not isinstance(data, dict) or \
+           not all(isinstance(v, dict) for v in data.values()):
+            raise ValueError('--params-json must map object names to '
+                             '{"param": value} dicts')
+        for obj, params in data.items():
+            overrides.setdefault(obj, {}).update(params)
+
+    for item in args.param_sets:
+        key, sep, value = item.partition('=')
+        obj, dot, param = key.partition('.')
+        if not sep or not dot or not obj or not param:
+            raise ValueError(f"--set expects OBJ.PARAM=VALUE, got {item!r}")
+        overrides.setdefault(obj, {})[param] = value
+
+    return overrides
+
+
+def take_run_options(overrides, defaults, name='run'):
+    """Pop the config's own (non-SimObject) knobs from overrides
+
+    Values are converted to the type of their default, so --set strings
+    and JSON values behave the same. Unknown keys are an error.
+    """
+    given = overrides.pop(name, {})
+    unknown = sorted(set(given) - set(defaults))
+    if unknown:
+        raise ValueError(f"Unknown {name} option(s) {', '.join(unknown)}; "
+                         f"valid: {', '.join(sorted(defaults))}")
+
+    options = dict(defaults)
+    for key, value in given.items():
+        kind = type(defaults[key])
+        if kind is bool and isinstance(value, str):
+            value = convert.toBool(value)
+        options[key] = kind(value)
+    return options
+
+
+def apply_params(overrides, name, objects):
+    """Set overrides[name] on every SimObject in objects
+
+    Parameter names are checked against the SimObject's declared params,
+    so a typo fails the run instead of being silently ignored. gem5's own
+    parameter conversion handles strings such as '1ms' or '64B'.
+    """
+    given = overrides.pop(name, {})
+    if not isinstance(objects, (list, tuple)):
+        objects = [objects]
+
+    for obj in objects:
+        declared = type(obj)._params
+        for param, value in given.items():
+            if param not in declared:
+                raise ValueError(
+                    f"{type(obj).__name__} ({name}) has no parameter "
+                    f"{param!r}; valid: {', '.join(sorted(declared))}")
+            setattr(obj, param, value)
+
+
+def check_overrides_used(overrides, roles):
+    """Fail on overrides addressed to objects the config doesn't have"""
+    if overrides:
+        raise ValueError(f"Unknown object(s) {', '.join(sorted(overrides))}"
+                         f"; valid: {', '.join(sorted(roles))}")
+
+
+def add_batch_options(parser):
+    """Add --batch/--jobs for running several variations per gem5 process"""
+    parser.add_argument('--batch', metavar='FILE',
+                        help='JSON list of variations, each {"name": ..., '
+                             '"OBJ": {"PARAM": value}}, run one after '
+                             'another from this process')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Variations simulated concurrently in --batch')
+
+
+def _merge_overrides(base, extra):
+    merged = {obj: dict(params) for obj, params in base.items()}
+    for obj, params in extra.items():
+        merged.setdefault(obj, {}).update(params)
+    return merged
+
+
+def fork_batch(batch_file, base_overrides, jobs=1):
+    """Run each variation of batch_file in a forked child process
+
+    The parent has already paid for interpreter startup and importing
+    m5.objects; each child inherits that and only builds, instantiates
+    and simulates its own system. Parameters are fixed when SimObjects
+    are constructed, so the fork happens before instantiate rather than
+    from one shared instantiated system.
+
+    In a child this returns the variation's overrides (base_overrides
+    merged with the variation) with gem5's output directory moved to
+    <outdir>/<name>, and the config carries on as a normal single run.
+    The parent never returns: it waits for every child, appending each
+    one's result to <outdir>/batch_results.jsonl as it finishes (so a
+    runner can record completed variations while others still run),
+    writes <outdir>/batch_results.json and exits non-zero if any child
+    failed.
+    """
+    with open(batch_file) as f:
+        variations = json.load(f)
+    if not isinstance(variations, list) or \
+       not all(isinstance(v, dict) for v in variations):
+        raise ValueError(f"{batch_file}: expected a JSON list of objects")
+
+    names = []
+    for i, variation in enumerate(variations):
+        name = str(variation.get('name', f'var{i}'))
+        if not re.match(r'^[A-Za-z0-9_.-]+$', name) or name in names:
+            raise ValueError(f"{batch_file}: variation name {name!r} is "
+                             f"not a unique file-name-safe string")
+        names.append(name)
+
+    parent_outdir = m5.options.outdir
+    stream_file = os.path.join(parent_outdir, 'batch_results.jsonl')
+    open(stream_file, 'w').close()
+    pending = list(zip(names, variations))
+    running = {}
+    results = []
+    jobs = max(1, jobs)
+
+    while pending or running:
+        while pending and len(running) < jobs:
+            name, variation = pending.pop(0)
+            sys.stdout.flush()
+            sys.stderr.flush()
+            pid = os.fork()
+            if pid == 0:
+                outdir = os.path.join(parent_outdir, name)
+                _enter_child_outdir(outdir)
+                extra = {k: v for k, v in variation.items() if k != 'name'}
+                return _merge_overrides(base_overrides, extra)
+            running[pid] = (name, time.time())
+            print(f"batch: started {name} (pid {pid})")
+
+        # wait3() reports the reaped child's own CPU time and peak RSS
+        pid, status, usage = os.wait3(0)
+        name, start = running.pop(pid)
+        exit_code = os.waitstatus_to_exitcode(status)
+        results.append({
+            'name': name,
+            'outdir': os.path.join(parent_outdir, name),
+            'exit_code': exit_code,
+            'host_seconds': time.time() - start,
+            'host': rusage_metrics(usage),
+        })
+        with open(stream_file, 'a') as f:
+            f.write(json.dumps(results[-1]) + '\n')
+        print(f"batch: {name} {'done' if exit_code == 0 else 'FAILED'} "
+              f"(exit {exit_code})")
+
+    order = {name: i for i, name in enumerate(names)}
+    results.sort(key=lambda r: order[r['name']])
+    with open(os.path.join(parent_outdir, 'batch_results.json'), 'w') as f:
+        json.dump(results, f, indent=2)
+
+    sys.exit(0 if all(r['exit_code'] == 0 for r in results) else 1)
+
+
+def _enter_child_outdir(outdir):
+    # Same steps as m5.fork(): moving simout relocates already-open
+    # streams such as stats.txt into the new directory
+    os.makedirs(outdir, exist_ok=True)
+    m5.options.outdir = outdir
+    m5.core.setOutputDir(outdir)
+
+    # Keep each child's console output apart from its siblings'
+    for fd, fname in ((1, 'simout'), (2, 'simerr')):
+        out = os.open(os.path.join(outdir, fname),
+                      os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.dup2(out, fd)
+        os.close(out)
+
+
+def read_scalar(simobj, name):
+    """Current value of one of simobj's scalar stats (after instantiate)"""
+    info = simobj.getCCObject().resolveStat(name)
+    if info is None:
+        raise ValueError(f"{simobj.path()} has no stat {name!r}")
+    return info.value
+
+
+class ConvergenceMonitor:
+    """Batch-means convergence test on MetadataCache PCB metrics
+
+    Each sample window contributes one value per metric, computed from the
+    change in the cache's raw counters over that window: coalescing rate
+    (pcbCoalescedBlocks * 8 / pcbTotalPartials), overflow rate and write
+    amplification, defined as in the cache's own formulas. A metric has
+    converged once the 95% confidence half-width of its window means is
+    within tolerance of the mean (relative), or zero for a mean of zero.
+    Windows without any partials are idle and not sampled.
+    """
+
+    COUNTERS = ('pcbTotalPartials', 'pcbCoalescedBlocks', 'pcbOverflows',
+                'nvmWrites')
+
+    METRICS = {
+        'coalescingRate':
+            lambda d: d['pcbCoalescedBlocks'] * 8 / d['pcbTotalPartials'],
+        'overflowRate':
+            lambda d: d['pcbOverflows'] / d['pcbTotalPartials'] * 100,
+        'writeAmplification':
+            lambda d: d['nvmWrites'] / (d['pcbTotalPartials'] * 8 / 64),
+    }
+
+    def __init__(self, cache, tolerance=0.05, min_samples=5):
+        self.cache = cache
+        self.tolerance = tolerance
+        self.min_samples = max(2, min_samples)
+        self.samples = {name: [] for name in self.METRICS}
+        self.last = self._read()
+
+    def _read(self):
+        return {name: read_scalar(self.cache, name)
+                for name in self.COUNTERS}
+
+    def sample(self):
+        now = self._read()
+        delta = {name: now[name] - self.last[name] for name in now}
+        self.last = now
+        if delta['pcbTotalPartials'] <= 0:
+            return False
+        for name, metric in self.METRICS.items():
+            self.samples[name].append(metric(delta))
+        return True
+
+    def summary(self):
+        """{metric: {mean, half_width, n}} over the windows so far"""
+        out = {}
+        for name, values in self.samples.items():
+            n = len(values)
+            mean = sum(values) / n if n else 0.0
+            half = float('inf')
+            if n >= 2:
+                var = sum((v - mean) ** 2 for v in values) / (n - 1)
+                half = t_critical_95(n - 1) * math.sqrt(var / n)
+            out[name] = {'mean': mean, 'half_width': half, 'n': n}
+        return out
+
+    def converged(self):
+        for stat in self.summary().values():
+            if stat['n'] < self.min_samples:
+                return False
+            if stat['half_width'] > self.tolerance * abs(stat['mean']):
+                return False
+        return True
+
+
+# Marks progress lines in a run's stdout (simout in batch mode)
+PROGRESS_PREFIX = 'thoth-progress: '
+
+
+class ProgressReporter:
+    """Periodic machine-readable progress lines on stdout
+
+    Each report is PROGRESS_PREFIX followed by a JSON object: simulated
+    ticks so far and the run's limit, host seconds since the reporter was
+    created, and the cache's cumulative partial count and coalescing rate.
+    Sweep runners parse these while the run is in flight to show progress
+    and spot stuck jobs. Reading the counters does not disturb the stats
+    dump at the end of the run.
+    """
+
+    def __init__(self, cache, max_ticks):
+        self.cache = cache
+        self.max_ticks = max_ticks
+        self.start_tick = m5.curTick()
+        self.start_time = time.time()
+
+    def report(self):
+        partials = read_scalar(self.cache, 'pcbTotalPartials')
+        coalesced = read_scalar(self.cache, 'pcbCoalescedBlocks')
+        print(PROGRESS_PREFIX + json.dumps({
+            'sim_ticks': m5.curTick() - self.start_tick,
+            'max_ticks': self.max_ticks,
+            'host_seconds': round(time.time() - self.start_time, 3),
+            'partials': int(partials),
+            'coalescingRate': coalesced * 8 / partials if partials else 0.0,
+        }), flush=True)
+
+
+def simulate_with_progress(cache, max_ticks, report_ticks):
+    """m5.simulate(max_ticks) in report_ticks steps, reporting after each
+
+    Stepping only adds exit points; the simulated result is the same as
+    one m5.simulate() call. Returns the last exit event.
+    """
+    reporter = ProgressReporter(cache, max_ticks)
+    start = m5.curTick()
+    while True:
+        remaining = max_ticks - (m5.curTick() - start)
+        exit_event = m5.simulate(min(report_ticks, remaining))
+        reporter.report()
+        if exit_event.getCause() != 'simulate() limit reached' or \
+           m5.curTick() - start >= max_ticks:
+            return exit_event
+
+
+def simulate_until_converged(cache, max_ticks, sample_ticks, tolerance,
+                             min_flush_cycles, min_samples=5,
+                             progress=False):
+    """Simulate in windows until the PCB metrics converge
+
+    Stops at the first of: the metrics converging (checked only once
+    min_flush_cycles ADR flush intervals have elapsed), max_ticks of
+    simulated time, or any other exit event. Writes termination.json to
+    the output directory with the reason and the final intervals, and
+    returns the last exit event. With progress set, a ProgressReporter
+    line is printed after every window.
+    """
+    flush_ticks = int(cache.flush_interval.getValue())
+    min_ticks = min_flush_cycles * flush_ticks
+    monitor = ConvergenceMonitor(cache, tolerance, min_samples)
+    reporter = ProgressReporter(cache, max_ticks) if progress else None
+    start = m5.curTick()
+
+    while True:
+        elapsed = m5.curTick() - start
+        exit_event = m5.simulate(min(sample_ticks, max_ticks - elapsed))
+        elapsed = m5.curTick() - start
+
+        if exit_event.getCause() != 'simulate() limit reached':
+            reason = 'exit_event'
+            break
+        monitor.sample()
+        if reporter:
+            reporter.report()
+        if elapsed >= min_ticks and monitor.converged():
+            reason = 'converged'
+            break
+        if elapsed >= max_ticks:
+            reason = 'max_duration'
+            break
+
+    termination = {
+        'reason': reason,
+        'exit_cause': exit_event.getCause(),
+        'sim_ticks': elapsed,
+        'max_ticks': max_ticks,
+        'flush_cycles': elapsed // flush_ticks if flush_ticks else 0,
+        'min_flush_cycles': min_flush_cycles,
+        'tolerance': tolerance,
+        'metrics': monitor.summary(),
+    }
+    with open(os.path.join(m5.options.outdir, 'termination.json'), 'w') as f:
+        json.dump(termination, f, indent=2, default=str)
+    print(f"Stopped after {elapsed} ticks: {reason}")
+
+    return exit_event
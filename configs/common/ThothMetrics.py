@@ -0,0 +1,33 @@
+"""
+Statistics and host-metric helpers shared by the Thoth configs and the
+host-side scripts.
+
+Kept free of m5 imports so both sides use one copy: gem5 configs import
+it as common.ThothMetrics, and results_store.py puts configs/ on sys.path
+to do the same.
+"""
+
+import sys
+
+# Two-sided 95% Student-t critical values by degrees of freedom. Between
+# entries the next smaller dof is used, which errs towards wider intervals.
+T_95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447,
+        7: 2.365, 8: 2.306, 9: 2.262, 10: 2.228, 12: 2.179, 15: 2.131,
+        20: 2.086, 25: 2.060, 30: 2.042, 40: 2.021, 60: 2.000, 120: 1.980}
+
+
+def t_critical_95(dof):
+    if dof > 120:
+        return 1.960
+    return T_95[max(d for d in T_95 if d <= dof)]
+
+
+def rusage_metrics(usage):
+    """Host metrics of one reaped child from its struct rusage"""
+    # ru_maxrss is KiB on Linux but bytes on macOS
+    rss_kb = usage.ru_maxrss / 1024.0 if sys.platform == "darwin" \
+        else usage.ru_maxrss
+    return {"hostPeakRssMB": rss_kb / 1024.0,
+            "hostUserSeconds": usage.ru_utime,
+            "hostSystemSeconds": usage.ru_stime,
+            "hostCpuSeconds": usage.ru_utime + usage.ru_stime}
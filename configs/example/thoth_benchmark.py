@@ -4,9 +4,15 @@ Thoth System with Benchmark-Inspired Traffic Patterns
 Simulates metadata write patterns characteristic of real workloads
 """
 
+import argparse
+
 import m5
 from m5.objects import *
-from m5.util import convert
+from m5.util import addToPath
+
+addToPath('../')
+
+from common import ThothConfig
 
 # Benchmark characteristics (approximate metadata write patterns)
 BENCHMARK_PARAMS = {
@@ -38,7 +44,8 @@ BENCHMARK_PARAMS = {
 
 # System configuration
 class ThothBenchmarkSystem(System):
-    def __init__(self, benchmark_name, params):
+    def __init__(self, benchmark_name, params, nvm_channels=1,
+                 nvm_interleave='256B'):
         super().__init__()
         
         # Basic system setup
@@ -65,40 +72,38 @@ class ThothBenchmarkSystem(System):
         self.metadata_cache = MetadataCache()
         self.metadata_cache.access_latency = '10ns'
         
-        # NVMain PCM backend
-        self.nvmain = NVMainControl()
-        self.nvmain.range = self.mem_ranges[0]
-        self.nvmain.nvmain_config = 'ext/NVMain/Config/PCM_ISSCC_2012_4GB.config'
-        
         # Wire connections
         # TrafficGen -> Cache -> NVMain
         self.traffic_gen.port = self.metadata_cache.port
-        self.metadata_cache.nvmain_port = self.nvmain.port
 
-# Create system
-import sys
-import os
-
-if len(sys.argv) < 2:
-    print("Usage: gem5.opt thoth_benchmark.py <benchmark>")
-    print("Benchmarks: hashmap, btree, rbtree, swap")
-    sys.exit(1)
+        # NVMain PCM backend, interleaved across channels
+        ThothConfig.build_nvm_channels(
+            self, self.metadata_cache, self.mem_ranges[0],
+            num_channels=nvm_channels, intlv_size=nvm_interleave)
 
-benchmark = sys.argv[1]
-
-if benchmark not in BENCHMARK_PARAMS:
-    print(f"Error: Unknown benchmark '{benchmark}'")
-    print(f"Available: {', '.join(BENCHMARK_PARAMS.keys())}")
-    sys.exit(1)
+# Create system
+parser = argparse.ArgumentParser(
+    description="Thoth system with benchmark-inspired metadata traffic")
+parser.add_argument("benchmark", choices=list(BENCHMARK_PARAMS),
+                    help="Benchmark traffic pattern")
+parser.add_argument("--nvm-channels", type=int, default=1,
+                    help="NVMain channels behind the metadata cache "
+                         "(power of two)")
+parser.add_argument("--nvm-interleave", default='256B',
+                    help="Address interleaving granularity across channels")
+args = parser.parse_args()
 
+benchmark = args.benchmark
 params = BENCHMARK_PARAMS[benchmark]
 print(f"=== Thoth System with {benchmark.upper()} Benchmark ===")
 print(f"Description: {params['description']}")
 print(f"Parameters: burst_size={params['burst_size']}, interval={params['burst_interval']}")
+print(f"NVM: {args.nvm_channels} channel(s), {args.nvm_interleave} interleave")
 
 # Instantiate system
 root = Root(full_system=False)
-root.system = ThothBenchmarkSystem(benchmark, params)
+root.system = ThothBenchmarkSystem(benchmark, params, args.nvm_channels,
+                                   args.nvm_interleave)
 
 # Instantiate
 m5.instantiate()
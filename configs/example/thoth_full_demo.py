@@ -1,18 +1,91 @@
 """
 Complete End-to-End Thoth Demo
-Integrates: Traffic Generator → Metadata Cache → NVMain
+Integrates: Traffic Generator → AES-CTR Stage → Metadata Cache → NVMain
 
 This demonstrates the full flow:
 1. MetadataTrafficGen generates burst traffic (250 requests/burst @ 1ms intervals)
-2. Metadata writes go to MetadataCache (4-way set-associative, 1MB)
-3. Cache evictions flow to write queue
-4. NVMain PCM backend for persistence
+2. AESCTRGenerator holds each request until its one-time pad is ready
+3. Metadata writes go to MetadataCache (4-way set-associative, 1MB)
+4. Cache evictions flow to write queue
+5. NVMain PCM backend for persistence
 
 Run with: ./build/RISCV/gem5.opt configs/example/thoth_full_demo.py
+
+Any SimObject parameter can be overridden without editing this file:
+
+    gem5.opt configs/example/thoth_full_demo.py \
+        --set traffic_gen.burst_size=200 --set metadata_cache.pcb_capacity=512
+
+    gem5.opt configs/example/thoth_full_demo.py \
+        --params-json '{"traffic_gen": {"burst_interval": "2ms"},
+                        "run": {"num_cores": 2, "duration": "20ms"}}'
+
+Objects: traffic_gen, aes_gen (applied to every core), metadata_cache,
+nvmain (every channel), and run for the options in RUN_DEFAULTS. Unknown
+objects or parameters are an error.
+
+Several variations can share one gem5 launch:
+
+    gem5.opt --outdir=sweep configs/example/thoth_full_demo.py \
+        --batch variations.json --jobs 4
+
+where variations.json is a list like
+[{"name": "Small", "traffic_gen": {"burst_size": 25}}, ...]. Each one
+runs in a forked child with its stats in sweep/<name>/, and
+sweep/batch_results.json records every child's exit code.
 """
 
+import argparse
+
 import m5
 from m5.objects import *
+from m5.util import addToPath, convert
+
+addToPath('../')
+
+from common import ThothConfig
+
+RUN_DEFAULTS = {
+    # Metadata sources (cores). Each gets its own 1MB address slice,
+    # AES-CTR stage and MetadataCache CPU-side port.
+    'num_cores': 1,
+    # Persistent-memory channels behind the metadata cache (power of two)
+    # and the address-interleaving granularity between them
+    'nvm_channels': 1,
+    'nvm_interleave': '256B',
+    # Base seed for the traffic generators; core i uses seed + i, so
+    # repeated runs with different seeds see independent traffic mixes
+    'seed': 1,
+    # Simulated time (the upper bound when converge is set)
+    'duration': '10ms',
+    # Stop early once coalescing rate, overflow rate and write
+    # amplification converge: 95% CI half-width within ci_tolerance of
+    # the mean over sample windows (default: one per ADR flush interval),
+    # after at least min_flush_cycles flushes. Writes termination.json.
+    'converge': False,
+    'sample_interval': '',
+    'ci_tolerance': 0.05,
+    'min_flush_cycles': 2,
+    'min_samples': 5,
+    # Print a ThothConfig.PROGRESS_PREFIX line every this much simulated
+    # time ('' = off); sweep runners parse them for live progress
+    'progress_interval': '',
+}
+
+parser = argparse.ArgumentParser(description=__doc__,
+    formatter_class=argparse.RawDescriptionHelpFormatter)
+ThothConfig.add_param_options(parser)
+ThothConfig.add_batch_options(parser)
+args = parser.parse_args()
+
+overrides = ThothConfig.load_overrides(args)
+if args.batch:
+    # Only forked children return here, one per variation
+    overrides = ThothConfig.fork_batch(args.batch, overrides, args.jobs)
+run = ThothConfig.take_run_options(overrides, RUN_DEFAULTS)
+NUM_CORES = run['num_cores']
+NVM_CHANNELS = run['nvm_channels']
+NVM_INTERLEAVE = run['nvm_interleave']
 
 # Create system
 system = System()
@@ -29,14 +102,22 @@ system.membus = SystemXBar()
 # System port
 system.system_port = system.membus.cpu_side_ports
 
-# Create Metadata Traffic Generator (burst pattern: 50 requests/burst, 1ms apart)
-system.traffic_gen = MetadataTrafficGen(
-    start_addr=0x100000000,      # Start at 4GB
-    end_addr=0x100100000,        # 1MB range
-    burst_size=50,               # 50 partials per burst (reduced to prevent routing table overflow)
-    burst_interval='1ms',        # 1ms between bursts = 50k partials/sec
-    request_latency='20us'       # 20us between requests in burst (slower to allow responses)
-)
+# Create Metadata Traffic Generators (burst pattern: 50 requests/burst, 1ms apart)
+def make_traffic_gen(core):
+    base = 0x100000000 + core * 0x100000
+    return MetadataTrafficGen(
+        start_addr=base,             # Start at 4GB (+1MB per core)
+        end_addr=base + 0x100000,    # 1MB range
+        burst_size=50,               # 50 partials per burst (reduced to prevent routing table overflow)
+        burst_interval='1ms',        # 1ms between bursts = 50k partials/sec
+        request_latency='20us',      # 20us between requests in burst (slower to allow responses)
+        max_outstanding=0,           # Open loop; >0 caps requests awaiting a response
+        read_fraction=0.0,           # Share of requests that are counter reads
+        rmw=False,                   # Updates as counter read + write-back of value+1
+        seed=run['seed'] + core      # Per-core operation-mix stream
+    )
+
+traffic_gens = [make_traffic_gen(core) for core in range(NUM_CORES)]
 
 # Create Metadata Cache (1MB, 4-way set-associative with PCB coalescing)
 system.metadata_cache = MetadataCache(
@@ -44,44 +125,79 @@ system.metadata_cache = MetadataCache(
     num_ways=4,                  # 4-way associative
     block_size='64B',            # 64-byte cache lines
     access_latency='2ns',        # 2ns SRAM access
-    write_queue_capacity=64      # 64-entry write queue for evictions
+    write_queue_capacity=64,     # 64-line write queue for evictions
+    pcb_capacity=256,            # 256 PCB entries (16KB buffer)
+    flush_interval='10ms',       # ADR flush period
+    num_banks=4,                 # Independently pipelined cache/PCB banks
+    bank_issue_cycles=1,         # Each bank starts one access per cycle
+    tree_arity=0,                # >0 adds Bonsai Merkle tree path updates
+    tree_counters=AddrRange(0x100000000, size=NUM_CORES * 0x100000),
+    tree_base=0x180000000,       # Tree levels, clear of the counters
+    crash_points=[],             # Ticks at which to estimate crash recovery
+    crash_interval='0ns'         # >0 also estimates it periodically
 )
 
-# Create AES-CTR Generator (for encryption context)
-system.aes_gen = AESCTRGenerator(
-    key_seed=0xDEADBEEFCAFEBABE,
-    start_counter=1000,
-    test_requests=0              # Don't self-generate, rely on traffic gen
-)
+# Create AES-CTR encryption stages (OTP pads for every metadata request)
+def make_aes_gen():
+    return AESCTRGenerator(
+        key_seed=0xDEADBEEFCAFEBABE,
+        start_counter=1000,
+        test_requests=0,             # Don't self-generate, rely on traffic gen
+        num_engines=2,               # Parallel AES pipelines
+        counter_cache_entries=256,   # On-chip counters with precomputed pads
+        max_pending=32,              # Requests waiting for pads before backpressure
+        pad_cache_entries=0,         # >0 enables counter prediction + pad prefetch
+        prefetch_degree=1            # Counter values prefetched ahead per slot
+    )
 
-# Create NVMain PCM backend for metadata persistence
-system.nvmain = NVMainControl(
-    nvmain_config='ext/NVMain/Config/PCM_ISSCC_2012_4GB.config',
-    range=AddrRange('8GB', size='4GB')  # 8GB-12GB range for persistent metadata
-)
+aes_gens = [make_aes_gen() for _ in range(NUM_CORES)]
+
+# A single core keeps the system.traffic_gen / system.aes_gen stat names;
+# several become traffic_gen0..N-1 / aes_gen0..N-1
+if NUM_CORES == 1:
+    system.traffic_gen = traffic_gens[0]
+    system.aes_gen = aes_gens[0]
+else:
+    system.traffic_gen = traffic_gens
+    system.aes_gen = aes_gens
 
 # Simple memory for traffic generator working range (4GB-8GB)
 system.mem_ctrl = SimpleMemory()
 system.mem_ctrl.range = AddrRange(start='4GB', size='4GB')  # 4GB-8GB for active metadata
 
 # Wire system:
-# Traffic Gen → Cache → System Bus → Memory
+# Traffic Gen → AES-CTR Stage → Cache → System Bus → Memory
 # This makes cache actively intercept and process all metadata writes
 
-# 1. Traffic Generator → Metadata Cache (RequestPort → ResponsePort)
-#    Cache receives all metadata write requests and processes through PCB
-system.traffic_gen.port = system.metadata_cache.port
+# 1. Traffic Generator → AES-CTR Stage → Metadata Cache (one port per core)
+#    Each request waits for its pad, then the cache processes it through PCB
+for gen, aes in zip(traffic_gens, aes_gens):
+    gen.port = aes.cpu_side
+    aes.mem_side = system.metadata_cache.port
+    # Pad prefetch predicts counters from the values cached in metadata lines
+    aes.metadata_cache = system.metadata_cache
 
 # 2. Memory controller connects to system bus
 system.mem_ctrl.port = system.membus.mem_side_ports
 
-# 3. Cache → NVMain for PCB-coalesced evictions (64B blocks)
-#    Coalesced blocks go directly to persistent storage
-system.metadata_cache.nvmain_port = system.nvmain.port
+# 3. Cache → NVMain PCM channels for PCB-coalesced evictions (64B blocks)
+#    8GB-12GB range for persistent metadata, interleaved across channels
+nvm_channels = ThothConfig.build_nvm_channels(
+    system, system.metadata_cache, AddrRange('8GB', size='4GB'),
+    num_channels=NVM_CHANNELS, intlv_size=NVM_INTERLEAVE)
 
 # Note: Cache now actively intercepts all traffic from generator
 # Writes go through: TrafficGen → Cache (PCB coalescing) → NVMain (evictions)
 
+# Command-line overrides go last so they win over the values above
+# (including max_outstanding_writes chosen by build_nvm_channels)
+ThothConfig.apply_params(overrides, 'traffic_gen', traffic_gens)
+ThothConfig.apply_params(overrides, 'aes_gen', aes_gens)
+ThothConfig.apply_params(overrides, 'metadata_cache', system.metadata_cache)
+ThothConfig.apply_params(overrides, 'nvmain', nvm_channels)
+ThothConfig.check_overrides_used(
+    overrides, ['run', 'traffic_gen', 'aes_gen', 'metadata_cache', 'nvmain'])
+
 # Create root and instantiate
 root = Root(full_system=False, system=system)
 m5.instantiate()
@@ -91,41 +207,68 @@ print("Thoth Full System Demo - Secure Metadata Architecture")
 print("=" * 80)
 print()
 print("Traffic Generator:")
-print(f"  - Address Range: 0x{int(system.traffic_gen.start_addr):X} - 0x{int(system.traffic_gen.end_addr):X}")
-print(f"  - Burst Size: {int(system.traffic_gen.burst_size)} requests/burst")
-print(f"  - Burst Interval: {system.traffic_gen.burst_interval}")
-print(f"  - Request Rate: ~{int(system.traffic_gen.burst_size) * 1000} requests/sec")
+print(f"  - Cores: {NUM_CORES}")
+print(f"  - Address Range: 0x{int(traffic_gens[0].start_addr):X} - 0x{int(traffic_gens[-1].end_addr):X}")
+print(f"  - Burst Size: {int(traffic_gens[0].burst_size)} requests/burst")
+print(f"  - Burst Interval: {traffic_gens[0].burst_interval}")
+print(f"  - Request Rate: ~{int(traffic_gens[0].burst_size) * 1000 * NUM_CORES} requests/sec")
+print()
+print("AES-CTR Encryption Stage:")
+print(f"  - AES Engines: {int(aes_gens[0].num_engines)} per core")
+print(f"  - Counter Cache: {int(aes_gens[0].counter_cache_entries)} entries")
+print(f"  - Pad Latency: {aes_gens[0].latency}")
 print()
 print("Metadata Cache with PCB:")
 print(f"  - Configuration: {int(system.metadata_cache.num_sets)} sets × {int(system.metadata_cache.num_ways)} ways")
 print(f"  - Total Capacity: {int(system.metadata_cache.num_sets) * int(system.metadata_cache.num_ways) * 64 // 1024} KB")
 print(f"  - Access Latency: {system.metadata_cache.access_latency}")
-print(f"  - PCB: 256 entries (coalesces 8B → 64B blocks)")
-print(f"  - Flush Interval: 10ms (ADR timing)")
+print(f"  - Banks: {int(system.metadata_cache.num_banks)}")
+print(f"  - PCB: {int(system.metadata_cache.pcb_capacity)} entries (coalesces 8B → 64B blocks)")
+print(f"  - Flush Interval: {system.metadata_cache.flush_interval} (ADR timing)")
 print()
 print("NVMain Backend:")
 print(f"  - Technology: PCM (Phase Change Memory)")
-print(f"  - Range: {system.nvmain.range}")
+print(f"  - Channels: {len(nvm_channels)} ({NVM_INTERLEAVE} interleave)")
+print(f"  - Range: {AddrRange('8GB', size='4GB')}")
 print(f"  - Purpose: Persistent metadata storage (coalesced 64B blocks)")
 print()
-print("Starting simulation for 10ms...")
+print(f"Starting simulation for {'up to ' if run['converge'] else ''}{run['duration']}...")
 print("-" * 80)
 
-# Run simulation for 10ms (should generate 10 bursts = 2500 requests)
-exit_event = m5.simulate(10_000_000_000)  # 10ms in ticks
+# Default 10ms run generates 10 bursts
+max_ticks = m5.ticks.fromSeconds(convert.toLatency(run['duration']))
+if run['converge']:
+    sample_ticks = (m5.ticks.fromSeconds(convert.toLatency(run['sample_interval']))
+                    if run['sample_interval'] else
+                    int(system.metadata_cache.flush_interval.getValue()))
+    exit_event = ThothConfig.simulate_until_converged(
+        system.metadata_cache, max_ticks, sample_ticks,
+        run['ci_tolerance'], run['min_flush_cycles'], run['min_samples'],
+        progress=bool(run['progress_interval']))
+elif run['progress_interval']:
+    exit_event = ThothConfig.simulate_with_progress(
+        system.metadata_cache, max_ticks,
+        m5.ticks.fromSeconds(convert.toLatency(run['progress_interval'])))
+else:
+    exit_event = m5.simulate(max_ticks)
 
 print()
 print("-" * 80)
 print(f"Simulation ended: {exit_event.getCause()}")
 print()
-print("Results written to m5out/stats.txt")
+print(f"Results written to {m5.options.outdir}/stats.txt")
 print()
 print("Key statistics to check:")
 print("  Traffic Generation:")
 print("    - system.traffic_gen.requestsSent")
 print("    - system.traffic_gen.burstsCompleted")
+print("  AES-CTR Stage:")
+print("    - system.aes_gen.counterCacheHits / counterCacheMisses")
+print("    - system.aes_gen.stageLatency (pad wait per request)")
+print("    - system.aes_gen.engineQueueTicks (AES throughput limit)")
 print("  Metadata Cache:")
 print("    - system.metadata_cache.hits / misses / evictions")
+print("    - system.metadata_cache.bankConflicts / bankConflictStall / portRequests")
 print("  PCB Coalescing:")
 print("    - system.metadata_cache.pcbCoalescedBlocks (full 64B blocks)")
 print("    - system.metadata_cache.pcbPartialFlushes (incomplete blocks)")
@@ -133,7 +276,8 @@ print("    - system.metadata_cache.pcbOverflows (sent to PLUB)")
 print("    - system.metadata_cache.pcbTotalPartials (total 8B partials)")
 print("    - system.metadata_cache.pcbCoalescingRate (efficiency)")
 print("  NVMain PCM:")
-print("    - system.nvmain.numWrites (persistent writes)")
+print("    - system.nvmain.numWrites (persistent writes; nvmain0..N-1 per channel)")
+print("    - system.nvmain.writeBandwidth / utilization / retryWait")
 print()
 print("=" * 80)
 print("Demo Complete!")
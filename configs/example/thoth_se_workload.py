@@ -0,0 +1,212 @@
+"""
+Thoth with a Real Workload in Syscall-Emulation Mode
+Runs a program (e.g. benchmarks/thoth_workloads/hashmap) on a timing CPU
+and derives the metadata traffic from its actual memory writes:
+
+    CPU → L1I/L1D → membus → MemEncryptionFrontend → DRAM (data)
+                                      │
+                                      └→ AES-CTR Stage → MetadataCache → NVMain
+
+Every data write that reaches memory (an L1D writeback, or each store with
+run.caches off) becomes an 8B counter update and an 8B MAC update for its
+64B block; data reads fetch the block's counter. The PCB therefore
+coalesces the updates the program really produces.
+
+Run with:
+
+    ./build/RISCV/gem5.opt configs/example/thoth_se_workload.py \
+        benchmarks/thoth_workloads/hashmap
+
+The binary must match gem5's ISA; for build/RISCV compile the workloads
+with `make CROSS_COMPILE=riscv64-linux-gnu-`. Parameters are overridden as
+in thoth_full_demo.py, e.g.
+
+    --set frontend.mac_updates=false --set metadata_cache.pcb_capacity=512
+    --params-json '{"run": {"caches": false, "duration": "50ms"}}'
+
+Objects: cpu, frontend, aes_gen, metadata_cache, nvmain (every channel),
+and run for the options in RUN_DEFAULTS.
+"""
+
+import argparse
+import os
+import sys
+
+import m5
+from m5.defines import buildEnv
+from m5.objects import *
+from m5.util import addToPath, convert
+
+addToPath('../')
+
+from common import ThothConfig
+
+RUN_DEFAULTS = {
+    # CPU clock and whether it has private L1 caches. Without caches
+    # every load and store reaches the frontend.
+    'cpu_clock': '2GHz',
+    'caches': True,
+    'l1i_size': '32kB',
+    'l1d_size': '32kB',
+    # Program memory (DRAM) behind the frontend
+    'mem_size': '512MB',
+    # Persistent-memory channels behind the metadata cache
+    'nvm_channels': 1,
+    'nvm_interleave': '256B',
+    # Simulated-time cap; '' runs the program to completion
+    'duration': '',
+    # Arguments passed to the program
+    'options': '',
+}
+
+# ELF e_machine of the binaries each gem5 ISA can run
+ELF_MACHINES = {'RISCV': 0xF3, 'X86': 0x3E, 'ARM': 0xB7}
+
+
+class L1Cache(Cache):
+    assoc = 8
+    tag_latency = 2
+    data_latency = 2
+    response_latency = 2
+    mshrs = 16
+    tgts_per_mshr = 20
+
+
+def check_binary(path):
+    """Fail early if the workload is missing or built for another ISA"""
+    if not os.path.isfile(path):
+        raise ValueError(f"Workload binary not found: {path} "
+                         f"(cd benchmarks/thoth_workloads && make)")
+    with open(path, 'rb') as f:
+        header = f.read(20)
+    if header[:4] != b'\x7fELF':
+        raise ValueError(f"{path} is not an ELF binary")
+    machine = int.from_bytes(header[18:20], 'little')
+    for isa, expected in ELF_MACHINES.items():
+        if buildEnv.get(f'USE_{isa}_ISA') and machine != expected:
+            raise ValueError(
+                f"{path} is not a {isa} binary (ELF machine {machine:#x}); "
+                f"rebuild it for this gem5, e.g. "
+                f"make CROSS_COMPILE=riscv64-linux-gnu-")
+
+
+parser = argparse.ArgumentParser(description=__doc__,
+    formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument('binary', help="Statically linked workload to run")
+ThothConfig.add_param_options(parser)
+args = parser.parse_args()
+
+overrides = ThothConfig.load_overrides(args)
+run = ThothConfig.take_run_options(overrides, RUN_DEFAULTS)
+check_binary(args.binary)
+
+system = System()
+system.clk_domain = SrcClockDomain(clock=run['cpu_clock'],
+                                   voltage_domain=VoltageDomain())
+system.mem_mode = 'timing'
+system.mem_ranges = [AddrRange(run['mem_size'])]
+
+system.cpu = TimingSimpleCPU()
+system.membus = SystemXBar()
+system.system_port = system.membus.cpu_side_ports
+
+if run['caches']:
+    system.cpu.icache = L1Cache(size=run['l1i_size'])
+    system.cpu.dcache = L1Cache(size=run['l1d_size'])
+    system.cpu.icache_port = system.cpu.icache.cpu_side
+    system.cpu.dcache_port = system.cpu.dcache.cpu_side
+    system.cpu.icache.mem_side = system.membus.cpu_side_ports
+    system.cpu.dcache.mem_side = system.membus.cpu_side_ports
+else:
+    system.cpu.icache_port = system.membus.cpu_side_ports
+    system.cpu.dcache_port = system.membus.cpu_side_ports
+system.cpu.createInterruptController()
+
+# Data memory sits behind the encryption frontend. Counters and MACs of
+# the data region live in the metadata region at 4GB, one 8B slot per
+# 64B data block each.
+data_blocks = int(convert.toMemorySize(run['mem_size'])) // 64
+system.frontend = MemEncryptionFrontend(
+    counter_base=0x100000000,
+    mac_base=0x100000000 + data_blocks * 8,
+    data_block_size='64B',
+    mac_updates=True,             # 8B MAC update alongside each counter
+    counter_reads=True,           # Data reads fetch the block's counter
+    max_pending=64                # Partials queued before the CPU stalls
+)
+system.membus.mem_side_ports = system.frontend.cpu_side
+system.mem_ctrl = MemCtrl(dram=DDR3_1600_8x8(range=system.mem_ranges[0]))
+system.frontend.mem_side = system.mem_ctrl.port
+
+# Metadata path, as in thoth_full_demo.py
+system.aes_gen = AESCTRGenerator(
+    key_seed=0xDEADBEEFCAFEBABE,
+    start_counter=1000,
+    test_requests=0,
+    num_engines=2,
+    counter_cache_entries=256,
+    max_pending=32
+)
+system.metadata_cache = MetadataCache(
+    num_sets=4096,
+    num_ways=4,
+    block_size='64B',
+    access_latency='2ns',
+    write_queue_capacity=64,
+    pcb_capacity=256,
+    flush_interval='10ms',
+    num_banks=4,
+    bank_issue_cycles=1,
+    tree_arity=0,                 # >0 adds Bonsai Merkle tree path updates
+    tree_counters=AddrRange(0x100000000, size=data_blocks * 8),
+    tree_base=0x180000000
+)
+system.frontend.metadata_side = system.aes_gen.cpu_side
+system.aes_gen.mem_side = system.metadata_cache.port
+system.aes_gen.metadata_cache = system.metadata_cache
+nvm_channels = ThothConfig.build_nvm_channels(
+    system, system.metadata_cache, AddrRange('8GB', size='4GB'),
+    num_channels=run['nvm_channels'], intlv_size=run['nvm_interleave'])
+
+system.workload = SEWorkload.init_compatible(args.binary)
+process = Process(cmd=[args.binary] + run['options'].split())
+system.cpu.workload = process
+system.cpu.createThreads()
+
+ThothConfig.apply_params(overrides, 'cpu', system.cpu)
+ThothConfig.apply_params(overrides, 'frontend', system.frontend)
+ThothConfig.apply_params(overrides, 'aes_gen', system.aes_gen)
+ThothConfig.apply_params(overrides, 'metadata_cache', system.metadata_cache)
+ThothConfig.apply_params(overrides, 'nvmain', nvm_channels)
+ThothConfig.check_overrides_used(
+    overrides, ['run', 'cpu', 'frontend', 'aes_gen', 'metadata_cache',
+                'nvmain'])
+
+root = Root(full_system=False, system=system)
+m5.instantiate()
+
+print("=" * 80)
+print(f"Thoth SE workload: {' '.join(process.cmd)}")
+print(f"  CPU: TimingSimpleCPU @ {run['cpu_clock']}, "
+      f"{'L1 ' + run['l1i_size'] + '/' + run['l1d_size'] if run['caches'] else 'no caches'}")
+print(f"  Metadata: counters @ {int(system.frontend.counter_base):#x}, "
+      f"MACs @ {int(system.frontend.mac_base):#x}")
+print("=" * 80)
+
+if run['duration']:
+    exit_event = m5.simulate(
+        m5.ticks.fromSeconds(convert.toLatency(run['duration'])))
+else:
+    exit_event = m5.simulate()
+
+print(f"\nExiting @ tick {m5.curTick()} because {exit_event.getCause()}")
+print(f"Results written to {m5.options.outdir}/stats.txt")
+print("  Derived metadata: system.frontend.counterUpdates, macUpdates, "
+      "counterReads")
+print("  Coalescing:       system.metadata_cache.pcbCoalescingRate, "
+      "writeAmplification")
+
+# A failing program fails the run, so the runners record it as failed
+if exit_event.getCause() == 'exiting with last active thread context' and \
+   exit_event.getCode() != 0:
+    sys.exit(exit_event.getCode())
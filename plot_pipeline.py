@@ -0,0 +1,1122 @@
+#!/usr/bin/env python3
+"""
+Figure pipeline for Thoth experiment and benchmark results
+
+Every figure the plotting scripts produce is registered here with a loader
+(runs in this process, reads the results store) and a renderer (runs in a
+worker process, draws and saves one figure). A figure is re-rendered only
+when the hash of its input data, style, dpi and renderer source differs
+from the one recorded in the output directory's .figure_hashes.json, so
+re-plotting after a sweep redraws only what the sweep changed. Renderers
+run in a process pool.
+
+--preview renders at 72 dpi into a preview/ subdirectory (with its own
+hashes), for a quick look before paying for the 300-dpi set.
+
+Groups:
+    experiments  synthetic sweeps (plot_results_corrected.py)
+    benchmarks   benchmark suite (plot_benchmark_results.py)
+    legacy       stride/rate-era experiments (plot_results.py)
+
+Usage:
+    ./plot_pipeline.py                        # experiments + benchmarks
+    ./plot_pipeline.py --preview              # fast low-dpi drafts
+    ./plot_pipeline.py --groups benchmarks --force --jobs 4
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+from results_store import SUITE_EXPERIMENT, open_store
+
+FULL_DPI = 300
+PREVIEW_DPI = 72
+HASH_FILE = ".figure_hashes.json"
+
+# Publication-quality defaults of the experiment figures
+PAPER_STYLE = {
+    'base': None,
+    'rc': {
+        'font.size': 12,
+        'font.family': 'serif',
+        'axes.labelsize': 14,
+        'axes.titlesize': 16,
+        'xtick.labelsize': 12,
+        'ytick.labelsize': 12,
+        'legend.fontsize': 11,
+        'figure.figsize': (10, 6),
+    },
+}
+
+BENCHMARK_STYLE = {
+    'base': 'seaborn-v0_8-darkgrid',
+    'rc': {
+        'font.size': 10,
+        'axes.labelsize': 11,
+        'axes.titlesize': 12,
+        'xtick.labelsize': 9,
+        'ytick.labelsize': 9,
+        'legend.fontsize': 9,
+    },
+}
+
+# Colors and labels for benchmarks
+BENCHMARK_COLORS = ['#2E86AB', '#A23B72', '#F18F01', '#06A77D']
+BENCHMARK_LABELS = {
+    'hashmap': 'Hashmap',
+    'btree': 'B-Tree',
+    'rbtree': 'RB-Tree',
+    'swap': 'Array Swap'
+}
+
+
+# ============================================================================
+# Shared helpers (hashed along with every renderer)
+# ============================================================================
+
+def _ci(results, metric):
+    """95% confidence half-widths for a metric (0 for single runs)"""
+    return [r.get(f'{metric}_ci95', 0) for r in results]
+
+
+def _bench_series(data, metric):
+    return [data['results'][b][metric] for b in data['benchmarks']]
+
+
+def _bench_ci(data, metric):
+    return [data['results'][b].get(f'{metric}_ci95', 0)
+            for b in data['benchmarks']]
+
+
+def _bench_labels(data):
+    return [BENCHMARK_LABELS.get(b, b) for b in data['benchmarks']]
+
+
+SHARED_HELPERS = (_ci, _bench_series, _bench_ci, _bench_labels)
+
+
+# ============================================================================
+# Synthetic experiment figures (current parameters)
+# ============================================================================
+
+def render_burst_size_analysis(results, output_file, dpi):
+    """Plot: Burst Size Impact on Performance"""
+    burst_sizes = [r['burst_size'] for r in results]
+    efficiency = [r.get('coalescingEfficiency', 0) for r in results]
+    write_amp = [r.get('writeAmplification', 0) for r in results]
+    nvm_writes = [r.get('nvmWrites', 0) for r in results]
+    requests_sent = [r.get('requestsSent', 0) for r in results]
+
+    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(14, 10))
+
+    # Plot 1: Efficiency vs Burst Size
+    ax1.errorbar(burst_sizes, efficiency, yerr=_ci(results, 'coalescingEfficiency'),
+                 fmt='o-', linewidth=2, markersize=10, capsize=4, color='#2E86AB')
+    ax1.set_xlabel('Burst Size (requests/burst)')
+    ax1.set_ylabel('Coalescing Efficiency (%)')
+    ax1.set_title('PCB Coalescing Efficiency vs. Burst Size')
+    ax1.grid(True, alpha=0.3)
+    for x, y in zip(burst_sizes, efficiency):
+        ax1.annotate(f'{y:.1f}%', (x, y), textcoords="offset points", 
+                    xytext=(0,8), ha='center', fontsize=9)
+
+    # Plot 2: Write Amplification vs Burst Size  
+    ax2.errorbar(burst_sizes, write_amp, yerr=_ci(results, 'writeAmplification'),
+                 fmt='s-', linewidth=2, markersize=10, capsize=4, color='#A23B72')
+    ax2.set_xlabel('Burst Size (requests/burst)')
+    ax2.set_ylabel('Write Amplification')
+    ax2.set_title('Write Amplification vs. Burst Size')
+    ax2.axhline(y=0.25, color='green', linestyle='--', alpha=0.5, label='Ideal (8B→64B)')
+    ax2.axhline(y=1.0, color='red', linestyle='--', alpha=0.5, label='No Coalescing')
+    ax2.legend()
+    ax2.grid(True, alpha=0.3)
+    for x, y in zip(burst_sizes, write_amp):
+        ax2.annotate(f'{y:.3f}', (x, y), textcoords="offset points", 
+                    xytext=(0,8), ha='center', fontsize=9)
+
+    # Plot 3: Traffic Reduction
+    ax3.bar(burst_sizes, requests_sent, alpha=0.5, color='#F18F01', label='Requests Sent')
+    ax3.bar(burst_sizes, nvm_writes, alpha=0.8, color='#2E86AB', label='NVM Writes')
+    ax3.set_xlabel('Burst Size (requests/burst)')
+    ax3.set_ylabel('Write Count')
+    ax3.set_title('Traffic Reduction (Requests vs. NVM Writes)')
+    ax3.legend()
+    ax3.grid(True, alpha=0.3, axis='y')
+
+    # Plot 4: Reduction Factor
+    reduction = [req / (nvm + 1) for req, nvm in zip(requests_sent, nvm_writes)]
+    ax4.plot(burst_sizes, reduction, 'D-', linewidth=2, markersize=10, color='#6A994E')
+    ax4.set_xlabel('Burst Size (requests/burst)')
+    ax4.set_ylabel('Traffic Reduction Factor')
+    ax4.set_title('PCB Traffic Reduction vs. Burst Size')
+    ax4.axhline(y=8.0, color='green', linestyle='--', alpha=0.5, label='Ideal (8×)')
+    ax4.legend()
+    ax4.grid(True, alpha=0.3)
+    for x, y in zip(burst_sizes, reduction):
+        ax4.annotate(f'{y:.1f}×', (x, y), textcoords="offset points", 
+                    xytext=(0,8), ha='center', fontsize=9)
+
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def render_burst_interval_analysis(results, output_file, dpi):
+    """Plot: Burst Interval Impact"""
+    # Extract interval values (convert from string like '1ms' to number)
+    intervals = []
+    for r in results:
+        interval_str = r['burst_interval']
+        if 'ms' in interval_str:
+            intervals.append(float(interval_str.replace('ms', '')))
+        elif 'us' in interval_str:
+            intervals.append(float(interval_str.replace('us', '')) / 1000)
+
+    efficiency = [r.get('coalescingEfficiency', 0) for r in results]
+    write_amp = [r.get('writeAmplification', 0) for r in results]
+    nvm_writes = [r.get('nvmWrites', 0) for r in results]
+
+    fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(16, 5))
+
+    # Plot 1: Efficiency
+    ax1.errorbar(intervals, efficiency, yerr=_ci(results, 'coalescingEfficiency'),
+                 fmt='o-', linewidth=2, markersize=10, capsize=4, color='#2E86AB')
+    ax1.set_xlabel('Burst Interval (ms)')
+    ax1.set_ylabel('Coalescing Efficiency (%)')
+    ax1.set_title('Efficiency vs. Burst Interval')
+    ax1.grid(True, alpha=0.3)
+    for x, y in zip(intervals, efficiency):
+        ax1.annotate(f'{y:.1f}%', (x, y), textcoords="offset points", 
+                    xytext=(0,8), ha='center', fontsize=9)
+
+    # Plot 2: Write Amplification
+    ax2.errorbar(intervals, write_amp, yerr=_ci(results, 'writeAmplification'),
+                 fmt='s-', linewidth=2, markersize=10, capsize=4, color='#A23B72')
+    ax2.set_xlabel('Burst Interval (ms)')
+    ax2.set_ylabel('Write Amplification')
+    ax2.set_title('Write Amp vs. Burst Interval')
+    ax2.axhline(y=0.25, color='green', linestyle='--', alpha=0.5, label='Ideal')
+    ax2.legend()
+    ax2.grid(True, alpha=0.3)
+    for x, y in zip(intervals, write_amp):
+        ax2.annotate(f'{y:.3f}', (x, y), textcoords="offset points", 
+                    xytext=(0,8), ha='center', fontsize=9)
+
+    # Plot 3: NVM Writes
+    ax3.plot(intervals, nvm_writes, 'D-', linewidth=2, markersize=10, color='#F18F01')
+    ax3.set_xlabel('Burst Interval (ms)')
+    ax3.set_ylabel('NVM Writes')
+    ax3.set_title('NVM Writes vs. Burst Interval')
+    ax3.grid(True, alpha=0.3)
+    for x, y in zip(intervals, nvm_writes):
+        ax3.annotate(f'{int(y)}', (x, y), textcoords="offset points", 
+                    xytext=(0,8), ha='center', fontsize=9)
+
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def render_request_latency_analysis(results, output_file, dpi):
+    """Plot: Request Latency Impact"""
+    # Extract latency values
+    latencies = []
+    for r in results:
+        lat_str = r['request_latency']
+        if 'us' in lat_str:
+            latencies.append(float(lat_str.replace('us', '')))
+        elif 'ms' in lat_str:
+            latencies.append(float(lat_str.replace('ms', '')) * 1000)
+
+    efficiency = [r.get('coalescingEfficiency', 0) for r in results]
+    write_amp = [r.get('writeAmplification', 0) for r in results]
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+
+    # Plot 1: Efficiency vs Latency
+    ax1.errorbar(latencies, efficiency, yerr=_ci(results, 'coalescingEfficiency'),
+                 fmt='o-', linewidth=2, markersize=10, capsize=4, color='#2E86AB')
+    ax1.set_xlabel('Request Latency (μs)')
+    ax1.set_ylabel('Coalescing Efficiency (%)')
+    ax1.set_title('Coalescing Efficiency vs. Request Spacing')
+    ax1.grid(True, alpha=0.3)
+    for x, y in zip(latencies, efficiency):
+        ax1.annotate(f'{y:.1f}%', (x, y), textcoords="offset points", 
+                    xytext=(0,8), ha='center', fontsize=9)
+
+    # Plot 2: Write Amplification vs Latency
+    ax2.errorbar(latencies, write_amp, yerr=_ci(results, 'writeAmplification'),
+                 fmt='s-', linewidth=2, markersize=10, capsize=4, color='#A23B72')
+    ax2.set_xlabel('Request Latency (μs)')
+    ax2.set_ylabel('Write Amplification')
+    ax2.set_title('Write Amplification vs. Request Spacing')
+    ax2.axhline(y=0.25, color='green', linestyle='--', alpha=0.5, label='Ideal (8B→64B)')
+    ax2.axhline(y=1.0, color='red', linestyle='--', alpha=0.5, label='No Coalescing')
+    ax2.legend()
+    ax2.grid(True, alpha=0.3)
+    for x, y in zip(latencies, write_amp):
+        ax2.annotate(f'{y:.3f}', (x, y), textcoords="offset points", 
+                    xytext=(0,8), ha='center', fontsize=9)
+
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def render_mixed_workloads(results, output_file, dpi):
+    """Plot: Mixed Workload Comparison"""
+    workloads = [r.get('name', f"Workload {i}") for i, r in enumerate(results, 1)]
+    efficiency = [r.get('coalescingEfficiency', 0) for r in results]
+    write_amp = [r.get('writeAmplification', 0) for r in results]
+    nvm_writes = [r.get('nvmWrites', 0) for r in results]
+    requests = [r.get('requestsSent', 0) for r in results]
+
+    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(14, 10))
+
+    colors = ['#2E86AB', '#A23B72', '#F18F01', '#6A994E']
+
+    # Plot 1: Efficiency Comparison
+    bars1 = ax1.bar(workloads, efficiency, color=colors[:len(workloads)], alpha=0.8,
+                    yerr=_ci(results, 'coalescingEfficiency'), capsize=4)
+    ax1.set_ylabel('Coalescing Efficiency (%)')
+    ax1.set_title('Coalescing Efficiency by Workload')
+    ax1.set_ylim([0, 105])
+    ax1.grid(True, alpha=0.3, axis='y')
+    for bar, val in zip(bars1, efficiency):
+        height = bar.get_height()
+        ax1.text(bar.get_x() + bar.get_width()/2., height,
+                f'{val:.1f}%', ha='center', va='bottom', fontsize=10)
+
+    # Plot 2: Write Amplification
+    bars2 = ax2.bar(workloads, write_amp, color=colors[:len(workloads)], alpha=0.8,
+                    yerr=_ci(results, 'writeAmplification'), capsize=4)
+    ax2.set_ylabel('Write Amplification')
+    ax2.set_title('Write Amplification by Workload')
+    ax2.axhline(y=0.25, color='green', linestyle='--', alpha=0.5, label='Ideal')
+    ax2.axhline(y=1.0, color='red', linestyle='--', alpha=0.5, label='No Coalescing')
+    ax2.legend()
+    ax2.grid(True, alpha=0.3, axis='y')
+    for bar, val in zip(bars2, write_amp):
+        height = bar.get_height()
+        ax2.text(bar.get_x() + bar.get_width()/2., height,
+                f'{val:.3f}', ha='center', va='bottom', fontsize=10)
+
+    # Plot 3: Traffic Comparison
+    x = np.arange(len(workloads))
+    width = 0.35
+    bars3a = ax3.bar(x - width/2, requests, width, label='Requests', color='#F18F01', alpha=0.7)
+    bars3b = ax3.bar(x + width/2, nvm_writes, width, label='NVM Writes', color='#2E86AB', alpha=0.7)
+    ax3.set_ylabel('Write Count')
+    ax3.set_title('Traffic Comparison (Requests vs. NVM Writes)')
+    ax3.set_xticks(x)
+    ax3.set_xticklabels(workloads)
+    ax3.legend()
+    ax3.grid(True, alpha=0.3, axis='y')
+
+    # Plot 4: Reduction Factor
+    reduction = [req / (nvm + 1) for req, nvm in zip(requests, nvm_writes)]
+    bars4 = ax4.bar(workloads, reduction, color=colors[:len(workloads)], alpha=0.8)
+    ax4.set_ylabel('Traffic Reduction Factor')
+    ax4.set_title('PCB Traffic Reduction by Workload')
+    ax4.axhline(y=8.0, color='green', linestyle='--', alpha=0.5, label='Ideal (8×)')
+    ax4.legend()
+    ax4.grid(True, alpha=0.3, axis='y')
+    for bar, val in zip(bars4, reduction):
+        height = bar.get_height()
+        ax4.text(bar.get_x() + bar.get_width()/2., height,
+                f'{val:.1f}×', ha='center', va='bottom', fontsize=10)
+
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def render_summary_table(all_results, output_file, dpi):
+    """Generate comprehensive summary table"""
+    fig, ax = plt.subplots(figsize=(16, 10))
+    ax.axis('tight')
+    ax.axis('off')
+
+    # Create table data
+    table_data = [
+        ['Experiment', 'Configuration', 'Requests', 'Efficiency (%)', 'Write Amp', 'NVM Writes', 'Reduction']
+    ]
+
+    for exp_id, results in all_results.items():
+        if not results:
+            continue
+        exp_name = exp_id.replace('_', ' ').replace('exp', 'Exp').title()
+
+        for result in results:
+            name = result.get('name', '')
+            burst_size = result.get('burst_size', '-')
+            burst_interval = result.get('burst_interval', '-')
+            request_latency = result.get('request_latency', '-')
+
+            config = f"BS:{burst_size}, BI:{burst_interval}, RL:{request_latency}"
+            if name:
+                config = f"{name}: {config}"
+
+            requests = f"{int(result.get('requestsSent', 0))}"
+            efficiency = f"{result.get('coalescingEfficiency', 0):.2f}"
+            write_amp = f"{result.get('writeAmplification', 0):.3f}"
+            nvm_writes = f"{int(result.get('nvmWrites', 0))}"
+            reduction = f"{result.get('requestsSent', 0) / (result.get('nvmWrites', 1)):.1f}×"
+
+            table_data.append([
+                exp_name,
+                config,
+                requests,
+                efficiency,
+                write_amp,
+                nvm_writes,
+                reduction
+            ])
+
+    table = ax.table(cellText=table_data, cellLoc='left', loc='center',
+                    colWidths=[0.15, 0.30, 0.10, 0.10, 0.10, 0.10, 0.10])
+    table.auto_set_font_size(False)
+    table.set_fontsize(8)
+    table.scale(1, 2.5)
+
+    # Style header row
+    for i in range(len(table_data[0])):
+        table[(0, i)].set_facecolor('#2E86AB')
+        table[(0, i)].set_text_props(weight='bold', color='white')
+
+    # Alternate row colors
+    for i in range(1, len(table_data)):
+        for j in range(len(table_data[0])):
+            if i % 2 == 0:
+                table[(i, j)].set_facecolor('#f0f0f0')
+
+    plt.title('Thoth PCB Coalescing - Comprehensive Experiment Results', 
+             fontsize=18, weight='bold', pad=20)
+
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+# ============================================================================
+# Stride/rate-era experiment figures (plot_results.py)
+# ============================================================================
+
+def render_legacy_stride_analysis(results, output_file, dpi):
+    """Plot: Coalescing Efficiency vs. Burst Size"""
+    burst_sizes = [r['burst_size'] for r in results]
+    efficiency = [r.get('coalescingEfficiency', 0) for r in results]
+    write_amp = [r.get('writeAmplification', 0) for r in results]
+    requests_sent = [r.get('requestsSent', 0) for r in results]
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+
+    # Plot 1: Coalescing Efficiency
+    ax1.plot(burst_sizes, efficiency, 'o-', linewidth=2, markersize=8, color='#2E86AB')
+    ax1.set_xlabel('Burst Size (requests/burst)')
+    ax1.set_ylabel('Coalescing Efficiency (%)')
+    ax1.set_title('Coalescing Efficiency vs. Burst Size')
+    ax1.grid(True, alpha=0.3)
+
+    # Annotate values
+    for x, y in zip(burst_sizes, efficiency):
+        ax1.annotate(f'{y:.1f}%', (x, y), textcoords="offset points", 
+                    xytext=(0,10), ha='center', fontsize=9)
+
+    # Plot 2: Requests Sent vs Write Amplification
+    ax2_twin = ax2.twinx()
+    l1 = ax2.plot(burst_sizes, requests_sent, 's-', linewidth=2, markersize=8, 
+                 color='#F18F01', label='Requests Sent')
+    l2 = ax2_twin.plot(burst_sizes, write_amp, 'D-', linewidth=2, markersize=8, 
+                      color='#A23B72', label='Write Amplification')
+    ax2.set_xlabel('Burst Size (requests/burst)')
+    ax2.set_ylabel('Requests Sent', color='#F18F01')
+    ax2_twin.set_ylabel('Write Amplification', color='#A23B72')
+    ax2.set_title('Traffic Load vs. Write Amplification')
+    ax2.grid(True, alpha=0.3)
+    ax2.tick_params(axis='y', labelcolor='#F18F01')
+    ax2_twin.tick_params(axis='y', labelcolor='#A23B72')
+
+    # Combined legend
+    lines = l1 + l2
+    labels = [l.get_label() for l in lines]
+    ax2.legend(lines, labels, loc='upper left')
+
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def render_legacy_request_scaling(results, output_file, dpi):
+    """Plot: System Scaling with Request Count"""
+    requests = [r['max_requests'] for r in results]
+    total_partials = [r.get('pcbTotalPartials', 0) for r in results]
+    nvm_writes = [r.get('nvmWrites', 0) for r in results]
+    coalesced = [r.get('pcbCoalescedBlocks', 0) for r in results]
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+
+    # Plot 1: Traffic Reduction
+    ax1.plot(requests, total_partials, 'o-', linewidth=2, markersize=8, 
+            label='Partial Writes (8B)', color='#F18F01')
+    ax1.plot(requests, nvm_writes, 's-', linewidth=2, markersize=8, 
+            label='NVM Writes (After PCB)', color='#2E86AB')
+    ax1.set_xlabel('Number of Requests')
+    ax1.set_ylabel('Write Count')
+    ax1.set_title('NVM Traffic Reduction via PCB')
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+    ax1.set_yscale('log')
+
+    # Plot 2: Reduction Factor
+    reduction = [tp / (nw + 1) for tp, nw in zip(total_partials, nvm_writes)]
+    ax2.plot(requests, reduction, 'D-', linewidth=2, markersize=8, color='#6A994E')
+    ax2.set_xlabel('Number of Requests')
+    ax2.set_ylabel('Traffic Reduction Factor')
+    ax2.set_title('PCB Traffic Reduction Factor')
+    ax2.grid(True, alpha=0.3)
+    ax2.axhline(y=8.0, color='green', linestyle='--', alpha=0.5, label='Ideal (8×)')
+    ax2.legend()
+
+    # Annotate values
+    for x, y in zip(requests, reduction):
+        ax2.annotate(f'{y:.1f}×', (x, y), textcoords="offset points", 
+                    xytext=(0,10), ha='center', fontsize=9)
+
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def render_legacy_traffic_rate(results, output_file, dpi):
+    """Plot: Traffic Rate Impact on Performance"""
+    rates = [int(r['rate'].replace('GB/s', '')) for r in results]
+    efficiency = [r.get('coalescingEfficiency', 0) for r in results]
+    overflow_rate = [r.get('overflowRate', 0) for r in results]
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+
+    # Plot 1: Efficiency vs. Rate
+    ax1.plot(rates, efficiency, 'o-', linewidth=2, markersize=8, color='#2E86AB')
+    ax1.set_xlabel('Traffic Rate (GB/s)')
+    ax1.set_ylabel('Coalescing Efficiency (%)')
+    ax1.set_title('Coalescing Efficiency vs. Traffic Rate')
+    ax1.grid(True, alpha=0.3)
+    ax1.set_ylim([0, 105])
+
+    # Annotate values
+    for x, y in zip(rates, efficiency):
+        ax1.annotate(f'{y:.1f}%', (x, y), textcoords="offset points", 
+                    xytext=(0,10), ha='center', fontsize=9)
+
+    # Plot 2: Overflow Rate
+    ax2.plot(rates, overflow_rate, 's-', linewidth=2, markersize=8, color='#C1121F')
+    ax2.set_xlabel('Traffic Rate (GB/s)')
+    ax2.set_ylabel('Overflow Rate (%)')
+    ax2.set_title('PCB Overflow Rate vs. Traffic Rate')
+    ax2.grid(True, alpha=0.3)
+
+    # Annotate values
+    for x, y in zip(rates, overflow_rate):
+        ax2.annotate(f'{y:.2f}%', (x, y), textcoords="offset points", 
+                    xytext=(0,10), ha='center', fontsize=9)
+
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def render_legacy_mixed_patterns(results, output_file, dpi):
+    """Plot: Comparison of Different Access Patterns"""
+    patterns = [r.get('name', f"Pattern {i}") for i, r in enumerate(results, 1)]
+    efficiency = [r.get('coalescingEfficiency', 0) for r in results]
+    write_amp = [r.get('writeAmplification', 0) for r in results]
+    nvm_writes = [r.get('nvmWrites', 0) for r in results]
+
+    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(14, 10))
+
+    # Plot 1: Coalescing Efficiency (Bar Chart)
+    colors = ['#2E86AB', '#A23B72', '#F18F01', '#6A994E']
+    bars1 = ax1.bar(patterns, efficiency, color=colors, alpha=0.8)
+    ax1.set_ylabel('Coalescing Efficiency (%)')
+    ax1.set_title('Coalescing Efficiency by Access Pattern')
+    ax1.set_ylim([0, 105])
+    ax1.grid(True, alpha=0.3, axis='y')
+
+    # Add value labels on bars
+    for bar, val in zip(bars1, efficiency):
+        height = bar.get_height()
+        ax1.text(bar.get_x() + bar.get_width()/2., height,
+                f'{val:.1f}%', ha='center', va='bottom', fontsize=10)
+
+    # Plot 2: Write Amplification
+    bars2 = ax2.bar(patterns, write_amp, color=colors, alpha=0.8)
+    ax2.set_ylabel('Write Amplification')
+    ax2.set_title('Write Amplification by Access Pattern')
+    ax2.axhline(y=1.0, color='red', linestyle='--', alpha=0.5, label='No Coalescing')
+    ax2.axhline(y=0.25, color='green', linestyle='--', alpha=0.5, label='Ideal')
+    ax2.legend()
+    ax2.grid(True, alpha=0.3, axis='y')
+
+    # Add value labels
+    for bar, val in zip(bars2, write_amp):
+        height = bar.get_height()
+        ax2.text(bar.get_x() + bar.get_width()/2., height,
+                f'{val:.3f}', ha='center', va='bottom', fontsize=10)
+
+    # Plot 3: NVM Writes Comparison
+    bars3 = ax3.bar(patterns, nvm_writes, color=colors, alpha=0.8)
+    ax3.set_ylabel('NVM Write Count')
+    ax3.set_title('NVM Writes by Access Pattern')
+    ax3.grid(True, alpha=0.3, axis='y')
+
+    # Add value labels
+    for bar, val in zip(bars3, nvm_writes):
+        height = bar.get_height()
+        ax3.text(bar.get_x() + bar.get_width()/2., height,
+                f'{int(val)}', ha='center', va='bottom', fontsize=10)
+
+    # Plot 4: Summary Radar Chart (if possible)
+    if len(results) >= 3:
+        categories = ['Efficiency\n(%)', 'Write Amp\n(lower better)', 
+                     'NVM Writes\n(lower better)']
+
+        # Normalize metrics to 0-100 scale
+        norm_efficiency = efficiency
+        norm_write_amp = [100 - min(wa * 100, 100) for wa in write_amp]  # Invert
+        max_writes = max(nvm_writes) if max(nvm_writes) > 0 else 1
+        norm_nvm = [100 - (w / max_writes * 100) for w in nvm_writes]  # Invert
+
+        angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False).tolist()
+        angles += angles[:1]
+
+        ax4 = plt.subplot(224, projection='polar')
+
+        for i, (pattern, color) in enumerate(zip(patterns, colors)):
+            values = [norm_efficiency[i], norm_write_amp[i], norm_nvm[i]]
+            values += values[:1]
+            ax4.plot(angles, values, 'o-', linewidth=2, label=pattern, color=color)
+            ax4.fill(angles, values, alpha=0.15, color=color)
+
+        ax4.set_xticks(angles[:-1])
+        ax4.set_xticklabels(categories)
+        ax4.set_ylim(0, 100)
+        ax4.set_title('Performance Comparison (Normalized)', pad=20)
+        ax4.legend(loc='upper right', bbox_to_anchor=(1.3, 1.1))
+        ax4.grid(True)
+    else:
+        ax4.text(0.5, 0.5, 'Insufficient data\nfor radar chart', 
+                ha='center', va='center', transform=ax4.transAxes)
+
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def render_legacy_summary_table(all_results, output_file, dpi):
+    """Generate a summary table of all experiments"""
+    fig, ax = plt.subplots(figsize=(14, 8))
+    ax.axis('tight')
+    ax.axis('off')
+
+    # Create table data
+    table_data = [
+        ['Experiment', 'Config', 'Efficiency (%)', 'Write Amp', 'NVM Writes', 'PLUB Overflow (%)']
+    ]
+
+    for exp_id, results in all_results.items():
+        if not results:
+            continue
+        exp_name = exp_id.replace('_', ' ').title()
+
+        for i, result in enumerate(results, 1):
+            stride = result.get('stride', 'N/A')
+            rate = result.get('rate', 'N/A')
+            requests = result.get('max_requests', 'N/A')
+
+            config = f"Stride:{stride}, Rate:{rate}, Req:{requests}"
+            efficiency = f"{result.get('coalescingEfficiency', 0):.2f}"
+            write_amp = f"{result.get('writeAmplification', 0):.3f}"
+            nvm_writes = f"{int(result.get('nvmWrites', 0))}"
+            overflow = f"{result.get('overflowRate', 0):.2f}"
+
+            table_data.append([
+                f"{exp_name} #{i}",
+                config,
+                efficiency,
+                write_amp,
+                nvm_writes,
+                overflow
+            ])
+
+    table = ax.table(cellText=table_data, cellLoc='left', loc='center',
+                    colWidths=[0.2, 0.35, 0.15, 0.1, 0.1, 0.1])
+    table.auto_set_font_size(False)
+    table.set_fontsize(8)
+    table.scale(1, 2)
+
+    # Style header row
+    for i in range(len(table_data[0])):
+        table[(0, i)].set_facecolor('#2E86AB')
+        table[(0, i)].set_text_props(weight='bold', color='white')
+
+    # Alternate row colors
+    for i in range(1, len(table_data)):
+        for j in range(len(table_data[0])):
+            if i % 2 == 0:
+                table[(i, j)].set_facecolor('#f0f0f0')
+
+    plt.title('Experiment Results Summary', fontsize=16, weight='bold', pad=20)
+
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+# ============================================================================
+# Benchmark figures
+# ============================================================================
+
+def render_benchmark_efficiency(data, output_file, dpi):
+    """Figure 1: Coalescing Efficiency Comparison"""
+    benchmarks = data['benchmarks']
+    fig, ax = plt.subplots(figsize=(8, 5))
+
+    efficiencies = _bench_series(data, 'coalescingEfficiency')
+    bars = ax.bar(range(len(benchmarks)), efficiencies, color=BENCHMARK_COLORS, alpha=0.8, edgecolor='black',
+                  yerr=_bench_ci(data, 'coalescingEfficiency'), capsize=4)
+
+    # Add value labels on bars
+    for i, (bar, val) in enumerate(zip(bars, efficiencies)):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
+                f'{val:.2f}%', ha='center', va='bottom', fontweight='bold')
+
+    ax.set_xlabel('Benchmark Workload', fontweight='bold')
+    ax.set_ylabel('Coalescing Efficiency (%)', fontweight='bold')
+    ax.set_title('PCB Coalescing Efficiency Across Benchmarks', fontweight='bold', pad=15)
+    ax.set_xticks(range(len(benchmarks)))
+    ax.set_xticklabels(_bench_labels(data))
+    ax.set_ylim(0, 110)
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+    ax.axhline(y=95, color='red', linestyle='--', alpha=0.5, label='Paper Target (95%)')
+    ax.legend()
+
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def render_benchmark_write_amplification(data, output_file, dpi):
+    """Figure 2: Write Amplification Comparison"""
+    benchmarks = data['benchmarks']
+    fig, ax = plt.subplots(figsize=(8, 5))
+
+    write_amps = _bench_series(data, 'writeAmplification')
+    bars = ax.bar(range(len(benchmarks)), write_amps, color=BENCHMARK_COLORS, alpha=0.8, edgecolor='black',
+                  yerr=_bench_ci(data, 'writeAmplification'), capsize=4)
+
+    # Add value labels
+    for i, (bar, val) in enumerate(zip(bars, write_amps)):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 0.01,
+                f'{val:.3f}', ha='center', va='bottom', fontweight='bold')
+
+    ax.set_xlabel('Benchmark Workload', fontweight='bold')
+    ax.set_ylabel('Write Amplification', fontweight='bold')
+    ax.set_title('Write Amplification: NVM Writes vs Expected', fontweight='bold', pad=15)
+    ax.set_xticks(range(len(benchmarks)))
+    ax.set_xticklabels(_bench_labels(data))
+    ax.set_ylim(0, max(write_amps) * 1.3)
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+    ax.axhline(y=1.0, color='red', linestyle='--', alpha=0.5, label='No Amplification (1.0)')
+    ax.legend()
+
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def render_benchmark_traffic_reduction(data, output_file, dpi):
+    """Figure 3: Traffic Reduction"""
+    benchmarks = data['benchmarks']
+    fig, ax = plt.subplots(figsize=(8, 5))
+
+    reductions = _bench_series(data, 'trafficReduction')
+    bars = ax.bar(range(len(benchmarks)), reductions, color=BENCHMARK_COLORS, alpha=0.8, edgecolor='black',
+                  yerr=_bench_ci(data, 'trafficReduction'), capsize=4)
+
+    # Add value labels
+    for i, (bar, val) in enumerate(zip(bars, reductions)):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 2,
+                f'{val:.1f}×', ha='center', va='bottom', fontweight='bold')
+
+    ax.set_xlabel('Benchmark Workload', fontweight='bold')
+    ax.set_ylabel('Traffic Reduction Factor', fontweight='bold')
+    ax.set_title('NVM Write Traffic Reduction Through PCB Coalescing', fontweight='bold', pad=15)
+    ax.set_xticks(range(len(benchmarks)))
+    ax.set_xticklabels(_bench_labels(data))
+    ax.set_ylim(0, max(reductions) * 1.2)
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def render_benchmark_writes_comparison(data, output_file, dpi):
+    """Figure 4: Partial Writes vs NVM Writes"""
+    benchmarks = data['benchmarks']
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    x = np.arange(len(benchmarks))
+    width = 0.35
+
+    partials = _bench_series(data, 'pcbTotalPartials')
+    nvm_writes = _bench_series(data, 'nvmWrites')
+
+    bars1 = ax.bar(x - width/2, partials, width, label='8B Partial Writes',
+                   color='#E63946', alpha=0.8, edgecolor='black')
+    bars2 = ax.bar(x + width/2, nvm_writes, width, label='NVM Writes (64B)',
+                   color='#06A77D', alpha=0.8, edgecolor='black')
+
+    # Add value labels
+    for bars in [bars1, bars2]:
+        for bar in bars:
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., height + 10,
+                    f'{int(height)}', ha='center', va='bottom', fontweight='bold', fontsize=9)
+
+    ax.set_xlabel('Benchmark Workload', fontweight='bold')
+    ax.set_ylabel('Number of Writes', fontweight='bold')
+    ax.set_title('Partial Writes vs Actual NVM Writes', fontweight='bold', pad=15)
+    ax.set_xticks(x)
+    ax.set_xticklabels(_bench_labels(data))
+    ax.legend()
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def render_benchmark_combined_metrics(data, output_file, dpi):
+    """Figure 5: Combined Performance Metrics"""
+    benchmarks = data['benchmarks']
+    efficiencies = _bench_series(data, 'coalescingEfficiency')
+    write_amps = _bench_series(data, 'writeAmplification')
+    reductions = _bench_series(data, 'trafficReduction')
+
+    fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(15, 5))
+
+    # Subplot 1: Efficiency (already in %)
+    ax1.barh(range(len(benchmarks)), efficiencies, color=BENCHMARK_COLORS, alpha=0.8, edgecolor='black')
+    for i, val in enumerate(efficiencies):
+        ax1.text(val + 1, i, f'{val:.1f}%', va='center', fontweight='bold')
+    ax1.set_xlabel('Coalescing Efficiency (%)', fontweight='bold')
+    ax1.set_title('Efficiency', fontweight='bold')
+    ax1.set_yticks(range(len(benchmarks)))
+    ax1.set_yticklabels(_bench_labels(data))
+    ax1.set_xlim(0, 110)
+    ax1.grid(axis='x', alpha=0.3, linestyle='--')
+
+    # Subplot 2: Write Amplification (inverted - lower is better)
+    write_amp_inv = [1/w if w > 0 else 0 for w in write_amps]
+    ax2.barh(range(len(benchmarks)), write_amp_inv, color=BENCHMARK_COLORS, alpha=0.8, edgecolor='black')
+    for i, (val, orig) in enumerate(zip(write_amp_inv, write_amps)):
+        ax2.text(val + 0.5, i, f'{orig:.3f}', va='center', fontweight='bold')
+    ax2.set_xlabel('Inverse Write Amp (Higher is Better)', fontweight='bold')
+    ax2.set_title('Write Efficiency', fontweight='bold')
+    ax2.set_yticks(range(len(benchmarks)))
+    ax2.set_yticklabels([])
+    ax2.grid(axis='x', alpha=0.3, linestyle='--')
+
+    # Subplot 3: Traffic Reduction
+    ax3.barh(range(len(benchmarks)), reductions, color=BENCHMARK_COLORS, alpha=0.8, edgecolor='black')
+    for i, val in enumerate(reductions):
+        ax3.text(val + 2, i, f'{val:.1f}×', va='center', fontweight='bold')
+    ax3.set_xlabel('Traffic Reduction Factor', fontweight='bold')
+    ax3.set_title('NVM Write Savings', fontweight='bold')
+    ax3.set_yticks(range(len(benchmarks)))
+    ax3.set_yticklabels([])
+    ax3.grid(axis='x', alpha=0.3, linestyle='--')
+
+    plt.suptitle('Benchmark Performance Comparison', fontsize=14, fontweight='bold', y=1.02)
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def render_benchmark_block_breakdown(data, output_file, dpi):
+    """Figure 6: Coalesced Blocks Breakdown"""
+    benchmarks = data['benchmarks']
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    x = np.arange(len(benchmarks))
+    width = 0.25
+
+    coalesced = _bench_series(data, 'pcbCoalescedBlocks')
+    flushes = _bench_series(data, 'pcbPartialFlushes')
+    overflows = _bench_series(data, 'pcbOverflows')
+
+    bars1 = ax.bar(x - width, coalesced, width, label='Coalesced Blocks',
+                   color='#06A77D', alpha=0.8, edgecolor='black')
+    bars2 = ax.bar(x, flushes, width, label='Partial Flushes',
+                   color='#F18F01', alpha=0.8, edgecolor='black')
+    bars3 = ax.bar(x + width, overflows, width, label='PLUB Overflows',
+                   color='#E63946', alpha=0.8, edgecolor='black')
+
+    # Add value labels
+    for bars in [bars1, bars2, bars3]:
+        for bar in bars:
+            height = bar.get_height()
+            if height > 0:
+                ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
+                        f'{int(height)}', ha='center', va='bottom', fontweight='bold', fontsize=8)
+
+    ax.set_xlabel('Benchmark Workload', fontweight='bold')
+    ax.set_ylabel('Number of Blocks', fontweight='bold')
+    ax.set_title('PCB Block Processing: Coalesced vs Flushed vs Overflow', fontweight='bold', pad=15)
+    ax.set_xticks(x)
+    ax.set_xticklabels(_bench_labels(data))
+    ax.legend()
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def print_benchmark_summary(data):
+    """Per-benchmark and average metrics, as printed alongside the figures"""
+    results = data['results']
+    print("\n" + "="*70)
+    print("SUMMARY STATISTICS")
+    print("="*70)
+
+    for bench in data['benchmarks']:
+        print(f"\n{BENCHMARK_LABELS.get(bench, bench).upper()}:")
+        print(f"  Partials: {results[bench]['pcbTotalPartials']:,.0f}")
+        print(f"  Coalesced: {results[bench]['pcbCoalescedBlocks']:,.0f}")
+        print(f"  NVM Writes: {results[bench]['nvmWrites']:,.0f}")
+        print(f"  Efficiency: {results[bench]['coalescingEfficiency']:.2f}%")
+        print(f"  Write Amp: {results[bench]['writeAmplification']:.3f}")
+        print(f"  Reduction: {results[bench]['trafficReduction']:.2f}×")
+
+    print("\n" + "="*70)
+    print("AVERAGES:")
+    print(f"  Efficiency: {np.mean(_bench_series(data, 'coalescingEfficiency')):.2f}%")
+    print(f"  Write Amplification: {np.mean(_bench_series(data, 'writeAmplification')):.3f}")
+    print(f"  Traffic Reduction: {np.mean(_bench_series(data, 'trafficReduction')):.2f}×")
+    print("="*70)
+
+# ============================================================================
+# Registry
+# ============================================================================
+
+# Loaders are (kind, arg) specs so figures sharing an input load it once
+FIGURES = {
+    'experiments': [
+        ("figure1_burst_size_analysis.png", ('experiment', 'exp1_burst_size'), render_burst_size_analysis),
+        ("figure2_burst_interval_analysis.png", ('experiment', 'exp2_burst_interval'), render_burst_interval_analysis),
+        ("figure3_request_latency_analysis.png", ('experiment', 'exp3_request_latency'), render_request_latency_analysis),
+        ("figure4_mixed_workloads.png", ('experiment', 'exp4_mixed_workloads'), render_mixed_workloads),
+        ("summary_table.png", ('all_experiments', None), render_summary_table),
+    ],
+    'benchmarks': [
+        ("benchmark_coalescing_efficiency.png", ('benchmarks', None), render_benchmark_efficiency),
+        ("benchmark_write_amplification.png", ('benchmarks', None), render_benchmark_write_amplification),
+        ("benchmark_traffic_reduction.png", ('benchmarks', None), render_benchmark_traffic_reduction),
+        ("benchmark_writes_comparison.png", ('benchmarks', None), render_benchmark_writes_comparison),
+        ("benchmark_combined_metrics.png", ('benchmarks', None), render_benchmark_combined_metrics),
+        ("benchmark_block_breakdown.png", ('benchmarks', None), render_benchmark_block_breakdown),
+    ],
+    'legacy': [
+        ("figure1_burst_size_analysis.png", ('experiment', 'exp1_burst_size'), render_legacy_stride_analysis),
+        ("figure2_request_scaling.png", ('experiment', 'exp2_request_count'), render_legacy_request_scaling),
+        ("figure3_traffic_rate.png", ('experiment', 'exp3_traffic_rate'), render_legacy_traffic_rate),
+        ("figure4_mixed_patterns.png", ('experiment', 'exp4_mixed_patterns'), render_legacy_mixed_patterns),
+        ("summary_table.png", ('all_experiments', None), render_legacy_summary_table),
+    ],
+}
+
+GROUP_DIRS = {
+    'experiments': Path("experiment_results") / "plots",
+    'benchmarks': Path("benchmark_results"),
+    'legacy': Path("experiment_results") / "plots" / "legacy",
+}
+
+GROUP_STYLES = {
+    'experiments': PAPER_STYLE,
+    'benchmarks': BENCHMARK_STYLE,
+    'legacy': PAPER_STYLE,
+}
+
+DEFAULT_GROUPS = ['experiments', 'benchmarks']
+
+
+def load_input(store, spec):
+    """Figure input as plain JSON-able data, or None if nothing is stored"""
+    kind, arg = spec
+    if kind == 'experiment':
+        return store.experiment_results(arg)['results'] or None
+    if kind == 'all_experiments':
+        all_results = {exp_id: store.experiment_results(exp_id)['results']
+                       for exp_id in store.experiments(SUITE_EXPERIMENT)}
+        return all_results or None
+    if kind == 'benchmarks':
+        results = store.benchmark_results()
+        return {'benchmarks': list(results), 'results': results} if results else None
+    raise ValueError(f"unknown figure input {spec!r}")
+
+
+def figure_hash(render, data, style, dpi):
+    """Digest of everything that determines a figure's pixels"""
+    code = inspect.getsource(render) + "".join(
+        inspect.getsource(helper) for helper in SHARED_HELPERS)
+    payload = json.dumps({'data': data, 'style': style, 'dpi': dpi,
+                          'code': code, 'matplotlib': matplotlib.__version__},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _read_hashes(out_dir):
+    try:
+        with open(out_dir / HASH_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_hashes(out_dir, hashes):
+    tmp = out_dir / (HASH_FILE + ".tmp")
+    with open(tmp, 'w') as f:
+        json.dump(hashes, f, indent=2, sort_keys=True)
+    os.replace(tmp, out_dir / HASH_FILE)
+
+
+def _render_job(render, data, style, output_file, dpi):
+    """Draw one figure in a worker; returns an error string or None"""
+    try:
+        plt.rcdefaults()
+        if style['base']:
+            plt.style.use(style['base'])
+        plt.rcParams.update(style['rc'])
+        render(data, output_file, dpi)
+        return None
+    except Exception as e:
+        plt.close('all')
+        return f"{type(e).__name__}: {e}"
+
+
+def run_pipeline(groups=DEFAULT_GROUPS, preview=False, jobs=None,
+                 force=False, only=None):
+    """Render the stale figures of groups; returns the number that failed"""
+    store = open_store()
+    dpi = PREVIEW_DPI if preview else FULL_DPI
+    inputs = {}
+    hashes = {}
+    todo = []
+    skipped = 0
+
+    for group in groups:
+        out_dir = GROUP_DIRS[group] / "preview" if preview else GROUP_DIRS[group]
+        out_dir.mkdir(parents=True, exist_ok=True)
+        if out_dir not in hashes:
+            hashes[out_dir] = _read_hashes(out_dir)
+        style = GROUP_STYLES[group]
+
+        for filename, spec, render in FIGURES[group]:
+            if only and not any(pattern in filename for pattern in only):
+                continue
+            if spec not in inputs:
+                inputs[spec] = load_input(store, spec)
+            data = inputs[spec]
+            if data is None:
+                print(f"⚠️  No results stored for: {filename}")
+                continue
+
+            output_file = out_dir / filename
+            digest = figure_hash(render, data, style, dpi)
+            if not force and output_file.exists() and \
+               hashes[out_dir].get(filename) == digest:
+                skipped += 1
+                continue
+            todo.append((out_dir, filename, digest,
+                         (render, data, style, str(output_file), dpi)))
+
+    print(f"📊 {len(todo)} figure(s) to render at {dpi} dpi, "
+          f"{skipped} unchanged")
+
+    failed = 0
+
+    def finish(out_dir, filename, digest, error):
+        nonlocal failed
+        if error:
+            failed += 1
+            hashes[out_dir].pop(filename, None)
+            print(f"❌ {out_dir / filename}: {error}")
+        else:
+            hashes[out_dir][filename] = digest
+            print(f"✅ Saved: {out_dir / filename}")
+        _write_hashes(out_dir, hashes[out_dir])
+
+    workers = min(jobs or os.cpu_count() or 1, len(todo))
+    if workers <= 1:
+        for out_dir, filename, digest, job in todo:
+            finish(out_dir, filename, digest, _render_job(*job))
+    elif todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_render_job, *job): (out_dir, filename, digest)
+                       for out_dir, filename, digest, job in todo}
+            for future in as_completed(futures):
+                finish(*futures[future], future.result())
+
+    if 'benchmarks' in groups and inputs.get(('benchmarks', None)):
+        print_benchmark_summary(inputs[('benchmarks', None)])
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render Thoth result figures")
+    parser.add_argument("--groups", nargs="+", choices=sorted(FIGURES),
+                        default=DEFAULT_GROUPS, help="Figure groups to render")
+    parser.add_argument("--preview", action="store_true",
+                        help=f"Render at {PREVIEW_DPI} dpi into preview/ subdirectories")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Worker processes (default: one per CPU)")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-render even figures whose inputs are unchanged")
+    parser.add_argument("--only", nargs="+", metavar="PATTERN",
+                        help="Only figures whose file name contains a pattern")
+    args = parser.parse_args(argv)
+
+    print("\n" + "="*70)
+    print("📊 GENERATING PUBLICATION-QUALITY PLOTS" +
+          (" (PREVIEW)" if args.preview else ""))
+    print("="*70 + "\n")
+
+    failed = run_pipeline(args.groups, args.preview, args.jobs, args.force,
+                          args.only)
+
+    print("\n" + "="*70)
+    print("🎉 ALL PLOTS GENERATED!" if not failed else f"⚠️  {failed} figure(s) failed")
+    for group in args.groups:
+        out_dir = GROUP_DIRS[group] / "preview" if args.preview else GROUP_DIRS[group]
+        print(f"   {group}: {out_dir}")
+    print("="*70 + "\n")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,696 @@
+#!/usr/bin/env python3
+"""
+Append-only results store for Thoth experiments and benchmarks
+
+Every simulation run becomes one row in a single SQLite database, together
+with its parameters, parsed statistics, host metrics and the code identity
+(git revision, dirty flag, gem5 binary) it was produced with. Statistics
+use one canonical camelCase schema regardless of which runner produced
+them; snake_case keys from older runs are renamed on insert.
+
+Parameters, stats and host metrics are stored narrow (run_id, name, value)
+and indexed by name, so fetching one metric across thousands of runs reads
+only that metric's rows instead of loading and joining JSON blobs.
+
+Usage:
+    python3 results_store.py import-legacy     # pull in the old JSON files
+    python3 results_store.py list              # one line per stored run
+    python3 results_store.py show exp1_burst_size
+    python3 results_store.py cost [experiment]  # rank runs by host cost
+"""
+
+import json
+import math
+import os
+import re
+import select
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Helpers shared with the gem5 configs live in configs/common
+sys.path.insert(0, str(Path(__file__).resolve().parent / "configs"))
+from common.ThothMetrics import rusage_metrics, t_critical_95
+
+RESULTS_DB = "thoth_results.sqlite"
+
+SUITE_EXPERIMENT = "experiment"
+SUITE_BENCHMARK = "benchmark"
+SUITE_SPEED = "speed"
+
+# snake_case keys written by run_benchmarks.py before the store existed
+LEGACY_STAT_NAMES = {
+    "pcb_total_partials": "pcbTotalPartials",
+    "pcb_coalesced_blocks": "pcbCoalescedBlocks",
+    "pcb_overflows": "pcbOverflows",
+    "pcb_flushes": "pcbPartialFlushes",
+    "nvm_writes": "nvmWrites",
+    "coalescing_efficiency": "coalescingEfficiency",
+    "overflow_rate": "overflowRate",
+    "write_amplification": "writeAmplification",
+    "plub_overhead": "plubOverhead",
+    "traffic_reduction": "trafficReduction",
+    "simulation_ticks": "simTicks",
+}
+
+# Keys runners mix into their stats dicts that are really host metrics
+HOST_METRIC_NAMES = {
+    "elapsed_time": "hostWallSeconds",
+}
+
+# gem5's own host statistics; recorded as host metrics, not results
+HOST_STATS = ("hostSeconds", "hostTickRate", "hostMemory", "hostInstRate",
+              "hostOpRate")
+
+# Host metric a configuration's simulation cost is ranked by, in order of
+# preference (child CPU time is immune to other load on the machine)
+COST_METRICS = ("hostCpuSeconds", "hostSeconds", "hostWallSeconds")
+
+# Params that identify a run rather than vary the model
+IDENTITY_PARAMS = ("name", "benchmark", "seed", "run.seed", "sweep_seeds")
+
+# Traffic-generator knobs that describe the run rather than its outcome
+PARAM_NAMES = ("burst_size", "burst_interval", "request_latency")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    suite       TEXT NOT NULL,
+    experiment  TEXT NOT NULL,
+    variation   TEXT NOT NULL,
+    created     REAL NOT NULL,
+    status      TEXT NOT NULL,
+    outdir      TEXT,
+    git_rev     TEXT,
+    git_dirty   INTEGER,
+    gem5_binary TEXT,
+    gem5_mtime  REAL
+);
+CREATE TABLE IF NOT EXISTS params (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    name   TEXT NOT NULL,
+    value  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stats (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    name   TEXT NOT NULL,
+    value  REAL
+);
+CREATE TABLE IF NOT EXISTS host (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    name   TEXT NOT NULL,
+    value  REAL
+);
+CREATE INDEX IF NOT EXISTS runs_by_experiment ON runs(suite, experiment);
+CREATE INDEX IF NOT EXISTS params_by_name ON params(name, run_id);
+CREATE INDEX IF NOT EXISTS stats_by_name ON stats(name, run_id);
+CREATE INDEX IF NOT EXISTS host_by_name ON host(name, run_id);
+"""
+
+
+def summarize(values):
+    """Mean, sample stddev and 95% CI half-width of repeated measurements"""
+    values = [v for v in values if v is not None]
+    n = len(values)
+    if n == 0:
+        return {"mean": None, "std": None, "ci95": None, "n": 0}
+    mean = sum(values) / n
+    if n == 1:
+        return {"mean": mean, "std": 0.0, "ci95": 0.0, "n": 1}
+    std = math.sqrt(sum((v - mean) ** 2 for v in values) / (n - 1))
+    return {"mean": mean, "std": std,
+            "ci95": t_critical_95(n - 1) * std / math.sqrt(n), "n": n}
+
+
+def canonical_stat_name(name):
+    """Map a runner's stat key onto the camelCase schema"""
+    return LEGACY_STAT_NAMES.get(name, name)
+
+
+def code_identity(gem5_binary=None):
+    """Git revision and dirty flag of the working tree, plus the binary"""
+    identity = {"git_rev": None, "git_dirty": None,
+                "gem5_binary": gem5_binary, "gem5_mtime": None}
+    try:
+        identity["git_rev"] = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+            check=True).stdout.strip()
+        porcelain = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, check=True).stdout
+        identity["git_dirty"] = int(bool(porcelain.strip()))
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    if gem5_binary and os.path.exists(gem5_binary):
+        identity["gem5_mtime"] = os.path.getmtime(gem5_binary)
+    return identity
+
+
+def read_stats_file(stats_file):
+    """All scalar statistics from the first dump of a gem5 stats.txt
+
+    Returns {full.stat.name: value}. Histogram buckets and other
+    multi-column lines are skipped.
+    """
+    stats = {}
+    if not os.path.exists(stats_file):
+        return stats
+
+    line_re = re.compile(r'^(\S+)\s+(-?[\d.]+(?:e[+-]?\d+)?|nan|inf)\s')
+    with open(stats_file) as f:
+        for line in f:
+            if line.startswith("---------- End Simulation Statistics"):
+                break
+            match = line_re.match(line)
+            if match:
+                try:
+                    stats[match.group(1)] = float(match.group(2))
+                except ValueError:
+                    pass
+    return stats
+
+
+def run_measured(cmd, timeout=None, on_line=None, poll=1.0):
+    """Run cmd to completion, capturing output and its resource usage
+
+    Returns (exit code, stdout, stderr, host metrics). The child is reaped
+    with wait4() so peak RSS and CPU time are its own, not the running
+    RUSAGE_CHILDREN totals of every simulation this process has started.
+    Raises subprocess.TimeoutExpired after killing the child, like
+    subprocess.run().
+
+    With on_line set, stdout is streamed while the child runs: on_line is
+    called with each complete line as it arrives, and with None whenever
+    poll seconds pass without output, so a caller can refresh a display
+    or notice a silent run.
+    """
+    timed_out = threading.Event()
+
+    def kill(proc):
+        timed_out.set()
+        proc.kill()
+
+    start = time.time()
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE if on_line else out, stderr=err)
+        timer = threading.Timer(timeout, kill, (proc,)) if timeout else None
+        if timer:
+            timer.start()
+        try:
+            if on_line:
+                _stream_lines(proc.stdout, out, on_line, poll)
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+        except BaseException:
+            proc.kill()
+            proc.wait()
+            raise
+        finally:
+            if timer:
+                timer.cancel()
+            if proc.stdout:
+                proc.stdout.close()
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+
+        host = rusage_metrics(usage)
+        host["hostWallSeconds"] = time.time() - start
+        out.seek(0)
+        err.seek(0)
+        return (proc.returncode, out.read().decode(errors="replace"),
+                err.read().decode(errors="replace"), host)
+
+
+def _stream_lines(pipe, copy, on_line, poll):
+    # Read until EOF, keeping a copy of everything for the caller
+    fd = pipe.fileno()
+    pending = b""
+    while True:
+        ready, _, _ = select.select([fd], [], [], poll)
+        if not ready:
+            on_line(None)
+            continue
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            break
+        copy.write(chunk)
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            on_line(line.decode(errors="replace"))
+    if pending:
+        on_line(pending.decode(errors="replace"))
+
+
+def split_host_stats(stats):
+    """Move gem5's host statistics out of stats into a host-metric dict
+
+    Also derives hostSlowdown, host seconds per simulated second, which
+    stays comparable between runs of different simulated length.
+    """
+    host = {name: stats.pop(name) for name in HOST_STATS if name in stats}
+    sim_seconds = stats.get("simSeconds")
+    if host.get("hostSeconds") and sim_seconds:
+        host["hostSlowdown"] = host["hostSeconds"] / sim_seconds
+    return host
+
+
+class ResultsStore:
+    """One SQLite database holding every Thoth run"""
+
+    def __init__(self, path=RESULTS_DB):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def record_run(self, suite, experiment, variation, params=None,
+                   stats=None, host=None, status="ok", outdir=None,
+                   identity=None, created=None):
+        """Append one run and return its run_id
+
+        params values keep their Python type (JSON-encoded); stats and
+        host metrics must be numeric. Stat keys are canonicalised, and
+        host-metric keys found in stats (including gem5's hostSeconds,
+        hostTickRate and hostMemory) are moved to the host table.
+        """
+        params = dict(params or {})
+        stats = dict(stats or {})
+        host = dict(host or {})
+        identity = identity or code_identity()
+
+        for name, value in split_host_stats(stats).items():
+            host.setdefault(name, value)
+        for key in list(stats):
+            if key in HOST_METRIC_NAMES:
+                host.setdefault(HOST_METRIC_NAMES[key], stats.pop(key))
+            elif key in PARAM_NAMES or key == "name":
+                params.setdefault(key, stats.pop(key))
+
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO runs (suite, experiment, variation, created,"
+                " status, outdir, git_rev, git_dirty, gem5_binary,"
+                " gem5_mtime) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (suite, experiment, variation,
+                 created if created is not None else time.time(),
+                 status, str(outdir) if outdir else None,
+                 identity.get("git_rev"), identity.get("git_dirty"),
+                 identity.get("gem5_binary"), identity.get("gem5_mtime")))
+            run_id = cur.lastrowid
+
+            self.conn.executemany(
+                "INSERT INTO params (run_id, name, value) VALUES (?, ?, ?)",
+                [(run_id, k, json.dumps(v)) for k, v in params.items()])
+            self.conn.executemany(
+                "INSERT INTO stats (run_id, name, value) VALUES (?, ?, ?)",
+                [(run_id, canonical_stat_name(k), _number(v))
+                 for k, v in stats.items()])
+            self.conn.executemany(
+                "INSERT INTO host (run_id, name, value) VALUES (?, ?, ?)",
+                [(run_id, k, _number(v)) for k, v in host.items()])
+        return run_id
+
+    def import_legacy_json(self, experiment_dir="experiment_results",
+                           benchmark_dir="benchmark_results"):
+        """Append the pre-store JSON result files; returns runs imported"""
+        imported = 0
+        identity = {"git_rev": None, "git_dirty": None,
+                    "gem5_binary": None, "gem5_mtime": None}
+
+        for results_file in sorted(Path(experiment_dir).glob(
+                "*_results.json")):
+            exp_id = results_file.name[:-len("_results.json")]
+            with open(results_file) as f:
+                data = json.load(f)
+            created = results_file.stat().st_mtime
+            for i, result in enumerate(data.get("results", []), 1):
+                variation = result.get("name", f"var{i}")
+                self.record_run(SUITE_EXPERIMENT, exp_id, variation,
+                                stats=result, outdir=None,
+                                identity=identity, created=created)
+                imported += 1
+
+        bench_file = Path(benchmark_dir) / "all_results.json"
+        if bench_file.exists():
+            with open(bench_file) as f:
+                data = json.load(f)
+            created = bench_file.stat().st_mtime
+            for bench, result in data.items():
+                self.record_run(SUITE_BENCHMARK, "benchmarks", bench,
+                                params={"benchmark": bench}, stats=result,
+                                identity=identity, created=created)
+                imported += 1
+
+        return imported
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def has_runs(self, suite=None):
+        query = "SELECT 1 FROM runs"
+        args = ()
+        if suite:
+            query += " WHERE suite = ?"
+            args = (suite,)
+        return self.conn.execute(query + " LIMIT 1", args).fetchone() \
+            is not None
+
+    def run_ids(self, suite=None, experiment=None, latest=True,
+                status="ok", variations=None):
+        """Run ids in insertion order
+
+        With latest=True only the newest run of each
+        (suite, experiment, variation) is considered, so re-running an
+        experiment supersedes its earlier rows without deleting them; a
+        variation whose newest run does not have the given status is
+        left out rather than falling back to an older run. variations
+        restricts the result to those run names, e.g. the runs of the
+        current sweep.
+        """
+        where, args = [], []
+        if suite:
+            where.append("suite = ?")
+            args.append(suite)
+        if experiment:
+            where.append("experiment = ?")
+            args.append(experiment)
+        if variations is not None:
+            variations = list(variations)
+            where.append(f"variation IN ({','.join('?' * len(variations))})")
+            args += variations
+
+        if latest:
+            clause = (" WHERE " + " AND ".join(where)) if where else ""
+            query = ("SELECT latest FROM (SELECT MAX(run_id) AS latest,"
+                     " MIN(run_id) AS first FROM runs" + clause +
+                     " GROUP BY suite, experiment, variation)"
+                     " JOIN runs ON run_id = latest")
+            if status:
+                query += " WHERE status = ?"
+                args.append(status)
+            query += " ORDER BY first"
+        else:
+            if status:
+                where.append("status = ?")
+                args.append(status)
+            clause = (" WHERE " + " AND ".join(where)) if where else ""
+            query = "SELECT run_id FROM runs" + clause + " ORDER BY run_id"
+        return [row[0] for row in self.conn.execute(query, args)]
+
+    def column(self, name, run_ids, table="stats", default=0):
+        """One metric for each run, in run_ids order"""
+        if table not in ("stats", "params", "host"):
+            raise ValueError(f"unknown table {table!r}")
+        values = dict(self._select(table, run_ids, [name]))
+        values = {rid: v for (rid, _), v in values.items()}
+        out = []
+        for rid in run_ids:
+            value = values.get(rid, default)
+            if table == "params" and rid in values:
+                value = json.loads(value)
+            out.append(value)
+        return out
+
+    def rows(self, suite=None, experiment=None, columns=None, latest=True,
+             raw=False, aggregate=False, variations=None):
+        """Runs as flat dicts of run metadata, params, stats and host
+
+        columns restricts which stat/host names are fetched. Full gem5
+        stat names (containing '.') are omitted unless raw is set.
+
+        With aggregate set, repetitions of a point (rows sharing the
+        "name" param, differing in seed) collapse into one row: every
+        stat and host metric becomes its mean, with <metric>_std,
+        <metric>_ci95 and <metric>_n alongside, and "repetitions" counts
+        the runs. Only repetitions recorded with the same "sweep_seeds"
+        param as the point's newest run are merged, so runs left by an
+        earlier sweep over other seeds drop out. Other fields come from
+        the first repetition. variations restricts the rows to those run
+        names, e.g. the runs of the current sweep.
+        """
+        ids = self.run_ids(suite, experiment, latest, variations=variations)
+        if not ids:
+            return []
+
+        rows = {}
+        measured = set()
+        cols = ("run_id", "suite", "experiment", "variation", "created",
+                "status", "outdir", "git_rev", "git_dirty", "gem5_binary")
+        for chunk in _chunks(ids):
+            marks = ",".join("?" * len(chunk))
+            for rec in self.conn.execute(
+                    f"SELECT {', '.join(cols)} FROM runs"
+                    f" WHERE run_id IN ({marks})", chunk):
+                rows[rec[0]] = dict(zip(cols, rec))
+
+        for (rid, name), value in self._select("params", ids):
+            rows[rid][name] = json.loads(value)
+        for table in ("stats", "host"):
+            for (rid, name), value in self._select(table, ids, columns):
+                if not raw and "." in name:
+                    continue
+                rows[rid][name] = value
+                measured.add(name)
+
+        rows = [rows[rid] for rid in ids]
+        return self._aggregate(rows, measured) if aggregate else rows
+
+    @staticmethod
+    def _aggregate(rows, measured):
+        groups = {}
+        for row in rows:
+            groups.setdefault(row.get("name", row["variation"]), []).append(row)
+
+        out = []
+        for reps in groups.values():
+            # Only the repetitions of the point's newest sweep: runs left
+            # by a sweep over other seeds must not widen its error bars
+            newest = max(reps, key=lambda r: r["run_id"])
+            reps = [r for r in reps
+                    if r.get("sweep_seeds") == newest.get("sweep_seeds")]
+            merged = dict(reps[0])
+            merged["repetitions"] = len(reps)
+            for metric in measured:
+                summary = summarize([r.get(metric) for r in reps])
+                if summary["n"] == 0:
+                    continue
+                merged[metric] = summary["mean"]
+                merged[f"{metric}_std"] = summary["std"]
+                merged[f"{metric}_ci95"] = summary["ci95"]
+                merged[f"{metric}_n"] = summary["n"]
+            out.append(merged)
+        return out
+
+    def experiment_results(self, exp_id, variations=None):
+        """Latest result per variation, shaped like the old JSON files
+
+        Repetitions are aggregated (see rows()), so each result carries
+        <metric>_ci95 etc. for error bars.
+        """
+        return {"experiment": exp_id,
+                "results": self.rows(SUITE_EXPERIMENT, exp_id,
+                                     aggregate=True, variations=variations)}
+
+    def benchmark_results(self, experiment="benchmarks", variations=None):
+        """Latest result per benchmark as {benchmark: row}, aggregated
+
+        experiment is "benchmarks" for the synthetic patterns and
+        "benchmarks_se" for the workloads run in SE mode.
+        """
+        return {row.get("name", row["variation"]): row
+                for row in self.rows(SUITE_BENCHMARK, experiment,
+                                     aggregate=True, variations=variations)}
+
+    def experiments(self, suite=SUITE_EXPERIMENT):
+        return [row[0] for row in self.conn.execute(
+            "SELECT experiment FROM runs WHERE suite = ?"
+            " GROUP BY experiment ORDER BY MIN(run_id)", (suite,))]
+
+    def cost_ranking(self, suite=None, experiment=None):
+        """Configurations ranked by simulation cost, most expensive first
+
+        Returns (ranked, effects). ranked holds one aggregated row per
+        configuration (latest repetitions) with "cost", the mean of the
+        first COST_METRICS entry it has, "costMetric" naming it, and
+        "params", the model parameters it ran with. effects lists, for
+        each parameter varied within an experiment, the mean cost at each
+        value and the max/min ratio, largest ratio first. Parameters that
+        vary together share the same marginal means.
+        """
+        where, args = [], []
+        if suite:
+            where.append("suite = ?")
+            args.append(suite)
+        if experiment:
+            where.append("experiment = ?")
+            args.append(experiment)
+        clause = (" WHERE " + " AND ".join(where)) if where else ""
+        groups = self.conn.execute(
+            "SELECT suite, experiment FROM runs" + clause +
+            " GROUP BY suite, experiment ORDER BY MIN(run_id)", args).fetchall()
+
+        columns = list(COST_METRICS) + ["hostSlowdown", "hostPeakRssMB",
+                                        "hostMemory", "hostTickRate",
+                                        "simSeconds"]
+        ranked, effects = [], []
+        for group_suite, group_exp in groups:
+            ids = self.run_ids(group_suite, group_exp)
+            names = {name for (_, name), _ in self._select("params", ids)}
+            names = sorted(names - set(IDENTITY_PARAMS))
+
+            costed = []
+            for row in self.rows(group_suite, group_exp, columns=columns,
+                                 aggregate=True):
+                metric = next((m for m in COST_METRICS
+                               if row.get(m) is not None), None)
+                if metric is None:
+                    continue
+                row["cost"] = row[metric]
+                row["costMetric"] = metric
+                row["params"] = {n: row[n] for n in names if n in row}
+                costed.append(row)
+            ranked.extend(costed)
+
+            for name in names:
+                by_value = {}
+                for row in costed:
+                    if name in row["params"]:
+                        value = json.dumps(row["params"][name])
+                        by_value.setdefault(value, []).append(row["cost"])
+                if len(by_value) < 2:
+                    continue
+                means = {v: sum(c) / len(c) for v, c in by_value.items()}
+                low = min(means.values())
+                effects.append({
+                    "suite": group_suite, "experiment": group_exp,
+                    "param": name, "mean_cost": means,
+                    "ratio": max(means.values()) / low if low > 0
+                    else math.inf,
+                })
+
+        ranked.sort(key=lambda r: -r["cost"])
+        effects.sort(key=lambda e: -e["ratio"])
+        return ranked, effects
+
+    def _select(self, table, run_ids, names=None):
+        if names is not None and not names:
+            return
+        for chunk in _chunks(run_ids):
+            marks = ",".join("?" * len(chunk))
+            query = (f"SELECT run_id, name, value FROM {table}"
+                     f" WHERE run_id IN ({marks})")
+            args = list(chunk)
+            if names:
+                query += f" AND name IN ({','.join('?' * len(names))})"
+                args += list(names)
+            for rid, name, value in self.conn.execute(query, args):
+                yield (rid, name), value
+
+
+def _number(value):
+    if value is None or isinstance(value, bool):
+        return None if value is None else int(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _chunks(ids, size=500):
+    # Stay under SQLite's bound-parameter limit
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+def open_store(path=RESULTS_DB):
+    """Open the store, importing the legacy JSON files on first use"""
+    store = ResultsStore(path)
+    if not store.has_runs():
+        imported = store.import_legacy_json()
+        if imported:
+            print(f"📥 Imported {imported} legacy runs into {path}")
+    return store
+
+
+def main(argv):
+    if (len(argv) < 2
+            or argv[1] not in ("import-legacy", "list", "show", "cost")
+            or (argv[1] == "show" and len(argv) < 3)):
+        print(__doc__)
+        return 1
+
+    with ResultsStore() as store:
+        if argv[1] == "import-legacy":
+            imported = store.import_legacy_json()
+            print(f"✅ Imported {imported} runs into {store.path}")
+        elif argv[1] == "list":
+            for row in store.rows(latest=False, columns=[]):
+                rev = (row["git_rev"] or "unknown")[:10]
+                dirty = "+" if row["git_dirty"] else ""
+                print(f"{row['run_id']:6d}  {row['suite']:10s} "
+                      f"{row['experiment']:24s} {row['variation']:12s} "
+                      f"{rev}{dirty}")
+        elif argv[1] == "cost":
+            print_cost_report(store, argv[2] if len(argv) > 2 else None)
+        else:
+            for row in store.experiment_results(argv[2])["results"]:
+                print(json.dumps(row, indent=2, sort_keys=True))
+    return 0
+
+
+def print_cost_report(store, experiment=None):
+    """Rank configurations by host cost and budget a rerun of all of them"""
+    ranked, effects = store.cost_ranking(experiment=experiment)
+    if not ranked:
+        print("No runs with host metrics stored")
+        return
+
+    print(f"{'Cost (s)':>10s} {'Metric':16s} {'Slowdown':>10s} "
+          f"{'Peak RSS':>10s} {'Runs':>5s}  Configuration")
+    for row in ranked:
+        slowdown = row.get("hostSlowdown")
+        rss = row.get("hostPeakRssMB")
+        print(f"{row['cost']:10.1f} {row['costMetric']:16s} "
+              f"{(f'{slowdown:,.0f}x' if slowdown else '-'):>10s} "
+              f"{(f'{rss:.0f} MB' if rss else '-'):>10s} "
+              f"{row['repetitions']:5d}  "
+              f"{row['experiment']}/{row.get('name', row['variation'])}")
+
+    if effects:
+        print("\nCost by parameter (mean cost per value, max/min ratio):")
+        for effect in effects:
+            values = ", ".join(f"{v}: {c:.1f}s" for v, c in
+                               sorted(effect["mean_cost"].items(),
+                                      key=lambda item: item[1]))
+            print(f"  {effect['ratio']:6.2f}x  {effect['experiment']}."
+                  f"{effect['param']}  ({values})")
+
+    runs = sum(row["repetitions"] for row in ranked)
+    total = sum(row["cost"] * row["repetitions"] for row in ranked)
+    peak = max((row.get("hostPeakRssMB") or 0) for row in ranked)
+    print(f"\nBudget: {total / 3600:.2f} host-hours for {runs} runs "
+          f"({total / runs:.1f} s/run)"
+          + (f", peak RSS {peak:.0f} MB per run" if peak else ""))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -4,16 +4,25 @@ Run all Thoth benchmarks and collect results
 Automated benchmark suite runner
 """
 
+import argparse
 import subprocess
 import os
 import json
 import re
+import time
 from pathlib import Path
 from datetime import datetime
 
+from results_store import (ResultsStore, SUITE_BENCHMARK, code_identity,
+                           read_stats_file, run_measured)
+from sweep_queue import WorkQueue
+
 # Configuration
 GEM5_BINARY = "./build/RISCV/gem5.opt"
 CONFIG_SCRIPT = "configs/example/thoth_full_demo.py"  # Use working config
+SE_CONFIG_SCRIPT = "configs/example/thoth_se_workload.py"  # Real binaries (--se)
+WORKLOAD_DIR = "benchmarks/thoth_workloads"
+SE_TIMEOUT = 3600  # A whole program on a timing CPU takes far longer
 BENCHMARKS = ["hashmap", "btree", "rbtree", "swap"]
 OUTPUT_DIR = "benchmark_results"
 
@@ -25,62 +34,73 @@ BENCHMARK_PARAMS = {
     "swap": {"burst_size": 200, "burst_interval": "500us", "request_latency": "8us"}
 }
 
-def run_benchmark(benchmark_name):
-    """Run a single benchmark and extract statistics"""
-    
-    print(f"\n{'='*60}")
-    print(f"Running {benchmark_name.upper()} benchmark pattern...")
-    print(f"{'='*60}")
-    
-    output_dir = Path(OUTPUT_DIR) / benchmark_name
-    output_dir.mkdir(parents=True, exist_ok=True)
+def benchmark_command(benchmark_name, seed, output_dir, se=False):
+    """gem5 command line for one benchmark pattern and seed
+
+    With se set the compiled workload itself runs in SE mode and its
+    writes drive the metadata path; the seed does not apply.
+    """
+    if se:
+        binary = f"{WORKLOAD_DIR}/{benchmark_name}"
+        print(f"Workload: {binary} (SE mode, metadata from real writes)")
+        return [
+            GEM5_BINARY,
+            "--outdir", str(output_dir),
+            SE_CONFIG_SCRIPT,
+            binary
+        ]
     
-    # Modify config with benchmark-specific parameters
     params = BENCHMARK_PARAMS[benchmark_name]
-    config_path = Path(CONFIG_SCRIPT)
-    temp_config = output_dir / "temp_config.py"
-    
-    # Read and modify config
-    with open(config_path) as f:
-        content = f.read()
-    
-    # Replace parameters
-    import re
-    content = re.sub(r'burst_size=\d+', f'burst_size={params["burst_size"]}', content)
-    content = re.sub(r'burst_interval=["\'][\d.]+[mu]?s["\']', f'burst_interval="{params["burst_interval"]}"', content)
-    content = re.sub(r'request_latency=["\'][\d.]+[mu]?s["\']', f'request_latency="{params["request_latency"]}"', content)
-    
-    # Write temporary config
-    with open(temp_config, 'w') as f:
-        f.write(content)
+    # Benchmark-specific traffic parameters, passed to the config directly
+    overrides = {"traffic_gen": dict(params), "run": {"seed": seed}}
     
     print(f"Parameters: burst_size={params['burst_size']}, interval={params['burst_interval']}, latency={params['request_latency']}")
     
-    # Use the working thoth_full_demo.py config (modified)
-    cmd = [
+    return [
         GEM5_BINARY,
         "--outdir", str(output_dir),
-        str(temp_config)  # Use modified config
+        CONFIG_SCRIPT,
+        "--params-json", json.dumps(overrides)
     ]
+
+def benchmark_stats(benchmark_name, output_dir, returncode, host, stdout=""):
+    """Statistics of a finished run, or None if it failed"""
+    if returncode != 0:
+        print(f"✗ {benchmark_name} failed (exit {returncode}), see simulation.log")
+        return None
+    
+    # Extract statistics; host metrics ride along for main() to split off
+    stats = extract_stats(stdout, output_dir / "stats.txt")
+    stats.update(host)
+    
+    print(f"✓ {benchmark_name} completed successfully "
+          f"({host['hostCpuSeconds']:.1f}s CPU, {host['hostPeakRssMB']:.0f} MB peak RSS)")
+    return stats
+
+def run_benchmark(benchmark_name, seed=1, run_name=None, se=False):
+    """Run a single benchmark and extract statistics"""
+    
+    print(f"\n{'='*60}")
+    if se:
+        print(f"Running {benchmark_name.upper()} workload in SE mode...")
+    else:
+        print(f"Running {benchmark_name.upper()} benchmark pattern (seed {seed})...")
+    print(f"{'='*60}")
+    
+    output_dir = Path(OUTPUT_DIR) / (run_name or benchmark_name)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    cmd = benchmark_command(benchmark_name, seed, output_dir, se)
     
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=600  # 10 minute timeout
-        )
+        returncode, stdout, stderr, host = run_measured(
+            cmd, timeout=SE_TIMEOUT if se else 600)  # 10 minute timeout
         
         # Save full output
         with open(output_dir / "simulation.log", "w") as f:
-            f.write(result.stdout)
-            f.write(result.stderr)
+            f.write(stdout)
+            f.write(stderr)
         
-        # Extract statistics
-        stats = extract_stats(result.stdout, output_dir / "stats.txt")
-        
-        print(f"✓ {benchmark_name} completed successfully")
-        return stats
+        return benchmark_stats(benchmark_name, output_dir, returncode, host, stdout)
         
     except subprocess.TimeoutExpired:
         print(f"✗ {benchmark_name} timed out")
@@ -89,19 +109,55 @@ def run_benchmark(benchmark_name):
         print(f"✗ {benchmark_name} failed: {e}")
         return None
 
+def run_queued(queue, runs, se=False):
+    """Run (benchmark, seed, run name) triples on a sweep_queue.py queue
+
+    Returns {run name: stats or None}. Output directories are absolute so
+    that workers on other nodes write where this process reads.
+    """
+    jobs = {}
+    for benchmark, seed, run_name in runs:
+        output_dir = (Path(OUTPUT_DIR) / run_name).resolve()
+        output_dir.mkdir(parents=True, exist_ok=True)
+        cmd = benchmark_command(benchmark, seed, output_dir, se)
+        job_id = queue.submit(cmd, output_dir, label=f"benchmarks/{run_name}",
+                              timeout=SE_TIMEOUT if se else 600,
+                              log="simulation.log")
+        jobs[job_id] = (benchmark, run_name, output_dir)
+    print(f"\n📤 Queued {len(jobs)} benchmark runs on {queue.root}")
+    
+    results = {}
+    try:
+        while jobs:
+            for job_id, (benchmark, run_name, output_dir) in list(jobs.items()):
+                result = queue.collect(job_id)
+                if result is None:
+                    continue
+                del jobs[job_id]
+                print(f"{run_name} (on {result['worker']}): ", end="")
+                results[run_name] = benchmark_stats(
+                    benchmark, output_dir, result['exit_code'], result['host'])
+            if jobs:
+                time.sleep(1)
+    except BaseException:
+        for job_id in jobs:
+            queue.cancel(job_id)
+        raise
+    return results
+
 def extract_stats(output, stats_file):
-    """Extract PCB and performance statistics"""
+    """Extract PCB and performance statistics (canonical camelCase names)"""
     
     stats = {
-        "pcb_total_partials": 0,
-        "pcb_coalesced_blocks": 0,
-        "pcb_overflows": 0,
-        "pcb_flushes": 0,
-        "nvm_writes": 0,
-        "coalescing_efficiency": 0.0,
-        "write_amplification": 0.0,
-        "traffic_reduction": 0.0,
-        "simulation_ticks": 0
+        "pcbTotalPartials": 0,
+        "pcbCoalescedBlocks": 0,
+        "pcbOverflows": 0,
+        "pcbPartialFlushes": 0,
+        "nvmWrites": 0,
+        "coalescingEfficiency": 0.0,
+        "writeAmplification": 0.0,
+        "trafficReduction": 0.0,
+        "simTicks": 0
     }
     
     # Read from stats.txt file (better than parsing stdout)
@@ -111,16 +167,16 @@ def extract_stats(output, stats_file):
             
             # Extract stats using correct camelCase names from gem5
             stat_patterns = {
-                "pcb_total_partials": r'system\.metadata_cache\.pcbTotalPartials\s+(\d+)',
-                "pcb_coalesced_blocks": r'system\.metadata_cache\.pcbCoalescedBlocks\s+(\d+)',
-                "pcb_overflows": r'system\.metadata_cache\.pcbOverflows\s+(\d+)',
-                "pcb_flushes": r'system\.metadata_cache\.pcbPartialFlushes\s+(\d+)',
-                "nvm_writes": r'system\.metadata_cache\.nvmWrites\s+(\d+)',
-                "coalescing_efficiency": r'system\.metadata_cache\.pcbCoalescingRate\s+([\d.]+)',
-                "overflow_rate": r'system\.metadata_cache\.overflowRate\s+([\d.]+)',
-                "write_amplification": r'system\.metadata_cache\.writeAmplification\s+([\d.]+)',
-                "plub_overhead": r'system\.metadata_cache\.plubOverhead\s+([\d.]+)',
-                "simulation_ticks": r'simTicks\s+(\d+)'
+                "pcbTotalPartials": r'system\.metadata_cache\.pcbTotalPartials\s+(\d+)',
+                "pcbCoalescedBlocks": r'system\.metadata_cache\.pcbCoalescedBlocks\s+(\d+)',
+                "pcbOverflows": r'system\.metadata_cache\.pcbOverflows\s+(\d+)',
+                "pcbPartialFlushes": r'system\.metadata_cache\.pcbPartialFlushes\s+(\d+)',
+                "nvmWrites": r'system\.metadata_cache\.nvmWrites\s+(\d+)',
+                "coalescingEfficiency": r'system\.metadata_cache\.pcbCoalescingRate\s+([\d.]+)',
+                "overflowRate": r'system\.metadata_cache\.overflowRate\s+([\d.]+)',
+                "writeAmplification": r'system\.metadata_cache\.writeAmplification\s+([\d.]+)',
+                "plubOverhead": r'system\.metadata_cache\.plubOverhead\s+([\d.]+)',
+                "simTicks": r'simTicks\s+(\d+)'
             }
             
             for key, pattern in stat_patterns.items():
@@ -133,21 +189,36 @@ def extract_stats(output, stats_file):
                         stats[key] = int(value)
             
             # Convert coalescing rate to percentage
-            if 'coalescing_efficiency' in stats and stats['coalescing_efficiency'] < 10:
-                stats['coalescing_efficiency'] *= 100
+            if 'coalescingEfficiency' in stats and stats['coalescingEfficiency'] < 10:
+                stats['coalescingEfficiency'] *= 100
             
             # Calculate traffic reduction
-            if stats['nvm_writes'] > 0:
-                stats['traffic_reduction'] = stats['pcb_total_partials'] / stats['nvm_writes']
+            if stats['nvmWrites'] > 0:
+                stats['trafficReduction'] = stats['pcbTotalPartials'] / stats['nvmWrites']
     
     return stats
 
 def main():
     """Run all benchmarks and generate report"""
     
+    parser = argparse.ArgumentParser(description="Run the Thoth benchmark suite")
+    parser.add_argument("--repetitions", type=int, default=1,
+                        help="Seeded runs per benchmark (mean/stddev/95%% CI are aggregated)")
+    parser.add_argument("--base-seed", type=int, default=1,
+                        help="Seed of the first repetition; repetition r uses base + r")
+    parser.add_argument("--queue", default=None, metavar="DIR",
+                        help="Submit runs to a sweep_queue.py work queue instead of running them here")
+    parser.add_argument("--se", action="store_true",
+                        help="Run the compiled workloads in SE mode instead of synthetic bursts")
+    args = parser.parse_args()
+    # SE runs are deterministic: seeds only vary the synthetic patterns
+    repetitions = 1 if args.se else max(1, args.repetitions)
+    experiment = "benchmarks_se" if args.se else "benchmarks"
+    
     print("=" * 60)
     print("Thoth Benchmark Suite")
     print("Running real workloads: hashmap, btree, rbtree, swap")
+    print("Mode: " + ("SE (compiled binaries)" if args.se else "synthetic burst patterns"))
     print("=" * 60)
     
     # Check if gem5 is compiled
@@ -164,70 +235,113 @@ def main():
             print("Please compile: cd benchmarks/thoth_workloads && make")
             return
     
-    # Run all benchmarks
-    results = {}
+    # Run all benchmarks, each repetition with its own traffic seed
     start_time = datetime.now()
+    store = ResultsStore()
+    identity = code_identity(GEM5_BINARY)
     
-    for benchmark in BENCHMARKS:
-        stats = run_benchmark(benchmark)
+    if args.se:
+        runs = [(benchmark, None, f"{benchmark}_se") for benchmark in BENCHMARKS]
+    else:
+        runs = [(benchmark, args.base_seed + r,
+                 f"{benchmark}_s{args.base_seed + r}" if repetitions > 1 else benchmark)
+                for benchmark in BENCHMARKS for r in range(repetitions)]
+    queued = run_queued(WorkQueue(args.queue), runs, args.se) if args.queue else None
+    
+    for benchmark, seed, run_name in runs:
+        if queued is not None:
+            stats = queued.get(run_name)
+        else:
+            stats = run_benchmark(benchmark, seed, run_name, args.se)
+        output_dir = Path(OUTPUT_DIR) / run_name
+        if args.se:
+            params = dict(benchmark=benchmark, name=benchmark, mode="se")
+        else:
+            params = dict(BENCHMARK_PARAMS[benchmark], benchmark=benchmark,
+                          name=benchmark, seed=seed,
+                          sweep_seeds=list(range(args.base_seed,
+                                                 args.base_seed + repetitions)))
         if stats:
-            results[benchmark] = stats
+            all_stats = read_stats_file(output_dir / "stats.txt")
+            all_stats.update(stats)
+            host = {name: all_stats.pop(name) for name in
+                    ("hostWallSeconds", "hostCpuSeconds", "hostUserSeconds",
+                     "hostSystemSeconds", "hostPeakRssMB")}
+            store.record_run(SUITE_BENCHMARK, experiment, run_name,
+                             params=params, stats=all_stats, host=host,
+                             outdir=output_dir, identity=identity)
+        else:
+            store.record_run(SUITE_BENCHMARK, experiment, run_name,
+                             params=params, status="failed",
+                             outdir=output_dir, identity=identity)
     
     end_time = datetime.now()
     duration = (end_time - start_time).total_seconds()
     
-    # Save results
-    results_file = Path(OUTPUT_DIR) / "all_results.json"
-    with open(results_file, "w") as f:
-        json.dump(results, f, indent=2)
-    
-    # Generate summary report
-    generate_report(results, duration)
+    # Generate summary report from the aggregated repetitions
+    sweep = [run_name for _, _, run_name in runs]
+    results = {bench: row for bench, row in store.benchmark_results(experiment, sweep).items()
+               if bench in BENCHMARKS}
+    generate_report(results, duration, args.se)
     
     print(f"\n✓ All benchmarks completed in {duration:.1f} seconds")
-    print(f"Results saved to: {OUTPUT_DIR}/")
+    print(f"Results saved to: {OUTPUT_DIR}/ and {store.path}")
 
-def generate_report(results, duration):
+def generate_report(results, duration, se=False):
     """Generate summary report"""
     
-    report_file = Path(OUTPUT_DIR) / "BENCHMARK_REPORT.md"
+    report_file = Path(OUTPUT_DIR) / ("BENCHMARK_REPORT_SE.md" if se else "BENCHMARK_REPORT.md")
     
     with open(report_file, "w") as f:
         f.write("# Thoth Benchmark Results\n\n")
         f.write(f"**Date**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        f.write("**Mode**: " + ("SE, metadata derived from the compiled workloads' "
+                                "memory writes" if se else
+                                "synthetic burst pattern per workload") + "\n\n")
         f.write(f"**Duration**: {duration:.1f} seconds\n\n")
         f.write(f"**Benchmarks**: {', '.join(results.keys())}\n\n")
         
         f.write("## Summary Table\n\n")
-        f.write("| Benchmark | Partials | Coalesced | NVM Writes | Efficiency | Write Amp | Reduction |\n")
-        f.write("|-----------|----------|-----------|------------|------------|-----------|----------|\n")
+        f.write("Values are means over each benchmark's seeded repetitions; "
+                "± is the 95% confidence half-width.\n\n")
+        f.write("| Benchmark | Runs | Partials | Coalesced | NVM Writes | Efficiency | Write Amp | Reduction |\n")
+        f.write("|-----------|------|----------|-----------|------------|------------|-----------|----------|\n")
         
         for bench, stats in results.items():
-            f.write(f"| {bench:9s} | {stats['pcb_total_partials']:8d} | "
-                   f"{stats['pcb_coalesced_blocks']:9d} | {stats['nvm_writes']:10d} | "
-                   f"{stats['coalescing_efficiency']:9.2f}% | {stats['write_amplification']:9.3f} | "
-                   f"{stats['traffic_reduction']:8.2f}x |\n")
+            f.write(f"| {bench:9s} | {stats['repetitions']:4d} | {stats['pcbTotalPartials']:8.0f} | "
+                   f"{stats['pcbCoalescedBlocks']:9.0f} | {stats['nvmWrites']:10.0f} | "
+                   f"{stats['coalescingEfficiency']:.2f} ± {stats['coalescingEfficiency_ci95']:.2f}% | "
+                   f"{stats['writeAmplification']:.3f} ± {stats['writeAmplification_ci95']:.3f} | "
+                   f"{stats['trafficReduction']:8.2f}x |\n")
         
         f.write("\n## Detailed Results\n\n")
         
         for bench, stats in results.items():
             f.write(f"### {bench.upper()}\n\n")
-            f.write(f"- **Total Partial Writes**: {stats['pcb_total_partials']:,}\n")
-            f.write(f"- **Coalesced Blocks**: {stats['pcb_coalesced_blocks']:,}\n")
-            f.write(f"- **NVM Writes**: {stats['nvm_writes']:,}\n")
-            f.write(f"- **PCB Flushes**: {stats['pcb_flushes']:,}\n")
-            f.write(f"- **Overflow to PLUB**: {stats['pcb_overflows']:,}\n")
-            f.write(f"- **Coalescing Efficiency**: {stats['coalescing_efficiency']:.2f}%\n")
-            f.write(f"- **Write Amplification**: {stats['write_amplification']:.3f}\n")
-            f.write(f"- **Traffic Reduction**: {stats['traffic_reduction']:.2f}x\n")
-            f.write(f"- **Simulation Ticks**: {stats['simulation_ticks']:,}\n\n")
+            f.write(f"- **Total Partial Writes**: {stats['pcbTotalPartials']:,.0f}\n")
+            f.write(f"- **Coalesced Blocks**: {stats['pcbCoalescedBlocks']:,.0f}\n")
+            f.write(f"- **NVM Writes**: {stats['nvmWrites']:,.0f}\n")
+            f.write(f"- **PCB Flushes**: {stats['pcbPartialFlushes']:,.0f}\n")
+            f.write(f"- **Overflow to PLUB**: {stats['pcbOverflows']:,.0f}\n")
+            f.write(f"- **Coalescing Efficiency**: {stats['coalescingEfficiency']:.2f}% "
+                    f"(± {stats['coalescingEfficiency_ci95']:.2f}, sd {stats['coalescingEfficiency_std']:.2f})\n")
+            f.write(f"- **Write Amplification**: {stats['writeAmplification']:.3f} "
+                    f"(± {stats['writeAmplification_ci95']:.3f}, sd {stats['writeAmplification_std']:.3f})\n")
+            f.write(f"- **Traffic Reduction**: {stats['trafficReduction']:.2f}x\n")
+            f.write(f"- **Simulation Ticks**: {stats['simTicks']:,.0f}\n")
+            if stats.get('hostCpuSeconds') is not None:
+                f.write(f"- **Host Cost**: {stats['hostCpuSeconds']:.1f}s CPU, "
+                        f"{stats.get('hostPeakRssMB', 0):.0f} MB peak RSS"
+                        + (f", {stats['hostSlowdown']:,.0f}x slowdown"
+                           if stats.get('hostSlowdown') else "") + "\n")
+            f.write("\n")
         
         f.write("## Analysis\n\n")
         
         # Calculate averages
-        avg_efficiency = sum(s['coalescing_efficiency'] for s in results.values()) / len(results)
-        avg_write_amp = sum(s['write_amplification'] for s in results.values()) / len(results)
-        avg_reduction = sum(s['traffic_reduction'] for s in results.values()) / len(results)
+        avg_efficiency = sum(s['coalescingEfficiency'] for s in results.values()) / len(results)
+        avg_write_amp = sum(s['writeAmplification'] for s in results.values()) / len(results)
+        avg_reduction = sum(s['trafficReduction'] for s in results.values()) / len(results)
         
         f.write(f"**Average Coalescing Efficiency**: {avg_efficiency:.2f}%\n\n")
         f.write(f"**Average Write Amplification**: {avg_write_amp:.3f}\n\n")
@@ -4,15 +4,25 @@ Automated Experiment Suite for Thoth PCB Coalescing
 Runs multiple experiments and collects statistics
 """
 
+import argparse
 import os
+import signal
 import subprocess
 import re
 import json
 import time
 from pathlib import Path
 
+from results_store import (ResultsStore, SUITE_EXPERIMENT, code_identity,
+                           read_stats_file, run_measured)
+from sweep_journal import JobJournal
+from sweep_progress import FileTail, SweepProgress
+from sweep_queue import WorkQueue
+
 # Experiment configurations
-# Note: MetadataTrafficGen parameters are: burst_size, burst_interval, request_latency
+# Bare keys are MetadataTrafficGen parameters; "obj.param" keys address any
+# other object in thoth_full_demo.py (e.g. "metadata_cache.pcb_capacity",
+# "run.duration"). "name" only labels the variation.
 EXPERIMENTS = {
     "exp1_burst_size": {
         "name": "Burst Size Analysis",
@@ -56,56 +66,117 @@ EXPERIMENTS = {
             {"burst_size": 200, "burst_interval": "2ms", "request_latency": "4us", "name": "HighLoad"},
             {"burst_size": 400, "burst_interval": "5ms", "request_latency": "10us", "name": "BurstyLoad"},
         ]
+    },
+    "exp5_integrity_tree": {
+        "name": "Integrity Tree Arity",
+        "description": "Bonsai Merkle tree path updates coalesced by the PCB",
+        "variations": [
+            {"burst_size": 100, "burst_interval": "1ms", "request_latency": "4us",
+             "metadata_cache.tree_arity": arity, "name": name}
+            for arity, name in [(0, "NoTree"), (2, "Arity2"), (4, "Arity4"),
+                                (8, "Arity8"), (16, "Arity16")]
+        ]
+    },
+    "exp6_crash_recovery": {
+        "name": "Crash Recovery Time",
+        "description": "Recovery estimate vs. PCB size and flush interval (crash every 500us)",
+        "variations": [
+            {"burst_size": 100, "burst_interval": "1ms", "request_latency": "4us",
+             "metadata_cache.crash_interval": "500us",
+             "metadata_cache.flush_interval": flush,
+             "metadata_cache.pcb_capacity": pcb, "name": name}
+            for flush, pcb, name in [("1ms", 256, "Flush1ms"), ("5ms", 256, "Flush5ms"),
+                                     ("10ms", 256, "Flush10ms"), ("20ms", 256, "Flush20ms"),
+                                     ("10ms", 64, "PCB64"), ("10ms", 1024, "PCB1024")]
+        ]
+    },
+    "exp7_wear_leveling": {
+        "name": "PCM Wear Leveling",
+        "description": "Start-Gap gap-move interval vs. max wear and projected lifetime",
+        "variations": [
+            {"burst_size": 100, "burst_interval": "1ms", "request_latency": "4us",
+             "nvmain.wear_leveling": interval > 0,
+             "nvmain.gap_move_interval": max(interval, 1), "name": name}
+            for interval, name in [(0, "NoLeveling"), (10, "Gap10"),
+                                   (100, "Gap100"), (1000, "Gap1000")]
+        ]
     }
 }
 
 class ExperimentRunner:
-    def __init__(self):
+    def __init__(self, batch=True, jobs=None, converge=False,
+                 max_duration="100ms", repetitions=1, base_seed=1,
+                 resume=False, progress_interval="1ms", stall_seconds=300,
+                 retries=2, retry_delay=30.0, queue=None):
+        self.batch = batch
+        self.repetitions = max(1, repetitions)
+        self.base_seed = base_seed
+        self.jobs = jobs or os.cpu_count() or 1
+        self.resume = resume
+        self.stall_seconds = stall_seconds
+        self.retries = max(0, retries)
+        # Directory work queue served by sweep_queue.py workers, if any
+        self.queue = WorkQueue(queue) if queue else None
+        # Config "run" options applied to every variation
+        self.run_options = {}
+        if converge:
+            self.run_options = {"converge": True, "duration": max_duration}
+        if progress_interval:
+            self.run_options["progress_interval"] = progress_interval
         self.gem5_binary = "./build/RISCV/gem5.opt"
         self.config_template = "configs/example/thoth_full_demo.py"
         self.results_dir = Path("experiment_results")
         self.results_dir.mkdir(exist_ok=True)
+        self.store = ResultsStore()
+        self.journal = JobJournal(self.results_dir / "journal.json",
+                                  retry_delay=retry_delay)
+        self.identity = code_identity(self.gem5_binary)
         
-    def create_config(self, params, config_path):
-        """Create a modified config file with specific parameters"""
-        with open(self.config_template, 'r') as f:
-            content = f.read()
-        
-        # Replace MetadataTrafficGen parameters
-        if 'burst_size' in params:
-            content = re.sub(r'burst_size=\d+', 
-                            f'burst_size={params["burst_size"]}', content)
-        if 'burst_interval' in params:
-            content = re.sub(r'burst_interval=["\'][^"\']+["\']', 
-                            f'burst_interval=\'{params["burst_interval"]}\'', content)
-        if 'request_latency' in params:
-            content = re.sub(r'request_latency=["\'][^"\']+["\']', 
-                            f'request_latency=\'{params["request_latency"]}\'', content)
-        
-        with open(config_path, 'w') as f:
-            f.write(content)
+    def config_overrides(self, params):
+        """Variation parameters as the config's {obj: {param: value}} map"""
+        overrides = {"run": dict(self.run_options)} if self.run_options else {}
+        for key, value in params.items():
+            if key == 'name':
+                continue
+            obj, _, param = key.rpartition('.')
+            overrides.setdefault(obj or 'traffic_gen', {})[param] = value
+        return overrides
     
-    def run_simulation(self, config_path, output_dir):
-        """Run gem5 simulation"""
-        cmd = [
+    def command(self, params, output_dir):
+        """gem5 command line simulating one variation into output_dir"""
+        return [
             self.gem5_binary,
             f"--outdir={str(output_dir)}",
-            str(config_path)
+            self.config_template,
+            "--params-json", json.dumps(self.config_overrides(params))
         ]
+    
+    def run_simulation(self, params, output_dir, name, progress):
+        """Run gem5 simulation, streaming its progress lines
+
+        Returns (exit code or None on timeout, host metrics of the gem5
+        process).
+        """
+        cmd = self.command(params, output_dir)
+        
+        progress.log(f"  Running: {' '.join(cmd)}")
+        progress.start(name)
+        
+        def on_line(line):
+            if line is None or not progress.feed(name, line):
+                progress.refresh()
         
-        print(f"  Running: {' '.join(cmd)}")
         try:
-            result = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                timeout=300,  # 5 minute timeout
-                text=True
-            )
-            return result.returncode == 0
+            returncode, _, stderr, host = run_measured(
+                cmd, timeout=300, on_line=on_line)  # 5 minute timeout
+            if returncode != 0:
+                # Config errors (e.g. an unknown parameter) land on stderr
+                progress.log(*(f"     {line}" for line in
+                               stderr.strip().splitlines()[-3:]))
+            return returncode, host
         except subprocess.TimeoutExpired:
-            print("  ⚠️  Simulation timeout!")
-            return False
+            progress.log(f"  ⚠️  {name}: simulation timeout!")
+            return None, {}
     
     def parse_stats(self, stats_file):
         """Parse statistics from m5out/stats.txt"""
@@ -129,9 +200,11 @@ class ExperimentRunner:
             'writeAmplification': r'system\.metadata_cache\.writeAmplification\s+([\d.]+)',
             'overflowRate': r'system\.metadata_cache\.overflowRate\s+([\d.]+)',
             'plubOverhead': r'system\.metadata_cache\.plubOverhead\s+([\d.]+)',
-            'cacheHits': r'system\.metadata_cache\.cacheHits\s+(\d+)',
-            'cacheMisses': r'system\.metadata_cache\.cacheMisses\s+(\d+)',
+            'cacheHits': r'system\.metadata_cache\.hits\s+(\d+)',
+            'cacheMisses': r'system\.metadata_cache\.misses\s+(\d+)',
             'requestsSent': r'system\.traffic_gen\.requestsSent\s+(\d+)',
+            'readsSent': r'system\.traffic_gen\.readsSent\s+(\d+)',
+            'writesSent': r'system\.traffic_gen\.writesSent\s+(\d+)',
             'burstsCompleted': r'system\.traffic_gen\.burstsCompleted\s+(\d+)',
         }
         
@@ -157,55 +230,295 @@ class ExperimentRunner:
         
         return stats
     
+    def read_termination(self, output_dir):
+        """Why a convergence-monitored run stopped, or None"""
+        termination_file = output_dir / "termination.json"
+        if not termination_file.exists():
+            return None
+        with open(termination_file) as f:
+            return json.load(f)
+    
+    def expand_repetitions(self, variations):
+        """One (run name, params) per repetition of each variation
+        
+        Repetition r runs with run.seed = base_seed + r; all repetitions
+        keep the variation's name so the results store aggregates them.
+        """
+        runs = []
+        for i, params in enumerate(variations, 1):
+            name = params.get('name', f"var{i}")
+            for r in range(self.repetitions):
+                seed = self.base_seed + r
+                run_params = dict(params, name=name)
+                run_params['run.seed'] = seed
+                run_name = f"{name}_s{seed}" if self.repetitions > 1 else name
+                runs.append((run_name, run_params))
+        return runs
+    
+    def run_batch(self, exp_id, runs, progress, on_done):
+        """Run all (run name, params) of a set from one gem5 process
+
+        While gem5 runs, each child's simout is tailed for progress lines
+        and batch_results.jsonl for finished children, which are handed
+        to on_done(run name, exit code, host metrics) straight away (CPU
+        time and peak RSS come from fork_batch's wait3()). Children that
+        never report are passed on with exit code None at the end.
+        """
+        exp_dir = self.results_dir / exp_id
+        exp_dir.mkdir(parents=True, exist_ok=True)
+        
+        batch = []
+        for run_name, params in runs:
+            entry = self.config_overrides(params)
+            entry['name'] = run_name
+            batch.append(entry)
+        batch_file = exp_dir / "variations.json"
+        with open(batch_file, 'w') as f:
+            json.dump(batch, f, indent=2)
+        results_file = exp_dir / "batch_results.jsonl"
+        if results_file.exists():
+            results_file.unlink()
+        
+        cmd = [
+            self.gem5_binary,
+            f"--outdir={str(exp_dir)}",
+            self.config_template,
+            "--batch", str(batch_file),
+            "--jobs", str(self.jobs)
+        ]
+        
+        progress.log(f"  Running: {' '.join(cmd)}")
+        tails = {name: FileTail(exp_dir / name / "simout") for name, _ in runs}
+        finished = FileTail(results_file)
+        pending = set(tails)
+        deadline = time.time() + 300 * len(runs)  # 5 minutes per run
+        
+        with open(exp_dir / "batch.log", 'w') as log:
+            # Own process group, so the forked children die with the parent
+            proc = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT,
+                                    start_new_session=True)
+            try:
+                while True:
+                    exited = proc.poll() is not None
+                    for name in pending:
+                        if tails[name].exists():
+                            progress.start(name)
+                        for line in tails[name].lines():
+                            progress.feed(name, line)
+                    for line in finished.lines():
+                        if not line.strip():
+                            continue
+                        entry = json.loads(line)
+                        host = dict(entry.get('host', {}),
+                                    hostWallSeconds=entry['host_seconds'])
+                        pending.discard(entry['name'])
+                        on_done(entry['name'], entry['exit_code'], host)
+                    progress.refresh()
+                    if exited:
+                        break
+                    if time.time() > deadline:
+                        progress.log("  ⚠️  Batch timeout!")
+                        os.killpg(proc.pid, signal.SIGKILL)
+                        proc.wait()
+                        break
+                    time.sleep(1)
+            except BaseException:
+                os.killpg(proc.pid, signal.SIGKILL)
+                proc.wait()
+                raise
+        
+        for name in sorted(pending):
+            on_done(name, None, {})
+    
+    def run_queued(self, exp_id, runs, progress, on_done):
+        """Run each (run name, params) as a job on the work queue
+
+        Workers on any node run the jobs; output directories are absolute
+        so they resolve the same everywhere. As in run_batch, simouts are
+        tailed for progress and each result goes to on_done(run name, exit
+        code, host metrics) as soon as it is collected. Interrupting the
+        runner withdraws the jobs no worker has claimed yet.
+        """
+        jobs = {}
+        tails = {}
+        for run_name, params in runs:
+            output_dir = (self.results_dir / exp_id / run_name).resolve()
+            output_dir.mkdir(parents=True, exist_ok=True)
+            job_id = self.queue.submit(self.command(params, output_dir),
+                                       output_dir, label=f"{exp_id}/{run_name}",
+                                       timeout=300)  # 5 minute timeout
+            jobs[job_id] = run_name
+            tails[run_name] = FileTail(output_dir / "simout")
+        progress.log(f"  📤 Queued {len(jobs)} runs on {self.queue.root}")
+        
+        try:
+            while jobs:
+                for job_id, name in list(jobs.items()):
+                    if tails[name].exists():
+                        progress.start(name)
+                    for line in tails[name].lines():
+                        progress.feed(name, line)
+                    result = self.queue.collect(job_id)
+                    if result is None:
+                        continue
+                    del jobs[job_id]
+                    on_done(name, result['exit_code'], result['host'])
+                progress.refresh()
+                if jobs:
+                    time.sleep(1)
+        except BaseException:
+            withdrawn = [job_id for job_id in jobs if self.queue.cancel(job_id)]
+            progress.log(f"  🛑 Withdrew {len(withdrawn)} unclaimed jobs")
+            raise
+    
+    def record_result(self, exp_id, var_name, params, success, host, progress):
+        """Store one finished run as soon as it completes; returns its stats"""
+        output_dir = self.results_dir / exp_id / var_name
+        elapsed = host.get('hostWallSeconds', 0.0)
+        progress.finish(var_name, success)
+        # The seeds of this sweep, so the store aggregates only its runs
+        stored = dict(params, sweep_seeds=list(range(
+            self.base_seed, self.base_seed + self.repetitions)))
+        
+        if not success:
+            self.store.record_run(SUITE_EXPERIMENT, exp_id, var_name,
+                                  params=stored, host=host,
+                                  status='failed', outdir=output_dir,
+                                  identity=self.identity)
+            progress.log(f"  ❌ {var_name} failed!"
+                         + (f" See {output_dir / 'simerr'}"
+                            if self.batch or self.queue else ""))
+            return None
+        
+        # Parse results; keep every scalar gem5 stat alongside the
+        # headline metrics
+        stats = self.parse_stats(output_dir / "stats.txt")
+        termination = self.read_termination(output_dir)
+        if termination:
+            stats['convergedEarly'] = float(termination['reason'] == 'converged')
+        all_stats = read_stats_file(output_dir / "stats.txt")
+        all_stats.update(stats)
+        self.store.record_run(SUITE_EXPERIMENT, exp_id, var_name,
+                              params=stored, stats=all_stats,
+                              host=host,
+                              outdir=output_dir,
+                              identity=self.identity)
+        
+        stats.update(params)
+        stats['elapsed_time'] = elapsed
+        
+        lines = [f"  ✅ {var_name}: took {elapsed:.1f}s, "
+                 f"{host.get('hostCpuSeconds', 0):.1f}s CPU, "
+                 f"{host.get('hostPeakRssMB', 0):.0f} MB peak RSS"]
+        if termination:
+            lines.append(f"     Stopped: {termination['reason']} after "
+                         f"{termination['sim_ticks'] / 1e9:.1f} ms simulated")
+        lines.append(f"     Efficiency: {stats.get('coalescingEfficiency', 0):.2f}%, "
+                     f"Write Amp: {stats.get('writeAmplification', 0):.3f}")
+        progress.log(*lines)
+        return stats
+    
+    def run_pending(self, exp_id, runs, progress, on_done):
+        """Simulate runs (queued, batched or one launch each), reporting to on_done"""
+        for run_name, _ in runs:
+            # Don't report a stop reason or progress left over from an earlier run
+            for stale in ("termination.json", "simout"):
+                stale_file = self.results_dir / exp_id / run_name / stale
+                if stale_file.exists():
+                    stale_file.unlink()
+        
+        if self.queue or self.batch:
+            self.journal.start(exp_id, [name for name, _ in runs])
+            if self.queue:
+                self.run_queued(exp_id, runs, progress, on_done)
+            else:
+                self.run_batch(exp_id, runs, progress, on_done)
+            return
+        for var_name, params in runs:
+            output_dir = self.results_dir / exp_id / var_name
+            output_dir.mkdir(parents=True, exist_ok=True)
+            self.journal.start(exp_id, [var_name])
+            exit_code, host = self.run_simulation(params, output_dir,
+                                                  var_name, progress)
+            on_done(var_name, exit_code, host)
+    
     def run_experiment_set(self, exp_id, exp_config):
-        """Run a complete experiment set"""
+        """Run a complete experiment set
+        
+        Every run goes through the job journal and is stored as soon as
+        it finishes, so an interrupted set keeps its completed points.
+        Failed runs are retried up to self.retries times, each retry
+        waiting out the journal's exponential backoff. With resume set,
+        runs the journal has as done with identical parameters are not
+        simulated again.
+        """
         print(f"\n{'='*70}")
         print(f"🔬 Experiment: {exp_config['name']}")
         print(f"   {exp_config['description']}")
         print(f"{'='*70}\n")
         
+        runs = self.expand_repetitions(exp_config['variations'])
+        progress = SweepProgress([name for name, _ in runs], title=exp_id,
+                                 stall_seconds=self.stall_seconds)
+        
         results = []
+        done = set()
+        if self.resume:
+            done = {name for name, params in runs
+                    if self.journal.is_done(exp_id, name, params)}
+            if done:
+                print(f"⏭️  Resuming: {len(done)} of {len(runs)} runs already done")
+                for name in done:
+                    progress.skip(name)
+                results = [row for row in self.store.rows(SUITE_EXPERIMENT, exp_id)
+                           if row['variation'] in done]
+        for name, params in runs:
+            self.journal.add(exp_id, name, params, reset=not self.resume)
+        self.journal.save()
         
-        for i, params in enumerate(exp_config['variations'], 1):
-            print(f"[{i}/{len(exp_config['variations'])}] Running variation: {params}")
-            
-            # Create output directory
-            var_name = params.get('name', f"var{i}")
-            output_dir = self.results_dir / exp_id / var_name
-            output_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Create config
-            config_path = output_dir / "config.py"
-            self.create_config(params, config_path)
-            
-            # Run simulation
-            start_time = time.time()
-            success = self.run_simulation(config_path, output_dir)
-            elapsed = time.time() - start_time
-            
-            if success:
-                # Parse results
-                stats = self.parse_stats(output_dir / "stats.txt")
-                stats.update(params)
-                stats['elapsed_time'] = elapsed
+        params_of = dict(runs)
+        
+        def on_done(var_name, exit_code, host):
+            self.journal.finish(exp_id, var_name, exit_code,
+                                host.get('hostWallSeconds'))
+            stats = self.record_result(exp_id, var_name, params_of[var_name],
+                                       exit_code == 0, host, progress)
+            if stats:
                 results.append(stats)
-                
-                print(f"  ✅ Success! (took {elapsed:.1f}s)")
-                print(f"     Efficiency: {stats.get('coalescingEfficiency', 0):.2f}%")
-                print(f"     Write Amp: {stats.get('writeAmplification', 0):.3f}")
-            else:
-                print(f"  ❌ Failed!")
-        
-        # Save results
-        results_file = self.results_dir / f"{exp_id}_results.json"
-        with open(results_file, 'w') as f:
-            json.dump({
-                'experiment': exp_config['name'],
-                'description': exp_config['description'],
-                'results': results
-            }, f, indent=2)
-        
-        print(f"\n✅ Experiment complete! Results saved to {results_file}")
+        
+        todo = [(name, params) for name, params in runs if name not in done]
+        for attempt in range(self.retries + 1):
+            if not todo:
+                break
+            if attempt:
+                for name, _ in todo:
+                    progress.requeue(name)
+            wait = self.journal.retry_wait(exp_id, [name for name, _ in todo])
+            if wait > 0:
+                progress.log(f"  🔁 Retrying {len(todo)} failed run(s) in {wait:.0f}s")
+                time.sleep(wait)
+            self.run_pending(exp_id, todo, progress, on_done)
+            todo = [(name, params) for name, params in todo
+                    if self.journal.entry(exp_id, name)['state'] == 'failed']
+        progress.close()
+        if todo:
+            print(f"❌ {len(todo)} run(s) still failing after {self.retries + 1} "
+                  f"attempts: {', '.join(name for name, _ in todo)} "
+                  f"(--resume retries them)")
+        
+        if self.repetitions > 1:
+            print(f"\n📏 Mean ± 95% CI over {self.repetitions} seeds:")
+            sweep = [name for name, _ in runs]
+            for row in self.store.experiment_results(exp_id, sweep)['results']:
+                eff = row.get('coalescingEfficiency')
+                amp = row.get('writeAmplification')
+                if eff is None or amp is None:
+                    continue
+                print(f"   {row['name']:12s} efficiency "
+                      f"{eff:.2f} ± {row['coalescingEfficiency_ci95']:.2f}%, "
+                      f"write amp {amp:.3f} ± {row['writeAmplification_ci95']:.3f}")
+        
+        print(f"\n✅ Experiment complete! Results stored in {self.store.path}")
         return results
 
     def run_all_experiments(self):
@@ -220,21 +533,53 @@ class ExperimentRunner:
             results = self.run_experiment_set(exp_id, exp_config)
             all_results[exp_id] = results
         
-        # Save summary
-        summary_file = self.results_dir / "experiment_summary.json"
-        with open(summary_file, 'w') as f:
-            json.dump(all_results, f, indent=2)
-        
         print("\n" + "="*70)
         print("🎉 ALL EXPERIMENTS COMPLETE!")
         print(f"   Results directory: {self.results_dir}")
-        print(f"   Summary file: {summary_file}")
+        print(f"   Results store: {self.store.path}")
         print("="*70 + "\n")
         
         return all_results
 
 def main():
-    runner = ExperimentRunner()
+    parser = argparse.ArgumentParser(description="Run the Thoth experiment suite")
+    parser.add_argument("--no-batch", action="store_true",
+                        help="Launch gem5 once per variation instead of once per experiment set")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Variations simulated concurrently in batch mode (default: all CPUs)")
+    parser.add_argument("--converge", action="store_true",
+                        help="Stop each run once its PCB metrics converge")
+    parser.add_argument("--max-duration", default="100ms",
+                        help="Simulated-time cap per run with --converge")
+    parser.add_argument("--repetitions", type=int, default=1,
+                        help="Seeded runs per variation (mean/stddev/95%% CI are aggregated)")
+    parser.add_argument("--base-seed", type=int, default=1,
+                        help="Seed of the first repetition; repetition r uses base + r")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip runs the job journal has as done with the same parameters")
+    parser.add_argument("--progress-interval", default="1ms",
+                        help="Simulated time between progress reports ('' disables)")
+    parser.add_argument("--stall-after", type=float, default=300,
+                        help="Host seconds without progress before a run shows as STALLED")
+    parser.add_argument("--queue", default=None, metavar="DIR",
+                        help="Submit runs to a sweep_queue.py work queue instead of running them here")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="Times a failed run is retried")
+    parser.add_argument("--retry-delay", type=float, default=30,
+                        help="Seconds before the first retry; doubles with each failure")
+    args = parser.parse_args()
+    
+    runner = ExperimentRunner(batch=not args.no_batch, jobs=args.jobs,
+                              converge=args.converge,
+                              max_duration=args.max_duration,
+                              repetitions=args.repetitions,
+                              base_seed=args.base_seed,
+                              resume=args.resume,
+                              progress_interval=args.progress_interval,
+                              stall_seconds=args.stall_after,
+                              retries=args.retries,
+                              retry_delay=args.retry_delay,
+                              queue=args.queue)
     
     # Check if gem5 binary exists
     if not os.path.exists(runner.gem5_binary):
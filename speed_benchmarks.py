@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Simulator-speed regression suite for the Thoth SimObjects
+
+run_benchmarks.py measures how well the PCB coalesces; this measures how
+fast gem5 simulates the Thoth models. Each case is a fixed, seeded
+configuration of configs/example/thoth_full_demo.py that concentrates the
+event load on one model. The figure of merit is host time per simulated
+partial: gem5's hostSeconds (simulation loop only, no startup or Python
+config) divided by the partials the traffic generators sent. Each case
+runs --repeats times and keeps the fastest run, since host noise only
+ever slows a run down.
+
+Results are compared against a stored baseline and any case slower by
+more than --threshold is flagged. The exit status is non-zero on a
+regression, so the suite can gate a merge. Baselines are host-specific.
+Record one on the machine that will run the comparison:
+
+    ./speed_benchmarks.py --update-baseline     # after a known-good build
+    ./speed_benchmarks.py                       # compare against it
+    ./speed_benchmarks.py --cases pcb_overflow aes_ctr --threshold 0.05
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from results_store import (ResultsStore, SUITE_SPEED, code_identity,
+                           read_stats_file, run_measured)
+
+GEM5_BINARY = "./build/RISCV/gem5.opt"
+CONFIG_SCRIPT = "configs/example/thoth_full_demo.py"
+OUTPUT_DIR = "speed_results"
+BASELINE_FILE = "benchmarks/speed_baseline.json"
+
+# Every case pins the seed and simulated time so the simulated work is
+# identical from run to run; only the host time may change.
+RUN = {"seed": 1, "duration": "20ms", "converge": False}
+
+SPEED_CASES = {
+    "trafficgen_stream": {
+        "description": "MetadataTrafficGen at full rate, closed-loop window",
+        "overrides": {
+            "traffic_gen": {"burst_size": 400, "burst_interval": "500us",
+                            "request_latency": "1us", "max_outstanding": 32},
+        },
+    },
+    "pcb_hit": {
+        "description": "MetadataCache PCB hits: 4KB footprint, every block coalesces",
+        "overrides": {
+            "traffic_gen": {"end_addr": 0x100001000, "burst_size": 200,
+                            "request_latency": "2us", "max_outstanding": 32},
+        },
+    },
+    "pcb_overflow": {
+        "description": "MetadataCache PCB overflow to PLUB: 16-entry PCB, 1MB stream",
+        "overrides": {
+            "traffic_gen": {"burst_size": 200, "request_latency": "2us",
+                            "max_outstanding": 32},
+            "metadata_cache": {"pcb_capacity": 16},
+        },
+    },
+    "cache_evict": {
+        "description": "MetadataCache eviction-heavy: 64 sets x 2 ways under a 1MB stream",
+        "overrides": {
+            "traffic_gen": {"burst_size": 200, "request_latency": "2us",
+                            "max_outstanding": 32},
+            "metadata_cache": {"num_sets": 64, "num_ways": 2},
+        },
+    },
+    "aes_ctr": {
+        "description": "AESCTRGenerator: per-partial keystream, small counter cache, pad prefetch",
+        "overrides": {
+            "traffic_gen": {"burst_size": 200, "request_latency": "2us",
+                            "max_outstanding": 32, "read_fraction": 0.25},
+            "aes_gen": {"batch_size": 1, "num_engines": 1,
+                        "counter_cache_entries": 16, "pad_cache_entries": 64,
+                        "prefetch_degree": 4},
+        },
+    },
+    "nvmain_writes": {
+        "description": "NVMainControl write stream: tiny cache and PCB, 1ms flushes, 4 channels",
+        "overrides": {
+            "traffic_gen": {"burst_size": 200, "request_latency": "2us",
+                            "max_outstanding": 32},
+            "metadata_cache": {"num_sets": 16, "pcb_capacity": 16,
+                               "flush_interval": "1ms"},
+            "run": {"nvm_channels": 4},
+        },
+    },
+}
+
+
+def case_overrides(case):
+    overrides = json.loads(json.dumps(SPEED_CASES[case]["overrides"]))
+    overrides["run"] = dict(RUN, **overrides.get("run", {}))
+    return overrides
+
+
+def host_fingerprint():
+    """What a baseline is only valid for"""
+    cpu = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            match = re.search(r"^model name\s*:\s*(.+)$", f.read(), re.M)
+            if match:
+                cpu = match.group(1).strip()
+    except OSError:
+        pass
+    return {"node": platform.node(), "cpu": cpu, "machine": platform.machine()}
+
+
+def run_case(case, repeat):
+    """One simulation of a case; returns its speed sample or None"""
+    output_dir = Path(OUTPUT_DIR) / f"{case}_r{repeat}"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    cmd = [
+        GEM5_BINARY,
+        "--outdir", str(output_dir),
+        CONFIG_SCRIPT,
+        "--params-json", json.dumps(case_overrides(case))
+    ]
+
+    try:
+        returncode, stdout, stderr, host = run_measured(cmd, timeout=1200)
+    except subprocess.TimeoutExpired:
+        print(f"  ✗ {case} timed out")
+        return None, output_dir, {}, {}
+
+    with open(output_dir / "simulation.log", "w") as f:
+        f.write(stdout)
+        f.write(stderr)
+    if returncode != 0:
+        print(f"  ✗ {case} failed (exit {returncode}), see {output_dir / 'simulation.log'}")
+        return None, output_dir, {}, host
+
+    stats = read_stats_file(output_dir / "stats.txt")
+    partials = sum(value for name, value in stats.items()
+                   if re.fullmatch(r"system\.traffic_gen\d*\.requestsSent", name))
+    host_seconds = stats.get("hostSeconds")
+    if not partials or not host_seconds:
+        print(f"  ✗ {case}: no requestsSent/hostSeconds in stats.txt")
+        return None, output_dir, stats, host
+
+    sample = {
+        "partials": int(partials),
+        "simTicks": int(stats.get("simTicks", 0)),
+        "hostSeconds": host_seconds,
+        "hostCpuSeconds": host["hostCpuSeconds"],
+        "hostPeakRssMB": host["hostPeakRssMB"],
+        "usPerPartial": host_seconds / partials * 1e6,
+    }
+    print(f"  ✓ {case} r{repeat}: {sample['usPerPartial']:.2f} µs/partial "
+          f"({sample['partials']:,} partials, {host_seconds:.2f}s)")
+    return sample, output_dir, stats, host
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, threshold):
+    """Regression verdict per case against the baseline"""
+    verdicts = {}
+    for case, best in results.items():
+        base = (baseline or {}).get("cases", {}).get(case)
+        if best is None:
+            verdicts[case] = ("FAILED", None)
+        elif base is None:
+            verdicts[case] = ("NEW", None)
+        else:
+            change = best["usPerPartial"] / base["usPerPartial"] - 1.0
+            if best["partials"] != base["partials"]:
+                # The model now does different work; speed is not comparable
+                verdicts[case] = ("WORK CHANGED", change)
+            elif change > threshold:
+                verdicts[case] = ("REGRESSION", change)
+            elif change < -threshold:
+                verdicts[case] = ("FASTER", change)
+            else:
+                verdicts[case] = ("ok", change)
+    return verdicts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Thoth simulator-speed regression suite")
+    parser.add_argument("--cases", nargs="+", choices=sorted(SPEED_CASES),
+                        default=list(SPEED_CASES), help="Cases to run (default: all)")
+    parser.add_argument("--repeats", type=int, default=3,
+                        help="Runs per case; the fastest counts")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Flag cases slower than the baseline by more than this fraction")
+    parser.add_argument("--baseline", default=BASELINE_FILE,
+                        help="Baseline JSON to compare against or update")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Write this run's results as the new baseline")
+    args = parser.parse_args()
+
+    if not os.path.exists(GEM5_BINARY):
+        print(f"❌ Error: gem5 binary not found at {GEM5_BINARY}")
+        return 2
+
+    print("=" * 70)
+    print("⏱️  Thoth simulator-speed suite")
+    print("=" * 70)
+
+    store = ResultsStore()
+    identity = code_identity(GEM5_BINARY)
+    results = {}
+
+    for case in args.cases:
+        print(f"\n{case}: {SPEED_CASES[case]['description']}")
+        samples = []
+        for repeat in range(max(1, args.repeats)):
+            sample, output_dir, stats, host = run_case(case, repeat)
+            params = dict(case=case, repeat=repeat, name=case)
+            store.record_run(SUITE_SPEED, "speed", f"{case}_r{repeat}",
+                             params=params, stats=stats, host=host,
+                             status="ok" if sample else "failed",
+                             outdir=output_dir, identity=identity)
+            if sample:
+                samples.append(sample)
+        results[case] = min(samples, key=lambda s: s["usPerPartial"]) \
+            if samples else None
+
+    baseline = load_baseline(args.baseline)
+    verdicts = compare(results, baseline, args.threshold)
+
+    print("\n" + "=" * 70)
+    if baseline:
+        print(f"Baseline: {args.baseline} ({baseline.get('created', '?')}, "
+              f"rev {(baseline.get('git_rev') or 'unknown')[:10]})")
+        if baseline.get("host") != host_fingerprint():
+            print("⚠️  Baseline was recorded on a different host; "
+                  "differences may not be regressions")
+    else:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+    print(f"{'Case':20s} {'µs/partial':>11s} {'Baseline':>10s} {'Change':>8s}  Verdict")
+    for case in args.cases:
+        best = results[case]
+        base = (baseline or {}).get("cases", {}).get(case)
+        verdict, change = verdicts[case]
+        current = f"{best['usPerPartial']:.2f}" if best else "-"
+        previous = f"{base['usPerPartial']:.2f}" if base else "-"
+        delta = f"{change:+.1%}" if change is not None else "-"
+        print(f"{case:20s} {current:>11s} {previous:>10s} {delta:>8s}  {verdict}")
+    if any(verdict == "WORK CHANGED" for verdict, _ in verdicts.values()):
+        print("ℹ️  WORK CHANGED: the case sent a different number of partials "
+              "than in the baseline; re-record the baseline if intended")
+    print("=" * 70)
+
+    if args.update_baseline:
+        if any(best is None for best in results.values()):
+            print("❌ Not updating the baseline: some cases failed")
+            return 1
+        old_cases = (baseline or {}).get("cases", {})
+        Path(args.baseline).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "git_rev": identity.get("git_rev"),
+                "host": host_fingerprint(),
+                "cases": dict(old_cases, **results),
+            }, f, indent=2)
+        print(f"✅ Baseline written to {args.baseline}")
+        return 0
+
+    regressions = [case for case, (verdict, _) in verdicts.items()
+                   if verdict in ("REGRESSION", "FAILED")]
+    if regressions:
+        print(f"❌ Slower than baseline by more than {args.threshold:.0%} "
+              f"(or failed): {', '.join(regressions)}")
+        return 1
+    print("✅ No speed regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,10 @@
 #include "dev/security/aes_ctr_generator.hh"
 
+#include <algorithm>
+
 #include "base/logging.hh"
 #include "debug/AesCtrGen.hh"
+#include "mem/packet.hh"
 #include "params/AESCTRGenerator.hh"
 
 namespace gem5
@@ -10,6 +13,69 @@ namespace gem5
 namespace security
 {
 
+AESCTRGenerator::CPUSidePort::CPUSidePort(const std::string &name,
+                                          AESCTRGenerator &owner)
+    : ResponsePort(name), owner(owner)
+{
+}
+
+AddrRangeList
+AESCTRGenerator::CPUSidePort::getAddrRanges() const
+{
+    return owner.memSidePort.getAddrRanges();
+}
+
+Tick
+AESCTRGenerator::CPUSidePort::recvAtomic(PacketPtr pkt)
+{
+    // Atomic accesses always pay for an on-demand pad
+    return owner.latency + owner.memSidePort.sendAtomic(pkt);
+}
+
+void
+AESCTRGenerator::CPUSidePort::recvFunctional(PacketPtr pkt)
+{
+    owner.memSidePort.sendFunctional(pkt);
+}
+
+bool
+AESCTRGenerator::CPUSidePort::recvTimingReq(PacketPtr pkt)
+{
+    return owner.handleRequest(pkt);
+}
+
+void
+AESCTRGenerator::CPUSidePort::recvRespRetry()
+{
+    owner.sendResponses();
+}
+
+AESCTRGenerator::MemSidePort::MemSidePort(const std::string &name,
+                                          AESCTRGenerator &owner)
+    : RequestPort(name), owner(owner)
+{
+}
+
+bool
+AESCTRGenerator::MemSidePort::recvTimingResp(PacketPtr pkt)
+{
+    owner.handleResponse(pkt);
+    return true;
+}
+
+void
+AESCTRGenerator::MemSidePort::recvReqRetry()
+{
+    owner.memSideBlocked = false;
+    owner.sendRequests();
+}
+
+void
+AESCTRGenerator::MemSidePort::recvRangeChange()
+{
+    owner.cpuSidePort.sendRangeChange();
+}
+
 AESCTRGenerator::AESCTRGenerator(const AESCTRGeneratorParams &params)
     : ClockedObject(params),
       latency(params.latency),
@@ -17,11 +83,31 @@ AESCTRGenerator::AESCTRGenerator(const AESCTRGeneratorParams &params)
       nextCounter(params.start_counter),
       keySeed(params.key_seed),
       remainingRequests(params.test_requests),
+      batchSize(params.batch_size),
+      ringHead(0),
+      ringCount(0),
       generateEvent([this] { processNext(); }, name()),
+      cpuSidePort(name() + ".cpu_side", *this),
+      memSidePort(name() + ".mem_side", *this),
+      numEngines(params.num_engines),
+      counterCacheEntries(params.counter_cache_entries),
+      maxPending(params.max_pending),
+      engineFree(params.num_engines, 0),
+      metadataCache(params.metadata_cache),
+      padCacheEntries(params.pad_cache_entries),
+      prefetchDegree(params.prefetch_degree),
+      memSideBlocked(false),
+      cpuSideNeedsRetry(false),
+      sendEvent([this] { sendRequests(); }, name() + ".sendEvent"),
       stats(this)
 {
     fatal_if(latency <= 0, "AESCTRGenerator latency must be positive.");
     fatal_if(counterLatency < 0, "counter_latency cannot be negative.");
+    fatal_if(numEngines == 0, "AESCTRGenerator needs at least one engine.");
+    fatal_if(maxPending == 0, "max_pending must be positive.");
+    fatal_if(padCacheEntries == 0 && counterCacheEntries == 0,
+             "counter_cache_entries must be positive without pad "
+             "prefetching (pad_cache_entries=0).");
 
     // Initialize AES-CTR with the key derived from keySeed
     uint8_t key[16];
@@ -29,6 +115,25 @@ AESCTRGenerator::AESCTRGenerator(const AESCTRGeneratorParams &params)
         key[i] = (keySeed >> (8 * (i % 8))) & 0xff;
     }
     aesCtr = std::make_unique<AES128CTR>(key);
+
+    if (batchSize > 1) {
+        keystream = std::make_unique<AESCTRKeystream>(key);
+        keystreamRing.resize(batchSize);
+        inform("AESCTRGenerator: batched keystream, %llu counters/window, "
+               "AES-NI %s", batchSize,
+               keystream->usingAESNI() ? "enabled" : "unavailable");
+    }
+}
+
+Port &
+AESCTRGenerator::getPort(const std::string &if_name, PortID idx)
+{
+    if (if_name == "cpu_side") {
+        return cpuSidePort;
+    } else if (if_name == "mem_side") {
+        return memSidePort;
+    }
+    return ClockedObject::getPort(if_name, idx);
 }
 
 void
@@ -43,13 +148,48 @@ AESCTRGenerator::startup()
     }
 }
 
+uint64_t
+AESCTRGenerator::nextBatchedPartial(bool &refilled)
+{
+    refilled = false;
+    if (ringCount == 0) {
+        // Whole window in one call; nextCounter is the window's first
+        keystream->generate(nextCounter, keystreamRing.data(), batchSize);
+        ringHead = 0;
+        ringCount = batchSize;
+        refilled = true;
+        stats.keystreamRefills++;
+        DPRINTF(AesCtrGen, "Refilled keystream ring: counters [%#llx, %#llx)\n",
+                (unsigned long long)nextCounter,
+                (unsigned long long)(nextCounter + batchSize));
+    } else {
+        stats.bufferedPartials++;
+    }
+
+    uint64_t partial = keystreamRing[ringHead];
+    ringHead = (ringHead + 1) % batchSize;
+    ringCount--;
+    return partial;
+}
+
 void
 AESCTRGenerator::processNext()
 {
-    const Tick genLatency = latency + counterLatency;
+    Tick genLatency = latency + counterLatency;
 
-    // Use real AES-CTR to generate the partial from the counter
-    uint64_t partial = aesCtr->generatePartial(nextCounter);
+    uint64_t partial;
+    if (keystream) {
+        // Only a refill pays the AES latency; buffered partials are
+        // served one per cycle
+        bool refilled;
+        partial = nextBatchedPartial(refilled);
+        if (!refilled) {
+            genLatency = clockPeriod() + counterLatency;
+        }
+    } else {
+        // Use real AES-CTR to generate the partial from the counter
+        partial = aesCtr->generatePartial(nextCounter);
+    }
 
     // Mask to 53 bits to fit in statistics::Scalar (stored as double)
     partial &= ((1ULL << 53) - 1);
@@ -72,7 +212,279 @@ AESCTRGenerator::processNext()
     if (remainingRequests > 0) {
         schedule(generateEvent, curTick() + genLatency);
     }
-}AESCTRGenerator::Statistics::Statistics(statistics::Group *parent)
+}
+
+AESCTRGenerator::CounterEntry *
+AESCTRGenerator::lookupCounter(Addr blockAddr)
+{
+    auto it = counterMap.find(blockAddr);
+    if (it == counterMap.end()) {
+        return nullptr;
+    }
+    counterLRU.splice(counterLRU.begin(), counterLRU, it->second);
+    return &*it->second;
+}
+
+AESCTRGenerator::CounterEntry &
+AESCTRGenerator::insertCounter(Addr blockAddr)
+{
+    if (counterLRU.size() >= counterCacheEntries) {
+        counterMap.erase(counterLRU.back().blockAddr);
+        counterLRU.pop_back();
+    }
+    counterLRU.push_front({blockAddr, nextCounter, 0});
+    counterMap[blockAddr] = counterLRU.begin();
+    return counterLRU.front();
+}
+
+Tick
+AESCTRGenerator::reserveEngine(Tick earliest)
+{
+    // Earliest-free engine takes the pad
+    auto engine = std::min_element(engineFree.begin(), engineFree.end());
+    Tick start = std::max(earliest, *engine);
+    stats.engineQueueTicks += start - earliest;
+    stats.engineBusyTicks += latency;
+    stats.generatedPartials++;
+    *engine = start + latency;
+    return *engine;
+}
+
+Tick
+AESCTRGenerator::padReadyTick(PacketPtr pkt)
+{
+    const Addr blockAddr = pkt->getAddr() & ~(metadataBlockSize - 1);
+    const Tick xorLatency = clockPeriod();
+    Tick ready;
+
+    CounterEntry *entry = lookupCounter(blockAddr);
+    if (entry) {
+        // Counter on chip: the pad was precomputed after the last access
+        stats.counterCacheHits++;
+        if (entry->padReady > curTick()) {
+            stats.padWaits++;
+        }
+        ready = std::max(curTick(), entry->padReady) + xorLatency;
+    } else {
+        // Fetch the counter, then generate the pad on demand
+        stats.counterCacheMisses++;
+        stats.padsOnDemand++;
+        entry = &insertCounter(blockAddr);
+        ready = reserveEngine(curTick() + counterLatency) + xorLatency;
+        entry->padReady = ready;
+    }
+
+    if (pkt->isWrite()) {
+        // The write consumes this pad; precompute the one for the next
+        // counter value while the block is still cached
+        entry->counter++;
+        entry->padReady = reserveEngine(ready);
+        stats.padsPrecomputed++;
+    }
+
+    stats.generatedCounters++;
+    stats.lastCounter = entry->counter & ((1ULL << 53) - 1);
+    DPRINTF(AesCtrGen, "Stage %s addr=%#x counter=%#llx ready in %llu ticks\n",
+            pkt->cmdString(), pkt->getAddr(),
+            (unsigned long long)entry->counter, ready - curTick());
+    return ready;
+}
+
+AESCTRGenerator::PadEntry *
+AESCTRGenerator::lookupPad(Addr slotAddr, uint64_t counter)
+{
+    auto it = padMap.find({slotAddr, counter});
+    if (it == padMap.end()) {
+        return nullptr;
+    }
+    padLRU.splice(padLRU.begin(), padLRU, it->second);
+    return &*it->second;
+}
+
+void
+AESCTRGenerator::insertPad(Addr slotAddr, uint64_t counter, Tick ready)
+{
+    if (padLRU.size() >= padCacheEntries) {
+        const PadEntry &victim = padLRU.back();
+        if (victim.prefetched && !victim.used) {
+            stats.prefetchUseless++;
+        }
+        padMap.erase({victim.slotAddr, victim.counter});
+        padLRU.pop_back();
+    }
+    padLRU.push_front({slotAddr, counter, ready, true, false});
+    padMap[{slotAddr, counter}] = padLRU.begin();
+}
+
+void
+AESCTRGenerator::prefetchPads(Addr slotAddr, uint64_t counter, Tick earliest)
+{
+    stats.counterPredictions++;
+    for (unsigned i = 1; i <= prefetchDegree; i++) {
+        if (lookupPad(slotAddr, counter + i)) {
+            continue;
+        }
+        insertPad(slotAddr, counter + i, reserveEngine(earliest));
+        stats.prefetchIssued++;
+    }
+}
+
+Tick
+AESCTRGenerator::prefetchPadReadyTick(PacketPtr pkt)
+{
+    const Addr slotAddr = pkt->getAddr() & ~Addr(7);
+    const Tick xorLatency = clockPeriod();
+
+    // Counter currently held by the metadata cache line, if any
+    uint64_t cached = 0;
+    bool known = metadataCache && metadataCache->peekCounter(slotAddr, cached);
+
+    // A write carries the new counter; a read needs the current one.
+    // Without either the slot's counter is unknown: nothing to match a
+    // prefetched pad against and nothing to predict from.
+    uint64_t counter = 0;
+    bool have_counter = true;
+    if (pkt->isWrite() && pkt->getSize() == sizeof(uint64_t)) {
+        counter = pkt->getLE<uint64_t>();
+    } else if (known) {
+        counter = cached + (pkt->isWrite() ? 1 : 0);
+    } else {
+        have_counter = false;
+    }
+
+    Tick ready;
+    PadEntry *pad = have_counter ? lookupPad(slotAddr, counter) : nullptr;
+    if (pad) {
+        if (pad->ready <= curTick()) {
+            stats.prefetchHits++;
+        } else {
+            stats.prefetchLate++;
+        }
+        if (!pad->used) {
+            stats.prefetchUseful++;
+            pad->used = true;
+        }
+        ready = std::max(curTick(), pad->ready) + xorLatency;
+    } else {
+        // Mispredicted or never predicted: generate on demand, after
+        // fetching the counter if the cache did not hold it
+        stats.padCacheMisses++;
+        stats.padsOnDemand++;
+        Tick start = curTick() + (known ? 0 : counterLatency);
+        ready = reserveEngine(start) + xorLatency;
+    }
+
+    // Predict the slot's next counter values and start their pads now,
+    // hidden behind whatever latency follows this access
+    if (have_counter) {
+        prefetchPads(slotAddr, counter, curTick());
+        stats.lastCounter = counter & ((1ULL << 53) - 1);
+    }
+
+    stats.generatedCounters++;
+    DPRINTF(AesCtrGen, "Prefetch stage %s addr=%#x counter=%#llx %s, "
+            "ready in %llu ticks\n", pkt->cmdString(), pkt->getAddr(),
+            (unsigned long long)counter, pad ? "pad hit" : "pad miss",
+            ready - curTick());
+    return ready;
+}
+
+bool
+AESCTRGenerator::handleRequest(PacketPtr pkt)
+{
+    if (readyRequests.size() >= maxPending) {
+        stats.blockedRequests++;
+        cpuSideNeedsRetry = true;
+        return false;
+    }
+
+    stats.stageRequests++;
+    Tick ready = padCacheEntries > 0 ? prefetchPadReadyTick(pkt)
+                                     : padReadyTick(pkt);
+
+    // Keep same-slot requests in arrival order: a later write that hits
+    // a prefetched pad must not reach the cache before the one it follows
+    SlotOrder &slot = slotOrder[pkt->getAddr() & ~Addr(7)];
+    if (!slot.pending.empty()) {
+        ready = std::max(ready, slot.lastReady);
+    }
+    slot.lastReady = ready;
+    slot.pending.push_back(pkt);
+
+    stats.stageLatency.sample(ready - curTick());
+    readyRequests.emplace(ready, pkt);
+
+    if (!memSideBlocked) {
+        Tick next = readyRequests.begin()->first;
+        if (!sendEvent.scheduled()) {
+            schedule(sendEvent, next);
+        } else if (sendEvent.when() > next) {
+            reschedule(sendEvent, next);
+        }
+    }
+    return true;
+}
+
+void
+AESCTRGenerator::sendRequests()
+{
+    // An event scheduled before the port blocked must not send while we
+    // wait for recvReqRetry
+    if (memSideBlocked) {
+        return;
+    }
+
+    while (!readyRequests.empty() &&
+           readyRequests.begin()->first <= curTick()) {
+        PacketPtr pkt = readyRequests.begin()->second;
+        const Addr slotAddr = pkt->getAddr() & ~Addr(7);
+        if (!memSidePort.sendTimingReq(pkt)) {
+            memSideBlocked = true;
+            return;  // Resumed by recvReqRetry
+        }
+        readyRequests.erase(readyRequests.begin());
+
+        auto slot = slotOrder.find(slotAddr);
+        assert(slot != slotOrder.end() &&
+               slot->second.pending.front() == pkt);
+        slot->second.pending.pop_front();
+        if (slot->second.pending.empty()) {
+            slotOrder.erase(slot);
+        }
+    }
+
+    if (!readyRequests.empty() && !sendEvent.scheduled()) {
+        schedule(sendEvent, readyRequests.begin()->first);
+    }
+
+    if (cpuSideNeedsRetry && readyRequests.size() < maxPending) {
+        cpuSideNeedsRetry = false;
+        cpuSidePort.sendRetryReq();
+    }
+}
+
+void
+AESCTRGenerator::handleResponse(PacketPtr pkt)
+{
+    // Read data is decrypted with the pad already held for the request
+    pendingResponses.push_back(pkt);
+    if (pendingResponses.size() == 1) {
+        sendResponses();
+    }
+}
+
+void
+AESCTRGenerator::sendResponses()
+{
+    while (!pendingResponses.empty()) {
+        if (!cpuSidePort.sendTimingResp(pendingResponses.front())) {
+            return;  // Resumed by recvRespRetry
+        }
+        pendingResponses.pop_front();
+    }
+}
+
+AESCTRGenerator::Statistics::Statistics(statistics::Group *parent)
     : statistics::Group(parent),
       ADD_STAT(generatedCounters, statistics::units::Count::get(),
                "Number of counters produced"),
@@ -81,8 +493,58 @@ AESCTRGenerator::processNext()
       ADD_STAT(lastCounter, statistics::units::Count::get(),
                "Most recent counter value"),
       ADD_STAT(lastPartial, statistics::units::Count::get(),
-               "Most recent partial value")
+               "Most recent partial value"),
+      ADD_STAT(keystreamRefills, statistics::units::Count::get(),
+               "Keystream windows generated in batched mode"),
+      ADD_STAT(bufferedPartials, statistics::units::Count::get(),
+               "Partials served from the keystream ring without AES work"),
+      ADD_STAT(stageRequests, statistics::units::Count::get(),
+               "Metadata requests passing through the encryption stage"),
+      ADD_STAT(counterCacheHits, statistics::units::Count::get(),
+               "Requests whose counter was in the counter cache"),
+      ADD_STAT(counterCacheMisses, statistics::units::Count::get(),
+               "Requests that fetched their counter"),
+      ADD_STAT(padsPrecomputed, statistics::units::Count::get(),
+               "Pads generated ahead of use"),
+      ADD_STAT(padsOnDemand, statistics::units::Count::get(),
+               "Pads generated on the request's critical path"),
+      ADD_STAT(padWaits, statistics::units::Count::get(),
+               "Counter cache hits that waited for an unfinished pad"),
+      ADD_STAT(engineBusyTicks, statistics::units::Tick::get(),
+               "Total AES engine busy time across all engines"),
+      ADD_STAT(engineQueueTicks, statistics::units::Tick::get(),
+               "Total time pads waited for a free AES engine"),
+      ADD_STAT(blockedRequests, statistics::units::Count::get(),
+               "Requests refused because max_pending were in flight"),
+      ADD_STAT(stageLatency, statistics::units::Tick::get(),
+               "Encryption stage latency per request"),
+      ADD_STAT(counterCacheHitRate, statistics::units::Ratio::get(),
+               "Counter cache hit rate"),
+      ADD_STAT(prefetchIssued, statistics::units::Count::get(),
+               "Pads prefetched for predicted counter values"),
+      ADD_STAT(prefetchHits, statistics::units::Count::get(),
+               "Requests whose pad was prefetched and ready"),
+      ADD_STAT(prefetchLate, statistics::units::Count::get(),
+               "Requests whose pad was prefetched but still in flight"),
+      ADD_STAT(prefetchUseful, statistics::units::Count::get(),
+               "Prefetched pads used at least once"),
+      ADD_STAT(prefetchUseless, statistics::units::Count::get(),
+               "Prefetched pads evicted without being used"),
+      ADD_STAT(padCacheMisses, statistics::units::Count::get(),
+               "Requests with no prefetched pad"),
+      ADD_STAT(counterPredictions, statistics::units::Count::get(),
+               "Next-counter predictions made"),
+      ADD_STAT(prefetchAccuracy, statistics::units::Ratio::get(),
+               "Useful prefetches / issued prefetches"),
+      ADD_STAT(prefetchCoverage, statistics::units::Ratio::get(),
+               "Requests served by a prefetched pad / all stage requests")
 {
+    stageLatency.init(20);
+    counterCacheHitRate = counterCacheHits /
+        (counterCacheHits + counterCacheMisses);
+    prefetchAccuracy = prefetchUseful / prefetchIssued;
+    prefetchCoverage = (prefetchHits + prefetchLate) /
+        (prefetchHits + prefetchLate + padCacheMisses);
 }
 
 } // namespace security
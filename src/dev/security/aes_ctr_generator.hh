@@ -4,11 +4,19 @@
 #include "base/statistics.hh"
 #include "base/types.hh"
 #include "dev/security/aes128.hh"
+#include "dev/security/aes_ctr_keystream.hh"
+#include "mem/port.hh"
+#include "mem/security/metadata_cache.hh"
 #include "params/AESCTRGenerator.hh"
 #include "sim/clocked_object.hh"
 #include "sim/eventq.hh"
 
+#include <deque>
+#include <list>
+#include <map>
 #include <memory>
+#include <unordered_map>
+#include <vector>
 
 namespace gem5
 {
@@ -16,16 +24,104 @@ namespace gem5
 namespace security
 {
 
+/**
+ * AES-CTR pad generator.
+ *
+ * Standalone, it self-tests by generating test_requests partials. With
+ * cpu_side/mem_side connected it is the encryption (OTP) stage between
+ * MetadataTrafficGen and MetadataCache: every metadata request waits for
+ * its block's pad before it is forwarded.
+ *
+ * - Counter cache (counter_cache_entries, LRU): on a hit the block's
+ *   counter is on chip and the pad for its next value was precomputed
+ *   after the previous access, so only the XOR remains. On a miss the
+ *   counter is fetched (counter_latency) and the pad generated on demand.
+ * - num_engines AES engines, each busy for latency per pad. Precompute
+ *   and on-demand generation compete for the same engines.
+ * - Pad prefetching (pad_cache_entries > 0): after each access the next
+ *   prefetch_degree counter values of the 8B counter slot are predicted,
+ *   from the written value or from the counter held in the connected
+ *   MetadataCache line, and their pads generated into a bounded LRU pad
+ *   cache. Replaces the counter-cache model when enabled.
+ */
 class AESCTRGenerator : public ClockedObject
 {
   public:
     AESCTRGenerator(const AESCTRGeneratorParams &params);
 
+    Port &getPort(const std::string &if_name,
+                  PortID idx=InvalidPortID) override;
+
     void startup() override;
 
   private:
+    class CPUSidePort : public ResponsePort
+    {
+      private:
+        AESCTRGenerator &owner;
+
+      public:
+        CPUSidePort(const std::string &name, AESCTRGenerator &owner);
+
+      protected:
+        AddrRangeList getAddrRanges() const override;
+        Tick recvAtomic(PacketPtr pkt) override;
+        void recvFunctional(PacketPtr pkt) override;
+        bool recvTimingReq(PacketPtr pkt) override;
+        void recvRespRetry() override;
+    };
+
+    class MemSidePort : public RequestPort
+    {
+      private:
+        AESCTRGenerator &owner;
+
+      public:
+        MemSidePort(const std::string &name, AESCTRGenerator &owner);
+
+      protected:
+        bool recvTimingResp(PacketPtr pkt) override;
+        void recvReqRetry() override;
+        void recvRangeChange() override;
+    };
+
+    /** Per-block counter state held on chip */
+    struct CounterEntry {
+        Addr blockAddr;
+        uint64_t counter;
+        Tick padReady;      // When the pad for the next use is available
+    };
+
+    /** Pad for one counter value of one 8B counter slot */
+    struct PadEntry {
+        Addr slotAddr;
+        uint64_t counter;
+        Tick ready;
+        bool prefetched;
+        bool used;
+    };
+
     void processNext();
 
+    /** Next partial from the keystream ring, refilling it when drained */
+    uint64_t nextBatchedPartial(bool &refilled);
+
+    // Encryption stage
+    bool handleRequest(PacketPtr pkt);
+    void handleResponse(PacketPtr pkt);
+    Tick padReadyTick(PacketPtr pkt);
+    Tick reserveEngine(Tick earliest);
+    CounterEntry *lookupCounter(Addr blockAddr);
+    CounterEntry &insertCounter(Addr blockAddr);
+    void sendRequests();
+    void sendResponses();
+
+    // Pad prefetching
+    Tick prefetchPadReadyTick(PacketPtr pkt);
+    void prefetchPads(Addr slotAddr, uint64_t counter, Tick earliest);
+    PadEntry *lookupPad(Addr slotAddr, uint64_t counter);
+    void insertPad(Addr slotAddr, uint64_t counter, Tick ready);
+
     const Tick latency;
     const Tick counterLatency;
     uint64_t nextCounter;
@@ -34,8 +130,60 @@ class AESCTRGenerator : public ClockedObject
 
     std::unique_ptr<AES128CTR> aesCtr;
 
+    /**
+     * Batched mode (batch_size > 1): keystream for batchSize consecutive
+     * counters is generated in one call and served from a ring buffer.
+     */
+    const uint64_t batchSize;
+    std::unique_ptr<AESCTRKeystream> keystream;
+    std::vector<uint64_t> keystreamRing;
+    size_t ringHead;
+    size_t ringCount;
+
     EventFunctionWrapper generateEvent;
 
+    CPUSidePort cpuSidePort;
+    MemSidePort memSidePort;
+
+    const unsigned numEngines;
+    const unsigned counterCacheEntries;
+    const unsigned maxPending;
+    const Addr metadataBlockSize = 64;
+
+    /** Tick at which each AES engine becomes free */
+    std::vector<Tick> engineFree;
+
+    /** Counter cache, most recently used at the front */
+    std::list<CounterEntry> counterLRU;
+    std::unordered_map<Addr, std::list<CounterEntry>::iterator> counterMap;
+
+    /** Requests waiting for their pad, ordered by ready tick */
+    std::multimap<Tick, PacketPtr> readyRequests;
+
+    /**
+     * Requests in the stage per 8B slot, in arrival order, and the ready
+     * tick of the newest. A request never becomes ready before an older
+     * one to the same slot, so a pad hit cannot overtake a pending write.
+     */
+    struct SlotOrder {
+        Tick lastReady;
+        std::deque<PacketPtr> pending;
+    };
+    std::unordered_map<Addr, SlotOrder> slotOrder;
+    std::deque<PacketPtr> pendingResponses;
+
+    /** Pad cache for prefetched pads, most recently used at the front */
+    memory::MetadataCache *metadataCache;
+    const unsigned padCacheEntries;
+    const unsigned prefetchDegree;
+    std::list<PadEntry> padLRU;
+    std::map<std::pair<Addr, uint64_t>,
+             std::list<PadEntry>::iterator> padMap;
+
+    bool memSideBlocked;
+    bool cpuSideNeedsRetry;
+    EventFunctionWrapper sendEvent;
+
     struct Statistics : public statistics::Group
     {
         Statistics(statistics::Group *parent);
@@ -44,6 +192,32 @@ class AESCTRGenerator : public ClockedObject
         statistics::Scalar generatedPartials;
         statistics::Scalar lastCounter;
         statistics::Scalar lastPartial;
+        statistics::Scalar keystreamRefills;
+        statistics::Scalar bufferedPartials;
+
+        // Encryption stage statistics
+        statistics::Scalar stageRequests;
+        statistics::Scalar counterCacheHits;
+        statistics::Scalar counterCacheMisses;
+        statistics::Scalar padsPrecomputed;
+        statistics::Scalar padsOnDemand;
+        statistics::Scalar padWaits;
+        statistics::Scalar engineBusyTicks;
+        statistics::Scalar engineQueueTicks;
+        statistics::Scalar blockedRequests;
+        statistics::Histogram stageLatency;
+        statistics::Formula counterCacheHitRate;
+
+        // Pad prefetch statistics
+        statistics::Scalar prefetchIssued;
+        statistics::Scalar prefetchHits;
+        statistics::Scalar prefetchLate;
+        statistics::Scalar prefetchUseful;
+        statistics::Scalar prefetchUseless;
+        statistics::Scalar padCacheMisses;
+        statistics::Scalar counterPredictions;
+        statistics::Formula prefetchAccuracy;
+        statistics::Formula prefetchCoverage;
     } stats;
 };
 
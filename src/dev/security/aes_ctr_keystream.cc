@@ -0,0 +1,256 @@
+#include "dev/security/aes_ctr_keystream.hh"
+
+#include <cstring>
+
+#if defined(__x86_64__) || defined(__i386__)
+#include <cpuid.h>
+#include <immintrin.h>
+#define AES_CTR_KEYSTREAM_X86 1
+#endif
+
+namespace gem5
+{
+
+namespace security
+{
+
+namespace
+{
+
+const uint8_t sbox[256] = {
+    0x63, 0x7c, 0x77, 0x7b, 0xf2, 0x6b, 0x6f, 0xc5,
+    0x30, 0x01, 0x67, 0x2b, 0xfe, 0xd7, 0xab, 0x76,
+    0xca, 0x82, 0xc9, 0x7d, 0xfa, 0x59, 0x47, 0xf0,
+    0xad, 0xd4, 0xa2, 0xaf, 0x9c, 0xa4, 0x72, 0xc0,
+    0xb7, 0xfd, 0x93, 0x26, 0x36, 0x3f, 0xf7, 0xcc,
+    0x34, 0xa5, 0xe5, 0xf1, 0x71, 0xd8, 0x31, 0x15,
+    0x04, 0xc7, 0x23, 0xc3, 0x18, 0x96, 0x05, 0x9a,
+    0x07, 0x12, 0x80, 0xe2, 0xeb, 0x27, 0xb2, 0x75,
+    0x09, 0x83, 0x2c, 0x1a, 0x1b, 0x6e, 0x5a, 0xa0,
+    0x52, 0x3b, 0xd6, 0xb3, 0x29, 0xe3, 0x2f, 0x84,
+    0x53, 0xd1, 0x00, 0xed, 0x20, 0xfc, 0xb1, 0x5b,
+    0x6a, 0xcb, 0xbe, 0x39, 0x4a, 0x4c, 0x58, 0xcf,
+    0xd0, 0xef, 0xaa, 0xfb, 0x43, 0x4d, 0x33, 0x85,
+    0x45, 0xf9, 0x02, 0x7f, 0x50, 0x3c, 0x9f, 0xa8,
+    0x51, 0xa3, 0x40, 0x8f, 0x92, 0x9d, 0x38, 0xf5,
+    0xbc, 0xb6, 0xda, 0x21, 0x10, 0xff, 0xf3, 0xd2,
+    0xcd, 0x0c, 0x13, 0xec, 0x5f, 0x97, 0x44, 0x17,
+    0xc4, 0xa7, 0x7e, 0x3d, 0x64, 0x5d, 0x19, 0x73,
+    0x60, 0x81, 0x4f, 0xdc, 0x22, 0x2a, 0x90, 0x88,
+    0x46, 0xee, 0xb8, 0x14, 0xde, 0x5e, 0x0b, 0xdb,
+    0xe0, 0x32, 0x3a, 0x0a, 0x49, 0x06, 0x24, 0x5c,
+    0xc2, 0xd3, 0xac, 0x62, 0x91, 0x95, 0xe4, 0x79,
+    0xe7, 0xc8, 0x37, 0x6d, 0x8d, 0xd5, 0x4e, 0xa9,
+    0x6c, 0x56, 0xf4, 0xea, 0x65, 0x7a, 0xae, 0x08,
+    0xba, 0x78, 0x25, 0x2e, 0x1c, 0xa6, 0xb4, 0xc6,
+    0xe8, 0xdd, 0x74, 0x1f, 0x4b, 0xbd, 0x8b, 0x8a,
+    0x70, 0x3e, 0xb5, 0x66, 0x48, 0x03, 0xf6, 0x0e,
+    0x61, 0x35, 0x57, 0xb9, 0x86, 0xc1, 0x1d, 0x9e,
+    0xe1, 0xf8, 0x98, 0x11, 0x69, 0xd9, 0x8e, 0x94,
+    0x9b, 0x1e, 0x87, 0xe9, 0xce, 0x55, 0x28, 0xdf,
+    0x8c, 0xa1, 0x89, 0x0d, 0xbf, 0xe6, 0x42, 0x68,
+    0x41, 0x99, 0x2d, 0x0f, 0xb0, 0x54, 0xbb, 0x16,
+};
+
+const uint8_t rcon[10] = {
+    0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40, 0x80, 0x1b, 0x36,
+};
+
+inline uint8_t
+xtime(uint8_t x)
+{
+    return (x << 1) ^ ((x & 0x80) ? 0x1b : 0x00);
+}
+
+inline void
+counterBlock(uint64_t counter, uint8_t block[16])
+{
+    for (int i = 0; i < 8; i++) {
+        block[i] = (counter >> (8 * i)) & 0xff;
+    }
+    memset(block + 8, 0, 8);
+}
+
+inline uint64_t
+blockPartial(const uint8_t block[16])
+{
+    uint64_t partial = 0;
+    for (int i = 0; i < 8; i++) {
+        partial |= (uint64_t)block[i] << (8 * i);
+    }
+    return partial;
+}
+
+} // anonymous namespace
+
+AESCTRKeystream::AESCTRKeystream(const uint8_t key[16])
+    : useAESNI(hostHasAESNI())
+{
+    expandKey(key);
+}
+
+bool
+AESCTRKeystream::hostHasAESNI()
+{
+#ifdef AES_CTR_KEYSTREAM_X86
+    unsigned int eax, ebx, ecx, edx;
+    if (!__get_cpuid(1, &eax, &ebx, &ecx, &edx)) {
+        return false;
+    }
+    return (ecx & bit_AES) && (edx & bit_SSE2);
+#else
+    return false;
+#endif
+}
+
+void
+AESCTRKeystream::expandKey(const uint8_t key[16])
+{
+    memcpy(roundKeys, key, 16);
+
+    for (int i = 4; i < 44; i++) {
+        uint8_t temp[4];
+        memcpy(temp, &roundKeys[(i - 1) * 4], 4);
+
+        if (i % 4 == 0) {
+            // RotWord, SubWord, Rcon
+            uint8_t t0 = temp[0];
+            temp[0] = sbox[temp[1]] ^ rcon[i / 4 - 1];
+            temp[1] = sbox[temp[2]];
+            temp[2] = sbox[temp[3]];
+            temp[3] = sbox[t0];
+        }
+
+        for (int j = 0; j < 4; j++) {
+            roundKeys[i * 4 + j] = roundKeys[(i - 4) * 4 + j] ^ temp[j];
+        }
+    }
+}
+
+void
+AESCTRKeystream::encryptBlock(const uint8_t in[16], uint8_t out[16]) const
+{
+    uint8_t s[16];
+    for (int i = 0; i < 16; i++) {
+        s[i] = in[i] ^ roundKeys[i];
+    }
+
+    for (int round = 1; round <= 10; round++) {
+        // SubBytes + ShiftRows (state is column-major: s[row + 4 * col])
+        uint8_t t[16];
+        for (int c = 0; c < 4; c++) {
+            for (int r = 0; r < 4; r++) {
+                t[r + 4 * c] = sbox[s[r + 4 * ((c + r) % 4)]];
+            }
+        }
+
+        if (round < 10) {
+            // MixColumns
+            for (int c = 0; c < 4; c++) {
+                uint8_t *col = &t[4 * c];
+                uint8_t a0 = col[0], a1 = col[1], a2 = col[2], a3 = col[3];
+                uint8_t all = a0 ^ a1 ^ a2 ^ a3;
+                col[0] ^= all ^ xtime(a0 ^ a1);
+                col[1] ^= all ^ xtime(a1 ^ a2);
+                col[2] ^= all ^ xtime(a2 ^ a3);
+                col[3] ^= all ^ xtime(a3 ^ a0);
+            }
+        }
+
+        // AddRoundKey
+        const uint8_t *rk = &roundKeys[round * 16];
+        for (int i = 0; i < 16; i++) {
+            s[i] = t[i] ^ rk[i];
+        }
+    }
+
+    memcpy(out, s, 16);
+}
+
+uint64_t
+AESCTRKeystream::generatePartial(uint64_t counter) const
+{
+    uint64_t partial;
+    generate(counter, &partial, 1);
+    return partial;
+}
+
+void
+AESCTRKeystream::generate(uint64_t firstCounter, uint64_t *partials,
+                          size_t n) const
+{
+    if (useAESNI) {
+        generateAESNI(firstCounter, partials, n);
+    } else {
+        generatePortable(firstCounter, partials, n);
+    }
+}
+
+void
+AESCTRKeystream::generatePortable(uint64_t firstCounter, uint64_t *partials,
+                                  size_t n) const
+{
+    uint8_t in[16], out[16];
+    for (size_t i = 0; i < n; i++) {
+        counterBlock(firstCounter + i, in);
+        encryptBlock(in, out);
+        partials[i] = blockPartial(out);
+    }
+}
+
+#ifdef AES_CTR_KEYSTREAM_X86
+
+__attribute__((target("aes,sse2")))
+void
+AESCTRKeystream::generateAESNI(uint64_t firstCounter, uint64_t *partials,
+                               size_t n) const
+{
+    __m128i rk[11];
+    for (int r = 0; r < 11; r++) {
+        rk[r] = _mm_loadu_si128((const __m128i *)&roundKeys[r * 16]);
+    }
+
+    // Eight independent blocks keep the AES unit's pipeline full
+    const size_t lanes = 8;
+    size_t i = 0;
+    for (; i + lanes <= n; i += lanes) {
+        __m128i b[lanes];
+        for (size_t j = 0; j < lanes; j++) {
+            b[j] = _mm_xor_si128(
+                _mm_set_epi64x(0, (long long)(firstCounter + i + j)), rk[0]);
+        }
+        for (int r = 1; r < 10; r++) {
+            for (size_t j = 0; j < lanes; j++) {
+                b[j] = _mm_aesenc_si128(b[j], rk[r]);
+            }
+        }
+        for (size_t j = 0; j < lanes; j++) {
+            b[j] = _mm_aesenclast_si128(b[j], rk[10]);
+            _mm_storel_epi64((__m128i *)&partials[i + j], b[j]);
+        }
+    }
+
+    for (; i < n; i++) {
+        __m128i b = _mm_xor_si128(
+            _mm_set_epi64x(0, (long long)(firstCounter + i)), rk[0]);
+        for (int r = 1; r < 10; r++) {
+            b = _mm_aesenc_si128(b, rk[r]);
+        }
+        b = _mm_aesenclast_si128(b, rk[10]);
+        _mm_storel_epi64((__m128i *)&partials[i], b);
+    }
+}
+
+#else
+
+void
+AESCTRKeystream::generateAESNI(uint64_t firstCounter, uint64_t *partials,
+                               size_t n) const
+{
+    generatePortable(firstCounter, partials, n);
+}
+
+#endif
+
+} // namespace security
+} // namespace gem5
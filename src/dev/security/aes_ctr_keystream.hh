@@ -0,0 +1,60 @@
+#ifndef __DEV_SECURITY_AES_CTR_KEYSTREAM_HH__
+#define __DEV_SECURITY_AES_CTR_KEYSTREAM_HH__
+
+#include <cstddef>
+#include <cstdint>
+
+namespace gem5
+{
+
+namespace security
+{
+
+/**
+ * Batched AES-128 counter-mode keystream for 8-byte partials.
+ *
+ * Each counter c is encrypted as the 16-byte block
+ * { c (little-endian, bytes 0-7), 0 (bytes 8-15) } and the low 8 bytes of
+ * the ciphertext form the partial. A window of consecutive counters is
+ * produced per call; on x86 hosts with AES-NI the window is encrypted
+ * eight blocks at a time, otherwise a portable table-based cipher is used.
+ * Both paths produce identical keystream.
+ *
+ * Deliberately free of gem5 headers so the host microbenchmark in
+ * benchmarks/host can build it standalone.
+ */
+class AESCTRKeystream
+{
+  public:
+    explicit AESCTRKeystream(const uint8_t key[16]);
+
+    /** Write partials for counters [firstCounter, firstCounter + n) */
+    void generate(uint64_t firstCounter, uint64_t *partials, size_t n) const;
+
+    /** Single partial, same keystream as generate() */
+    uint64_t generatePartial(uint64_t counter) const;
+
+    /** True if the host CPU supports AES-NI */
+    static bool hostHasAESNI();
+
+    /** Force the portable path (e.g. for benchmarking); no-op without AES-NI */
+    void setUseAESNI(bool enable) { useAESNI = enable && hostHasAESNI(); }
+    bool usingAESNI() const { return useAESNI; }
+
+  private:
+    void expandKey(const uint8_t key[16]);
+    void encryptBlock(const uint8_t in[16], uint8_t out[16]) const;
+    void generatePortable(uint64_t firstCounter, uint64_t *partials,
+                          size_t n) const;
+    void generateAESNI(uint64_t firstCounter, uint64_t *partials,
+                       size_t n) const;
+
+    /** 11 round keys in FIPS-197 byte order */
+    uint8_t roundKeys[176];
+    bool useAESNI;
+};
+
+} // namespace security
+} // namespace gem5
+
+#endif // __DEV_SECURITY_AES_CTR_KEYSTREAM_HH__
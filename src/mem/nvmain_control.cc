@@ -1,8 +1,12 @@
 #include "mem/nvmain_control.hh"
 
+#include <algorithm>
+
+#include "base/intmath.hh"
 #include "base/logging.hh"
 #include "base/trace.hh"
 #include "debug/NVMain.hh"
+#include "sim/stats.hh"
 
 namespace gem5
 {
@@ -71,10 +75,55 @@ NVMainControl::NVMainControl(const Params &p)
       pendingRequest(nullptr),
       retryRespPkt(nullptr),
       retryReq(false),
-      stats(this)
+      retryReqSince(0),
+      writePausing(p.write_pausing),
+      writeCancellation(p.write_cancellation),
+      pauseOverhead(p.pause_overhead),
+      cancelThreshold(p.cancel_threshold),
+      maxWritePauses(p.max_write_pauses),
+      preemptedWrite(nullptr),
+      preemptedRemaining(0),
+      writeStart(0),
+      writeService(0),
+      writeDeadline(0),
+      writePreemptions(0),
+      wearLineSize(p.wear_line_size),
+      linesPerRegion(p.wear_region_size / p.wear_line_size),
+      numLines(divCeil(range.size(), p.wear_line_size)),
+      numRegions(divCeil(numLines, linesPerRegion)),
+      regionWrites(numRegions, 0),
+      stats(this, p.wear_leveling ? numLines + numRegions : numLines,
+            p.cell_endurance)
 {
+    fatal_if(wearLineSize == 0 || linesPerRegion < 2,
+             "%s: wear_region_size must hold at least two wear lines",
+             name());
+
+    if (p.wear_leveling) {
+        fatal_if(p.gap_move_interval == 0,
+                 "%s: gap_move_interval must be positive", name());
+        for (uint64_t r = 0; r < numRegions; r++) {
+            uint64_t lines = std::min(linesPerRegion,
+                                      numLines - r * linesPerRegion);
+            // A one-line tail region has nothing to rotate with
+            startGap.emplace_back(std::max<uint64_t>(lines, 1),
+                                  p.gap_move_interval);
+        }
+    }
+
     inform("NVMainControl: Config=%s, Read=%d ticks, Write=%d ticks",
            nvmainConfigPath, tRCD + tCL, tWR);
+    if (writePausing || writeCancellation) {
+        inform("NVMainControl: reads preempt writes (%s%s%s), "
+               "up to %d times per write", writePausing ? "pause" : "",
+               writePausing && writeCancellation ? "/" : "",
+               writeCancellation ? "cancel" : "", maxWritePauses);
+    }
+    if (p.wear_leveling) {
+        inform("NVMainControl: Start-Gap over %d regions of %d lines, "
+               "gap move every %d writes", numRegions, linesPerRegion,
+               p.gap_move_interval);
+    }
 }
 
 NVMainControl::~NVMainControl() = default;
@@ -104,6 +153,9 @@ NVMainControl::recvAtomic(PacketPtr pkt)
              "Should not see packets where cache is responding");
     access(pkt);
     Tick latency = packetLatency(pkt);
+    if (pkt->isWrite()) {
+        latency += wearWrite(pkt);
+    }
     recordStats(pkt, latency);
     return latency;
 }
@@ -141,7 +193,17 @@ NVMainControl::recvTimingReq(PacketPtr pkt)
              "NVMainControl expects read/write, saw %s to %#llx",
              pkt->cmdString(), pkt->getAddr());
 
+    if (canPreempt(pkt)) {
+        preemptWrite(pkt);
+        return true;
+    }
+
     if (pendingRequest || retryRespPkt) {
+        // Channel busy: the requester queues until we send a retry
+        stats.rejectedRequests++;
+        if (!retryReq) {
+            retryReqSince = curTick();
+        }
         retryReq = true;
         return false;
     }
@@ -153,7 +215,19 @@ NVMainControl::recvTimingReq(PacketPtr pkt)
     pendingRequest = pkt;
 
     Tick latency = receive_delay + packetLatency(pkt);
+    if (pkt->isWrite()) {
+        // A gap move due after this write holds the channel as well
+        latency += wearWrite(pkt);
+    }
     recordStats(pkt, latency);
+    stats.busyTicks += latency;
+
+    if (pkt->isWrite()) {
+        writeStart = curTick();
+        writeService = latency;
+        writeDeadline = curTick() + latency;
+        writePreemptions = 0;
+    }
 
     panic_if(responseEvent.scheduled(),
              "NVMainControl response event already scheduled");
@@ -171,6 +245,10 @@ NVMainControl::sendResponse()
 
     access(pkt);
 
+    if (pkt->isWrite() && writePreemptions > 0) {
+        stats.preemptedWriteDelay.sample(curTick() - writeDeadline);
+    }
+
     if (pkt->needsResponse()) {
         pkt->makeTimingResponse();
         if (!trySendTimingResp(pkt)) {
@@ -181,9 +259,83 @@ NVMainControl::sendResponse()
         pendingDelete.reset(pkt);
     }
 
+    resumeWrite();
     trySendRetry();
 }
 
+bool
+NVMainControl::canPreempt(const PacketPtr pkt) const
+{
+    if (!(writePausing || writeCancellation) || !pkt->isRead() ||
+        !pendingRequest || !pendingRequest->isWrite() ||
+        !responseEvent.scheduled() || preemptedWrite ||
+        writePreemptions >= maxWritePauses) {
+        return false;
+    }
+    // A read of bytes the write has not committed yet must wait for it
+    const PacketPtr write = pendingRequest;
+    if (pkt->getAddr() < write->getAddr() + write->getSize() &&
+        write->getAddr() < pkt->getAddr() + pkt->getSize()) {
+        return false;
+    }
+    // Cancellation alone only pays off while little of the write is done
+    return writePausing ||
+        curTick() - writeStart < cancelThreshold * writeService;
+}
+
+void
+NVMainControl::preemptWrite(PacketPtr read)
+{
+    Tick elapsed = curTick() - writeStart;
+    Tick remaining = responseEvent.when() - curTick();
+    deschedule(responseEvent);
+
+    Tick overhead = 0;
+    if (writeCancellation &&
+        (!writePausing || elapsed < cancelThreshold * writeService)) {
+        // Abort the write; it restarts in full once the read is served
+        stats.writeCancellations++;
+        stats.cancelledWriteTicks += elapsed;
+        stats.busyTicks += elapsed;
+        preemptedRemaining = writeService;
+        DPRINTF(NVMain, "Read %#llx cancels write %#llx after %d ticks\n",
+                read->getAddr(), pendingRequest->getAddr(), elapsed);
+    } else {
+        // Suspend the write after saving its progress
+        stats.writePauses++;
+        stats.pauseOverheadTicks += pauseOverhead;
+        overhead = pauseOverhead;
+        preemptedRemaining = remaining;
+        DPRINTF(NVMain, "Read %#llx pauses write %#llx, %d ticks left\n",
+                read->getAddr(), pendingRequest->getAddr(), remaining);
+    }
+    stats.readWaitSaved += remaining > overhead ? remaining - overhead : 0;
+    writePreemptions++;
+    preemptedWrite = pendingRequest;
+
+    Tick receive_delay = read->headerDelay + read->payloadDelay;
+    read->headerDelay = read->payloadDelay = 0;
+    Tick latency = receive_delay + overhead + packetLatency(read);
+    recordStats(read, latency);
+    stats.preemptingReadLatency.sample(latency);
+    stats.busyTicks += latency;
+
+    pendingRequest = read;
+    schedule(responseEvent, curTick() + latency);
+}
+
+void
+NVMainControl::resumeWrite()
+{
+    if (!preemptedWrite || pendingRequest || retryRespPkt) {
+        return;
+    }
+    pendingRequest = preemptedWrite;
+    preemptedWrite = nullptr;
+    writeStart = curTick() - (writeService - preemptedRemaining);
+    schedule(responseEvent, curTick() + preemptedRemaining);
+}
+
 bool
 NVMainControl::trySendTimingResp(PacketPtr pkt)
 {
@@ -197,6 +349,7 @@ void
 NVMainControl::trySendRetry()
 {
     if (retryReq && !pendingRequest && !retryRespPkt) {
+        stats.retryWait.sample(curTick() - retryReqSince);
         retryReq = false;
         port.sendRetryReq();
     }
@@ -211,6 +364,7 @@ NVMainControl::recvRespRetry()
 
     if (trySendTimingResp(retryRespPkt)) {
         retryRespPkt = nullptr;
+        resumeWrite();
         trySendRetry();
     }
 }
@@ -219,13 +373,61 @@ Tick
 NVMainControl::packetLatency(const PacketPtr pkt) const
 {
     if (pkt->isRead()) {
-        return tRCD + tCL;
+        return readLatency();
     } else if (pkt->isWrite()) {
-        return tWR;
+        return writeLatency();
     }
     return 0;
 }
 
+Tick
+NVMainControl::wearWrite(const PacketPtr pkt)
+{
+    Tick moves = 0;
+    Addr first = range.getOffset(pkt->getAddr()) / wearLineSize;
+    Addr last = range.getOffset(pkt->getAddr() + pkt->getSize() - 1) /
+        wearLineSize;
+    for (Addr line = first; line <= last; line++) {
+        uint64_t region = line / linesPerRegion;
+        uint64_t offset = line % linesPerRegion;
+        if (startGap.empty()) {
+            countWear(region, offset);
+            continue;
+        }
+
+        StartGap &sg = startGap[region];
+        countWear(region, sg.map(offset));
+        uint64_t moved_to;
+        if (sg.write(moved_to)) {
+            // Read the line next to the gap and write it into the gap
+            countWear(region, moved_to);
+            stats.gapMoves++;
+            stats.gapMoveTicks += readLatency() + writeLatency();
+            moves += readLatency() + writeLatency();
+            DPRINTF(NVMain, "Gap move in region %d: wrote line %d\n",
+                    region, moved_to);
+        }
+    }
+    return moves;
+}
+
+void
+NVMainControl::countWear(uint64_t region, uint64_t phys_line)
+{
+    // Key physical lines by region with room for each region's gap line
+    uint64_t &writes = lineWrites[region * (linesPerRegion + 1) + phys_line];
+    if (writes++ == 0) {
+        stats.wearLinesWritten++;
+    }
+    if (writes > stats.wearMaxLineWrites.value()) {
+        stats.wearMaxLineWrites = writes;
+    }
+    if (++regionWrites[region] > stats.wearMaxRegionWrites.value()) {
+        stats.wearMaxRegionWrites = regionWrites[region];
+    }
+    stats.wearLineWrites++;
+}
+
 void
 NVMainControl::recordStats(const PacketPtr pkt, Tick latency)
 {
@@ -241,17 +443,80 @@ NVMainControl::recordStats(const PacketPtr pkt, Tick latency)
 }
 
 NVMainControl::NVMainControlStats::NVMainControlStats(
-    statistics::Group *parent)
+    statistics::Group *parent, double lines, double endurance)
     : statistics::Group(parent),
       ADD_STAT(numReads, statistics::units::Count::get(), "Number of reads"),
       ADD_STAT(numWrites, statistics::units::Count::get(), "Number of writes"),
       ADD_STAT(bytesRead, statistics::units::Byte::get(), "Bytes read"),
       ADD_STAT(bytesWritten, statistics::units::Byte::get(), "Bytes written"),
       ADD_STAT(readLatency, statistics::units::Tick::get(), "Read latency"),
-      ADD_STAT(writeLatency, statistics::units::Tick::get(), "Write latency")
+      ADD_STAT(writeLatency, statistics::units::Tick::get(), "Write latency"),
+      ADD_STAT(busyTicks, statistics::units::Tick::get(),
+               "Ticks the channel spent servicing requests"),
+      ADD_STAT(rejectedRequests, statistics::units::Count::get(),
+               "Requests refused because the channel was busy"),
+      ADD_STAT(retryWait, statistics::units::Tick::get(),
+               "Ticks from the first refused request to its retry"),
+      ADD_STAT(utilization, statistics::units::Ratio::get(),
+               "Fraction of simulated time the channel was busy"),
+      ADD_STAT(readBandwidth, statistics::units::Rate<
+                    statistics::units::Byte, statistics::units::Second>::get(),
+               "Read bandwidth"),
+      ADD_STAT(writeBandwidth, statistics::units::Rate<
+                    statistics::units::Byte, statistics::units::Second>::get(),
+               "Write bandwidth"),
+      ADD_STAT(wearLineWrites, statistics::units::Count::get(),
+               "Line writes to the PCM array, including gap moves"),
+      ADD_STAT(wearLinesWritten, statistics::units::Count::get(),
+               "Distinct physical lines written at least once"),
+      ADD_STAT(wearMaxLineWrites, statistics::units::Count::get(),
+               "Writes to the most-worn physical line"),
+      ADD_STAT(wearMaxRegionWrites, statistics::units::Count::get(),
+               "Line writes to the most-worn wear region"),
+      ADD_STAT(gapMoves, statistics::units::Count::get(),
+               "Start-Gap line moves"),
+      ADD_STAT(gapMoveTicks, statistics::units::Tick::get(),
+               "Channel ticks spent on Start-Gap line moves"),
+      ADD_STAT(wearMeanLineWrites, statistics::units::Ratio::get(),
+               "Mean writes per physical line of the channel"),
+      ADD_STAT(wearLevelingEfficiency, statistics::units::Ratio::get(),
+               "Mean / max line wear (1 = perfectly even)"),
+      ADD_STAT(projectedLifetime, statistics::units::Second::get(),
+               "Seconds until the most-worn line reaches cell_endurance "
+               "at the simulated write rate"),
+      ADD_STAT(idealLifetime, statistics::units::Second::get(),
+               "Lifetime if the same writes were spread evenly"),
+      ADD_STAT(writePauses, statistics::units::Count::get(),
+               "Writes paused to serve a read"),
+      ADD_STAT(writeCancellations, statistics::units::Count::get(),
+               "Writes cancelled to serve a read"),
+      ADD_STAT(pauseOverheadTicks, statistics::units::Tick::get(),
+               "Channel ticks spent pausing writes"),
+      ADD_STAT(cancelledWriteTicks, statistics::units::Tick::get(),
+               "Write progress discarded by cancellations"),
+      ADD_STAT(readWaitSaved, statistics::units::Tick::get(),
+               "Ticks preempting reads would have waited behind a write"),
+      ADD_STAT(preemptingReadLatency, statistics::units::Tick::get(),
+               "Latency of reads that preempted a write"),
+      ADD_STAT(preemptedWriteDelay, statistics::units::Tick::get(),
+               "Extra latency of writes that were preempted")
 {
     readLatency.init(20);
     writeLatency.init(20);
+    retryWait.init(20);
+    preemptingReadLatency.init(20);
+    preemptedWriteDelay.init(20);
+
+    utilization = busyTicks / simTicks;
+    readBandwidth = bytesRead / simSeconds;
+    writeBandwidth = bytesWritten / simSeconds;
+
+    wearMeanLineWrites = wearLineWrites / statistics::constant(lines);
+    wearLevelingEfficiency = wearMeanLineWrites / wearMaxLineWrites;
+    projectedLifetime = statistics::constant(endurance) * simSeconds /
+        wearMaxLineWrites;
+    idealLifetime = statistics::constant(endurance) * simSeconds /
+        wearMeanLineWrites;
 }
 
 } // namespace memory
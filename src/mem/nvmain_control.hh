@@ -3,9 +3,12 @@
 
 #include <memory>
 #include <string>
+#include <unordered_map>
+#include <vector>
 
 #include "mem/abstract_mem.hh"
 #include "mem/port.hh"
+#include "mem/start_gap.hh"
 #include "params/NVMainControl.hh"
 #include "sim/eventq.hh"
 
@@ -48,8 +51,45 @@ class NVMainControl : public AbstractMemory
     PacketPtr retryRespPkt;
     std::unique_ptr<Packet> pendingDelete;
     bool retryReq;
+    Tick retryReqSince;   // First refused request still waiting for retry
+
+    // Write pausing / cancellation: a read arriving during a write may
+    // preempt it. A paused write resumes where it stopped (after
+    // pause_overhead); a cancelled one restarts from scratch. Either way
+    // it goes back on the channel as soon as the read has its response.
+    const bool writePausing;
+    const bool writeCancellation;
+    const Tick pauseOverhead;
+    const double cancelThreshold;   // Cancel below this fraction done
+    const unsigned maxWritePauses;  // Preemptions per write before it wins
+    PacketPtr preemptedWrite;       // Waiting for the preempting read
+    Tick preemptedRemaining;        // Its service time still to go
+    Tick writeStart;                // Current write: effective start,
+    Tick writeService;              //   total service time,
+    Tick writeDeadline;             //   completion before preemption
+    unsigned writePreemptions;      //   and times preempted
+
+    // Wear tracking per physical line and region, and with wear_leveling
+    // a Start-Gap remapper per region. Data stays at its logical address
+    // in the backing store; the remapping decides which physical line
+    // wears and gap moves cost channel time.
+    const Addr wearLineSize;
+    const uint64_t linesPerRegion;
+    const uint64_t numLines;         // Logical lines in the range
+    const uint64_t numRegions;
+    std::vector<StartGap> startGap;  // Empty without wear_leveling
+    std::unordered_map<uint64_t, uint64_t> lineWrites;
+    std::vector<uint64_t> regionWrites;
 
     Tick packetLatency(const PacketPtr pkt) const;
+
+    bool canPreempt(const PacketPtr pkt) const;
+    void preemptWrite(PacketPtr read);
+    void resumeWrite();
+
+    /** Count a write's wear; returns the channel time of gap moves */
+    Tick wearWrite(const PacketPtr pkt);
+    void countWear(uint64_t region, uint64_t phys_line);
     void recordStats(const PacketPtr pkt, Tick latency);
     void sendResponse();
     void trySendRetry();
@@ -64,6 +104,10 @@ class NVMainControl : public AbstractMemory
     Port &getPort(const std::string &if_name,
                   PortID idx=InvalidPortID) override;
 
+    /** Device latency of one 64B read / write, e.g. to cost recovery */
+    Tick readLatency() const { return tRCD + tCL; }
+    Tick writeLatency() const { return tWR; }
+
     Tick recvAtomic(PacketPtr pkt);
     Tick recvAtomicBackdoor(PacketPtr pkt, MemBackdoorPtr &backdoor);
     void recvFunctional(PacketPtr pkt);
@@ -73,7 +117,8 @@ class NVMainControl : public AbstractMemory
     void recvRespRetry();
 
     struct NVMainControlStats : public statistics::Group {
-        NVMainControlStats(statistics::Group *parent);
+        NVMainControlStats(statistics::Group *parent, double lines,
+                           double endurance);
         
         statistics::Scalar numReads;
         statistics::Scalar numWrites;
@@ -81,6 +126,35 @@ class NVMainControl : public AbstractMemory
         statistics::Scalar bytesWritten;
         statistics::Histogram readLatency;
         statistics::Histogram writeLatency;
+
+        // Per-channel bandwidth and queueing
+        statistics::Scalar busyTicks;
+        statistics::Scalar rejectedRequests;
+        statistics::Histogram retryWait;
+        statistics::Formula utilization;
+        statistics::Formula readBandwidth;
+        statistics::Formula writeBandwidth;
+
+        // Wear and lifetime
+        statistics::Scalar wearLineWrites;     // Line writes incl. gap moves
+        statistics::Scalar wearLinesWritten;   // Distinct physical lines written
+        statistics::Scalar wearMaxLineWrites;  // Writes to the most-worn line
+        statistics::Scalar wearMaxRegionWrites; // Writes to the most-worn region
+        statistics::Scalar gapMoves;           // Start-Gap line moves
+        statistics::Scalar gapMoveTicks;       // Channel time spent moving
+        statistics::Formula wearMeanLineWrites; // Over all physical lines
+        statistics::Formula wearLevelingEfficiency; // Mean / max wear
+        statistics::Formula projectedLifetime; // Seconds to wear out the max line
+        statistics::Formula idealLifetime;     // With perfectly even wear
+
+        // Write pausing / cancellation
+        statistics::Scalar writePauses;        // Writes paused for a read
+        statistics::Scalar writeCancellations; // Writes cancelled for a read
+        statistics::Scalar pauseOverheadTicks; // Channel time spent pausing
+        statistics::Scalar cancelledWriteTicks; // Write progress thrown away
+        statistics::Scalar readWaitSaved;      // Ticks reads did not wait behind writes
+        statistics::Histogram preemptingReadLatency; // Latency of reads that preempted
+        statistics::Histogram preemptedWriteDelay;   // Extra latency of preempted writes
     } stats;
 };
 
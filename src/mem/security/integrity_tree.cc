@@ -0,0 +1,83 @@
+/*
+ * Integrity Tree (Bonsai Merkle Tree) layout for Thoth
+ */
+
+#include "mem/security/integrity_tree.hh"
+
+#include <initializer_list>
+
+#include "base/intmath.hh"
+#include "base/logging.hh"
+
+namespace gem5
+{
+
+namespace memory
+{
+
+IntegrityTree::IntegrityTree(const AddrRange &counters, Addr tree_base,
+                             unsigned arity, Addr block_size)
+    : counters(counters),
+      treeBase(tree_base),
+      arity(arity),
+      blockSize(block_size)
+{
+    fatal_if(arity < 2 || (arity & (arity - 1)),
+             "Integrity tree arity must be a power of two >= 2, got %d",
+             arity);
+    fatal_if(!counters.valid() || counters.interleaved(),
+             "Integrity tree needs one contiguous counter range");
+
+    // One slot per counter block at level 1, then 1/arity as many per
+    // level until a single slot, the on-chip root, is left
+    uint64_t slots = divCeil(counters.size(), blockSize);
+    Addr next = treeBase;
+    while (slots > 1) {
+        levelBase.push_back(next);
+        next += slots * 8;
+        slots = divCeil(slots, arity);
+    }
+    treeEnd = next;
+
+    fatal_if(treeBase < counters.end() && treeEnd > counters.start(),
+             "Integrity tree [%#x, %#x) overlaps the counters it protects",
+             treeBase, treeEnd);
+}
+
+std::vector<Addr>
+IntegrityTree::path(Addr addr) const
+{
+    std::vector<Addr> slots;
+    slots.reserve(levelBase.size());
+    uint64_t index = (addr - counters.start()) / blockSize;
+    for (Addr base : levelBase) {
+        slots.push_back(base + index * 8);
+        index /= arity;
+    }
+    return slots;
+}
+
+Addr
+IntegrityTree::childBytes(unsigned level) const
+{
+    // A 64B line holds 8 hashes, each over one counter block at the leaf
+    // level and over arity 8B hashes above it
+    return level == 0 ? 8 * blockSize : 8 * arity * 8;
+}
+
+uint64_t
+IntegrityTree::hash(Addr slot, uint64_t child)
+{
+    // FNV-1a over the slot address and the child's new value
+    uint64_t hash = 0xcbf29ce484222325ULL;
+    for (uint64_t value : {uint64_t(slot), child}) {
+        for (int i = 0; i < 8; i++) {
+            hash ^= (value >> (8 * i)) & 0xff;
+            hash *= 0x100000001b3ULL;
+        }
+    }
+    return hash;
+}
+
+} // namespace memory
+} // namespace gem5
@@ -0,0 +1,89 @@
+/*
+ * Integrity Tree (Bonsai Merkle Tree) layout for Thoth
+ *
+ * A Bonsai Merkle tree protects the encryption counters only: its leaves
+ * are the 64B counter blocks, and every tree node holds one 8B hash per
+ * child. With arity k, hash slot i of level 1 covers counter block i,
+ * hash slot i of level l+1 covers the k slots i*k .. i*k+k-1 of level l,
+ * and the single slot of the top level is the root, which stays on chip.
+ *
+ * Writing a counter therefore changes one 8B slot per stored level, from
+ * the counter block's own hash up to the child of the root. The levels are
+ * laid out back to back from tree_base, each level's slots contiguous, so
+ * siblings share 64B lines and a tree path is a chain of 8B partials that
+ * the PCB can coalesce like any other metadata.
+ *
+ * This class only computes the layout; MetadataCache caches the nodes and
+ * sends the path updates through its PCB.
+ */
+
+#ifndef __MEM_SECURITY_INTEGRITY_TREE_HH__
+#define __MEM_SECURITY_INTEGRITY_TREE_HH__
+
+#include <vector>
+
+#include "base/addr_range.hh"
+#include "base/types.hh"
+
+namespace gem5
+{
+
+namespace memory
+{
+
+class IntegrityTree
+{
+  public:
+    /**
+     * @param counters Counter region protected by the tree
+     * @param tree_base First byte of the stored tree levels
+     * @param arity Hashes per tree node, a power of two of at least 2
+     * @param block_size Bytes of counters hashed into one leaf
+     */
+    IntegrityTree(const AddrRange &counters, Addr tree_base,
+                  unsigned arity, Addr block_size);
+
+    /** True if addr is a counter the tree protects */
+    bool covers(Addr addr) const { return counters.contains(addr); }
+
+    /** Stored levels, i.e. slots written per counter update */
+    unsigned levels() const { return levelBase.size(); }
+
+    /** Bytes of NVM the stored levels occupy */
+    Addr footprint() const { return treeEnd - treeBase; }
+
+    /**
+     * 8B hash slots that change when the counter at addr is written,
+     * leaf level first, root excluded
+     */
+    std::vector<Addr> path(Addr addr) const;
+
+    /**
+     * Bytes of children (counters or lower-level hashes) that must be
+     * read to recompute one 64B line of hashes at the given level,
+     * counting the leaf level as 0 like path()
+     */
+    Addr childBytes(unsigned level) const;
+
+    /**
+     * Stand-in hash of a node slot over its child's new contents. Only
+     * the slot addresses matter to coalescing; the value just has to
+     * change when the child does.
+     */
+    static uint64_t hash(Addr slot, uint64_t child);
+
+  private:
+    const AddrRange counters;
+    const Addr treeBase;
+    const unsigned arity;
+    const Addr blockSize;
+
+    /** First slot address of every stored level, leaf level first */
+    std::vector<Addr> levelBase;
+    Addr treeEnd;
+};
+
+} // namespace memory
+} // namespace gem5
+
+#endif // __MEM_SECURITY_INTEGRITY_TREE_HH__
@@ -0,0 +1,334 @@
+/*
+ * Memory-Encryption Frontend for Thoth
+ */
+
+#include "mem/security/mem_encryption_frontend.hh"
+
+#include <algorithm>
+#include <vector>
+
+#include "base/logging.hh"
+#include "base/trace.hh"
+#include "debug/MemEncFrontend.hh"
+#include "mem/packet.hh"
+#include "mem/request.hh"
+#include "sim/system.hh"
+
+namespace gem5
+{
+
+namespace memory
+{
+
+MemEncryptionFrontend::CPUSidePort::CPUSidePort(
+    const std::string &name, MemEncryptionFrontend &owner)
+    : ResponsePort(name), owner(owner)
+{
+}
+
+AddrRangeList
+MemEncryptionFrontend::CPUSidePort::getAddrRanges() const
+{
+    return owner.memSidePort.getAddrRanges();
+}
+
+Tick
+MemEncryptionFrontend::CPUSidePort::recvAtomic(PacketPtr pkt)
+{
+    // Atomic mode only fast-forwards; metadata is derived in timing mode
+    return owner.memSidePort.sendAtomic(pkt);
+}
+
+void
+MemEncryptionFrontend::CPUSidePort::recvFunctional(PacketPtr pkt)
+{
+    // Program loading and syscall emulation go straight to memory
+    owner.memSidePort.sendFunctional(pkt);
+}
+
+bool
+MemEncryptionFrontend::CPUSidePort::recvTimingReq(PacketPtr pkt)
+{
+    return owner.handleRequest(pkt);
+}
+
+void
+MemEncryptionFrontend::CPUSidePort::recvRespRetry()
+{
+    owner.memSidePort.sendRetryResp();
+}
+
+MemEncryptionFrontend::MemSidePort::MemSidePort(
+    const std::string &name, MemEncryptionFrontend &owner)
+    : RequestPort(name), owner(owner)
+{
+}
+
+bool
+MemEncryptionFrontend::MemSidePort::recvTimingResp(PacketPtr pkt)
+{
+    return owner.cpuSidePort.sendTimingResp(pkt);
+}
+
+void
+MemEncryptionFrontend::MemSidePort::recvReqRetry()
+{
+    owner.cpuSidePort.sendRetryReq();
+}
+
+void
+MemEncryptionFrontend::MemSidePort::recvRangeChange()
+{
+    owner.cpuSidePort.sendRangeChange();
+}
+
+MemEncryptionFrontend::MetadataPort::MetadataPort(
+    const std::string &name, MemEncryptionFrontend &owner)
+    : RequestPort(name), owner(owner)
+{
+}
+
+bool
+MemEncryptionFrontend::MetadataPort::recvTimingResp(PacketPtr pkt)
+{
+    auto it = owner.inFlight.find(pkt->req.get());
+    if (it != owner.inFlight.end()) {
+        owner.stats.metadataLatency.sample(curTick() - it->second);
+        owner.inFlight.erase(it);
+    }
+    delete pkt;
+    return true;
+}
+
+void
+MemEncryptionFrontend::MetadataPort::recvReqRetry()
+{
+    DPRINTF(MemEncFrontend, "Metadata path retry\n");
+    owner.metadataBlocked = false;
+    owner.sendPartials();
+}
+
+MemEncryptionFrontend::MemEncryptionFrontend(const Params &p)
+    : ClockedObject(p),
+      requestorId(p.system->getRequestorId(this)),
+      counterBase(p.counter_base),
+      macBase(p.mac_base),
+      dataBlockSize(p.data_block_size),
+      macUpdates(p.mac_updates),
+      counterReads(p.counter_reads),
+      maxPending(p.max_pending),
+      cpuSidePort(name() + ".cpu_side", *this),
+      memSidePort(name() + ".mem_side", *this),
+      metadataPort(name() + ".metadata_side", *this),
+      metadataBlocked(false),
+      cpuSideNeedsRetry(false),
+      stats(this)
+{
+    fatal_if(dataBlockSize == 0 || (dataBlockSize & (dataBlockSize - 1)),
+             "%s: data_block_size must be a power of two", name());
+    fatal_if(maxPending == 0, "%s: max_pending must be positive", name());
+}
+
+Port &
+MemEncryptionFrontend::getPort(const std::string &if_name, PortID idx)
+{
+    if (if_name == "cpu_side") {
+        return cpuSidePort;
+    } else if (if_name == "mem_side") {
+        return memSidePort;
+    } else if (if_name == "metadata_side") {
+        return metadataPort;
+    }
+    return ClockedObject::getPort(if_name, idx);
+}
+
+unsigned
+MemEncryptionFrontend::partialsFor(Addr addr, unsigned size,
+                                   bool is_write) const
+{
+    Addr first = addr & ~(dataBlockSize - 1);
+    Addr last = (addr + std::max(size, 1u) - 1) & ~(dataBlockSize - 1);
+    unsigned blocks = (last - first) / dataBlockSize + 1;
+    if (is_write) {
+        return blocks * (macUpdates ? 2 : 1);
+    }
+    return counterReads ? blocks : 0;
+}
+
+bool
+MemEncryptionFrontend::handleRequest(PacketPtr pkt)
+{
+    // Only data moving to or from memory carries metadata
+    bool is_write = pkt->isWrite() && pkt->hasData();
+    bool is_read = pkt->isRead() && !is_write;
+    Addr addr = pkt->getAddr();
+    unsigned size = pkt->getSize();
+    unsigned partials = (is_write || is_read) ?
+        partialsFor(addr, size, is_write) : 0;
+
+    // An empty queue always takes the access, however many partials it
+    // needs, so a small max_pending cannot deadlock
+    if (partials > 0 && !pendingPartials.empty() &&
+        pendingPartials.size() + partials > maxPending) {
+        // Metadata path saturated: hold the program back until it drains
+        DPRINTF(MemEncFrontend, "Stalling %s to %#x: %d partials pending\n",
+                pkt->cmdString(), addr, pendingPartials.size());
+        stats.dataStalls++;
+        cpuSideNeedsRetry = true;
+        return false;
+    }
+
+    // Copy the written bytes first: memory may free a writeback as soon
+    // as it accepts it
+    std::vector<uint8_t> data;
+    if (is_write) {
+        data.assign(pkt->getConstPtr<uint8_t>(),
+                    pkt->getConstPtr<uint8_t>() + size);
+    }
+
+    if (!memSidePort.sendTimingReq(pkt)) {
+        return false;   // Memory retries us, and we retry the bus
+    }
+
+    if (is_write) {
+        stats.dataWrites++;
+        stats.dataBytesWritten += size;
+        derivePartials(addr, size, true, data.data());
+    } else if (is_read) {
+        stats.dataReads++;
+        derivePartials(addr, size, false, nullptr);
+    }
+    return true;
+}
+
+void
+MemEncryptionFrontend::derivePartials(Addr addr, unsigned size,
+                                      bool is_write, const uint8_t *data)
+{
+    Addr end = addr + std::max(size, 1u);
+    for (Addr block = addr & ~(dataBlockSize - 1); block < end;
+         block += dataBlockSize) {
+        Addr slot = (block / dataBlockSize) * 8;
+
+        if (!is_write) {
+            if (counterReads) {
+                pendingPartials.push_back({counterBase + slot, true, 0,
+                                           curTick()});
+                stats.counterReads++;
+            }
+            continue;
+        }
+
+        // Re-encrypting the block consumes a fresh counter value
+        uint64_t &counter = counters[block];
+        if (counter == 0) {
+            stats.blocksWritten++;
+        }
+        counter++;
+        pendingPartials.push_back({counterBase + slot, false, counter,
+                                   curTick()});
+        stats.counterUpdates++;
+
+        if (macUpdates) {
+            Addr lo = std::max(addr, block);
+            Addr hi = std::min(end, block + dataBlockSize);
+            uint64_t mac = blockMac(block, counter, data + (lo - addr),
+                                    lo - block, hi - lo);
+            pendingPartials.push_back({macBase + slot, false, mac,
+                                       curTick()});
+            stats.macUpdates++;
+        }
+
+        DPRINTF(MemEncFrontend, "Write to block %#x: counter %llu\n",
+                block, counter);
+    }
+    sendPartials();
+}
+
+uint64_t
+MemEncryptionFrontend::blockMac(Addr block, uint64_t counter,
+                                const uint8_t *data, unsigned offset,
+                                unsigned size) const
+{
+    // FNV-1a over address, counter and the written bytes. Not a real
+    // MAC: only the MAC slot address matters to coalescing, the value
+    // just has to change with the data.
+    uint64_t hash = 0xcbf29ce484222325ULL;
+    auto mix = [&hash](uint64_t value) {
+        for (int i = 0; i < 8; i++) {
+            hash ^= (value >> (8 * i)) & 0xff;
+            hash *= 0x100000001b3ULL;
+        }
+    };
+    mix(block);
+    mix(counter);
+    mix(offset);
+    for (unsigned i = 0; i < size; i++) {
+        hash ^= data[i];
+        hash *= 0x100000001b3ULL;
+    }
+    return hash;
+}
+
+void
+MemEncryptionFrontend::sendPartials()
+{
+    while (!pendingPartials.empty() && !metadataBlocked) {
+        const Partial &partial = pendingPartials.front();
+        RequestPtr req = std::make_shared<Request>(
+            partial.addr, 8, Request::UNCACHEABLE, requestorId);
+        PacketPtr pkt = new Packet(req, partial.isRead ? MemCmd::ReadReq :
+                                                         MemCmd::WriteReq);
+        pkt->allocate();
+        if (!partial.isRead) {
+            pkt->setLE<uint64_t>(partial.data);
+        }
+
+        if (!metadataPort.sendTimingReq(pkt)) {
+            delete pkt;
+            metadataBlocked = true;
+            stats.metadataRetries++;
+            break;
+        }
+        inFlight[req.get()] = partial.created;
+        pendingPartials.pop_front();
+    }
+
+    if (cpuSideNeedsRetry && pendingPartials.size() < maxPending) {
+        cpuSideNeedsRetry = false;
+        cpuSidePort.sendRetryReq();
+    }
+}
+
+MemEncryptionFrontend::MemEncryptionFrontendStats::MemEncryptionFrontendStats(
+    statistics::Group *parent)
+    : statistics::Group(parent),
+      ADD_STAT(dataReads, statistics::units::Count::get(),
+               "Data reads from memory"),
+      ADD_STAT(dataWrites, statistics::units::Count::get(),
+               "Data writes to memory (writebacks or uncached stores)"),
+      ADD_STAT(dataBytesWritten, statistics::units::Byte::get(),
+               "Data bytes written to memory"),
+      ADD_STAT(counterUpdates, statistics::units::Count::get(),
+               "8B counter updates derived from data writes"),
+      ADD_STAT(macUpdates, statistics::units::Count::get(),
+               "8B MAC updates derived from data writes"),
+      ADD_STAT(counterReads, statistics::units::Count::get(),
+               "8B counter reads issued for data reads"),
+      ADD_STAT(blocksWritten, statistics::units::Count::get(),
+               "Distinct data blocks written (counter footprint)"),
+      ADD_STAT(metadataRetries, statistics::units::Count::get(),
+               "Times the metadata path refused a partial"),
+      ADD_STAT(dataStalls, statistics::units::Count::get(),
+               "Data requests refused because max_pending partials waited"),
+      ADD_STAT(metadataLatency, statistics::units::Tick::get(),
+               "Latency from data access to metadata response"),
+      ADD_STAT(partialsPerWrite, statistics::units::Ratio::get(),
+               "Metadata partials per data write")
+{
+    metadataLatency.init(32);
+    partialsPerWrite = (counterUpdates + macUpdates) / dataWrites;
+}
+
+} // namespace memory
+} // namespace gem5
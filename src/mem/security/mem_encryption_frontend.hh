@@ -0,0 +1,170 @@
+/*
+ * Memory-Encryption Frontend for Thoth
+ *
+ * Sits between the memory bus and the data memory controller of a
+ * system running real programs (e.g. SE mode with a timing CPU) and
+ * derives the secure-memory metadata traffic from the program's actual
+ * memory accesses. Data packets pass through unchanged; for every write
+ * that reaches memory (a cache writeback, or a store when the CPU has no
+ * caches) the frontend emits, per 64B data block touched:
+ *
+ * - an 8B counter update: the block's encryption counter, incremented,
+ *   at counter_base + block index * 8
+ * - with mac_updates set, an 8B MAC update at mac_base + block index * 8
+ *
+ * With counter_reads set, every data read from memory also issues an 8B
+ * counter read, since the block cannot be decrypted without it.
+ *
+ * The partials leave through metadata_side, normally into the AES-CTR
+ * stage and MetadataCache, so the PCB coalesces the updates the workload
+ * really produces instead of a synthetic burst pattern. Up to
+ * max_pending partials may wait for the metadata path; beyond that the
+ * frontend refuses data requests until the queue drains, so a saturated
+ * metadata path slows the program down as it would in hardware.
+ */
+
+#ifndef __MEM_SECURITY_MEM_ENCRYPTION_FRONTEND_HH__
+#define __MEM_SECURITY_MEM_ENCRYPTION_FRONTEND_HH__
+
+#include <deque>
+#include <unordered_map>
+
+#include "base/statistics.hh"
+#include "base/types.hh"
+#include "mem/port.hh"
+#include "params/MemEncryptionFrontend.hh"
+#include "sim/clocked_object.hh"
+
+namespace gem5
+{
+
+namespace memory
+{
+
+class MemEncryptionFrontend : public ClockedObject
+{
+  public:
+    PARAMS(MemEncryptionFrontend);
+    MemEncryptionFrontend(const Params &p);
+
+    Port &getPort(const std::string &if_name,
+                  PortID idx=InvalidPortID) override;
+
+  private:
+    /** Data path from the memory bus */
+    class CPUSidePort : public ResponsePort
+    {
+      private:
+        MemEncryptionFrontend &owner;
+
+      public:
+        CPUSidePort(const std::string &name, MemEncryptionFrontend &owner);
+
+      protected:
+        AddrRangeList getAddrRanges() const override;
+        Tick recvAtomic(PacketPtr pkt) override;
+        void recvFunctional(PacketPtr pkt) override;
+        bool recvTimingReq(PacketPtr pkt) override;
+        void recvRespRetry() override;
+    };
+
+    /** Data path to the memory controller */
+    class MemSidePort : public RequestPort
+    {
+      private:
+        MemEncryptionFrontend &owner;
+
+      public:
+        MemSidePort(const std::string &name, MemEncryptionFrontend &owner);
+
+      protected:
+        bool recvTimingResp(PacketPtr pkt) override;
+        void recvReqRetry() override;
+        void recvRangeChange() override;
+    };
+
+    /** Metadata partials towards the AES-CTR stage / MetadataCache */
+    class MetadataPort : public RequestPort
+    {
+      private:
+        MemEncryptionFrontend &owner;
+
+      public:
+        MetadataPort(const std::string &name, MemEncryptionFrontend &owner);
+
+      protected:
+        bool recvTimingResp(PacketPtr pkt) override;
+        void recvReqRetry() override;
+    };
+
+    /** One 8B metadata access waiting for the metadata path */
+    struct Partial
+    {
+        Addr addr;
+        bool isRead;
+        uint64_t data;
+        Tick created;
+    };
+
+    /** Forward a data request, deriving its metadata if it is accepted */
+    bool handleRequest(PacketPtr pkt);
+
+    /** Queue the metadata partials of one data access */
+    void derivePartials(Addr addr, unsigned size, bool is_write,
+                        const uint8_t *data);
+
+    /** Stand-in MAC over a block's written bytes and counter */
+    uint64_t blockMac(Addr block, uint64_t counter, const uint8_t *data,
+                      unsigned offset, unsigned size) const;
+
+    /** Send queued partials until the metadata path blocks */
+    void sendPartials();
+
+    /** Metadata partials one data access produces */
+    unsigned partialsFor(Addr addr, unsigned size, bool is_write) const;
+
+    /** Requestor of the metadata partials */
+    const RequestorID requestorId;
+
+    const Addr counterBase;
+    const Addr macBase;
+    const Addr dataBlockSize;
+    const bool macUpdates;
+    const bool counterReads;
+    const unsigned maxPending;
+
+    CPUSidePort cpuSidePort;
+    MemSidePort memSidePort;
+    MetadataPort metadataPort;
+
+    /** Encryption counter of every data block written so far */
+    std::unordered_map<Addr, uint64_t> counters;
+
+    std::deque<Partial> pendingPartials;
+    std::unordered_map<const Request *, Tick> inFlight;
+
+    bool metadataBlocked;
+    bool cpuSideNeedsRetry;
+
+    struct MemEncryptionFrontendStats : public statistics::Group
+    {
+        MemEncryptionFrontendStats(statistics::Group *parent);
+
+        statistics::Scalar dataReads;
+        statistics::Scalar dataWrites;
+        statistics::Scalar dataBytesWritten;
+        statistics::Scalar counterUpdates;
+        statistics::Scalar macUpdates;
+        statistics::Scalar counterReads;
+        statistics::Scalar blocksWritten;
+        statistics::Scalar metadataRetries;
+        statistics::Scalar dataStalls;
+        statistics::Histogram metadataLatency;
+        statistics::Formula partialsPerWrite;
+    } stats;
+};
+
+} // namespace memory
+} // namespace gem5
+
+#endif // __MEM_SECURITY_MEM_ENCRYPTION_FRONTEND_HH__
@@ -1,9 +1,13 @@
 #include "mem/security/metadata_cache.hh"
 
+#include "base/intmath.hh"
 #include "base/logging.hh"
 #include "debug/MetadataCache.hh"
 #include "mem/packet.hh"
+#include "sim/system.hh"
+#include <algorithm>
 #include <cstring>
+#include <ostream>
 
 namespace gem5
 {
@@ -11,9 +15,13 @@ namespace gem5
 namespace memory
 {
 
+// A PLUB log entry holds the partial's address and data
+static const unsigned LOG_ENTRY_BYTES = 16;
+
 MetadataCache::MemoryPort::MemoryPort(const std::string &name,
-                                       MetadataCache &cache)
-    : ResponsePort(name, &cache), cache(cache)
+                                       MetadataCache &cache, PortID id)
+    : QueuedResponsePort(name, queue, id), queue(cache, *this),
+      cache(cache)
 {
 }
 
@@ -45,7 +53,7 @@ MetadataCache::MemoryPort::recvTimingReq(PacketPtr pkt)
 {
     // Handle timing request
     Addr addr = pkt->getAddr();
-    uint64_t data;
+    uint64_t data = 0;
 
     if (pkt->isRead()) {
         if (cache.lookup(addr, data)) {
@@ -55,9 +63,14 @@ MetadataCache::MemoryPort::recvTimingReq(PacketPtr pkt)
         } else {
             // Cache miss
             cache.stats.misses++;
+            // A counter fetched from NVM is checked against the tree
+            if (cache.tree && cache.tree->covers(addr)) {
+                cache.verifyTree(addr);
+            }
             // In a real implementation, fetch from backing store
             data = 0;
-            cache.insert(addr, data);
+            // Fetched clean: evicting it must not write partials back
+            cache.insert(addr, data, false);
             pkt->setData((uint8_t*)&data);
         }
     } else if (pkt->isWrite()) {
@@ -73,15 +86,26 @@ MetadataCache::MemoryPort::recvTimingReq(PacketPtr pkt)
         DPRINTF(MetadataCache, "Write intercepted: addr=%#x, data=%#x\n", addr, data);
     }
 
-    // Send response
-    pkt->makeResponse();
-    return true;
-}
+    cache.stats.portRequests[getId()]++;
 
-void
-MetadataCache::MemoryPort::recvRespRetry()
-{
-    // Handle retry
+    // Respond once the line's bank has performed the access
+    Tick ready = cache.reserveBank(cache.getBank(addr));
+
+    // A new counter value changes every hash on its path to the root.
+    // The walk is booked after the counter's own bank access, so it
+    // delays later requests but not this response.
+    if (pkt->isWrite() && cache.tree && cache.tree->covers(addr)) {
+        cache.updateTree(addr, data);
+    }
+
+    if (pkt->needsResponse()) {
+        pkt->makeTimingResponse();
+        pkt->headerDelay = pkt->payloadDelay = 0;
+        schedTimingResp(pkt, ready);
+    } else {
+        delete pkt;
+    }
+    return true;
 }
 
 // NVMain Port Implementation
@@ -96,15 +120,12 @@ MetadataCache::NVMainPort::recvTimingResp(PacketPtr pkt)
 {
     // Response from NVMain - just delete the packet
     delete pkt;
-    
-    // Try to send any queued packets
-    if (!queuedPackets.empty()) {
-        PacketPtr nextPkt = queuedPackets.front();
-        if (sendTimingReq(nextPkt)) {
-            queuedPackets.pop_front();
-        }
-    }
-    
+    cache.writesInFlight--;
+
+    // Queued packets wait for recvReqRetry; resending them here would
+    // break the retry protocol. Otherwise issue the next pending line.
+    cache.issueWriteQueue();
+
     return true;
 }
 
@@ -114,18 +135,22 @@ MetadataCache::NVMainPort::recvReqRetry()
     // NVMain is ready to receive again
     while (!queuedPackets.empty()) {
         PacketPtr pkt = queuedPackets.front();
-        if (sendTimingReq(pkt)) {
+        if (RequestPort::sendTimingReq(pkt)) {
             queuedPackets.pop_front();
         } else {
-            break;  // Still blocked
+            return;  // Still blocked, wait for the next retry
         }
     }
+
+    // Backlog drained: fill the remaining channel slots
+    cache.issueWriteQueue();
 }
 
 bool
 MetadataCache::NVMainPort::sendTimingReq(PacketPtr pkt)
 {
-    if (RequestPort::sendTimingReq(pkt)) {
+    // Behind a refused packet everything waits for recvReqRetry
+    if (queuedPackets.empty() && RequestPort::sendTimingReq(pkt)) {
         return true;
     } else {
         // Queue it for retry
@@ -136,16 +161,49 @@ MetadataCache::NVMainPort::sendTimingReq(PacketPtr pkt)
 
 MetadataCache::MetadataCache(const MetadataCacheParams &params)
     : ClockedObject(params),
+      requestorId(params.system->getRequestorId(this)),
       numSets(params.num_sets),
       numWays(params.num_ways),
       blockSize(params.block_size),
       accessLatency(params.access_latency),
       writeQueueCapacity(params.write_queue_capacity),
-      port(name() + ".port", *this),
+      numBanks(params.num_banks),
+      bankIssueLatency(clockPeriod() * params.bank_issue_cycles),
+      bankFreeAt(params.num_banks, 0),
+      maxOutstandingWrites(params.max_outstanding_writes),
+      writesInFlight(0),
       nvmainPort(name() + ".nvmain_port", *this),
+      pcbCapacity(params.pcb_capacity),
+      flushInterval(params.flush_interval),
       flushEvent([this]{ flushPCB(); }, name() + ".flushEvent"),
-      stats(this)
+      nvmChannels(params.nvm_channels),
+      crashTicks(params.crash_points),
+      nextCrash(0),
+      crashInterval(params.crash_interval),
+      lastPeriodicCrash(0),
+      crashEvent([this]{ injectCrash(); }, name() + ".crashEvent"),
+      crashLog(nullptr),
+      plubLogPartials(0),
+      stats(this, params.num_banks, params.port_port_connection_count)
 {
+    fatal_if(numBanks <= 0, "MetadataCache needs at least one bank");
+
+    std::sort(crashTicks.begin(), crashTicks.end());
+    fatal_if((!crashTicks.empty() || crashInterval > 0) &&
+             nvmChannels.empty(),
+             "%s: crash injection needs nvm_channels to cost recovery",
+             name());
+
+    if (params.tree_arity > 0) {
+        tree.reset(new IntegrityTree(params.tree_counters, params.tree_base,
+                                     params.tree_arity, blockSize));
+    }
+
+    for (int i = 0; i < params.port_port_connection_count; i++) {
+        cpuPorts.emplace_back(new MemoryPort(
+            csprintf("%s.port[%d]", name(), i), *this, i));
+    }
+
     // Initialize cache sets
     cacheSets.reserve(numSets);
     for (int i = 0; i < numSets; i++) {
@@ -156,13 +214,25 @@ MetadataCache::MetadataCache(const MetadataCacheParams &params)
            numSets, numWays, blockSize, (numSets * numWays * blockSize) / 1024);
     inform("PCB: %d entry capacity, %d ms flush interval",
            pcbCapacity, flushInterval / 1000000000);
+    inform("MetadataCache: %d CPU-side ports, %d banks",
+           cpuPorts.size(), numBanks);
+    if (tree) {
+        inform("Integrity tree: arity %d, %d levels below the root, "
+               "%d KB at %#x", params.tree_arity, tree->levels(),
+               tree->footprint() / 1024, params.tree_base);
+    }
 }
 
 Port &
 MetadataCache::getPort(const std::string &if_name, PortID idx)
 {
     if (if_name == "port") {
-        return port;
+        if (idx == InvalidPortID) {
+            idx = 0;
+        }
+        fatal_if(idx >= (PortID)cpuPorts.size(),
+                 "%s: no CPU-side port %d", name(), idx);
+        return *cpuPorts[idx];
     } else if (if_name == "nvmain_port") {
         return nvmainPort;
     }
@@ -177,6 +247,23 @@ MetadataCache::startup()
     // Schedule first PCB flush event (every 10ms for ADR)
     schedule(flushEvent, curTick() + flushInterval);
     inform("Scheduled PCB flush events every %d ms", flushInterval / 1000000000);
+
+    if (!crashTicks.empty() || crashInterval > 0) {
+        crashLog = simout.create("crash_recovery.csv");
+        *crashLog->stream() << "tick,pcb_entries,log_entries,"
+            "write_queue_lines,home_lines,tree_lines,bytes_read,"
+            "bytes_written,recovery_ticks\n";
+        lastPeriodicCrash = curTick();
+        scheduleCrash();
+    }
+
+    // Coalesced lines are folded into the range NVMain serves
+    if (nvmainPort.isConnected()) {
+        AddrRangeList ranges = nvmainPort.getAddrRanges();
+        if (!ranges.empty()) {
+            nvmRange = ranges.front();
+        }
+    }
 }
 
 Addr
@@ -220,8 +307,89 @@ MetadataCache::lookup(Addr addr, uint64_t &data)
     return false;
 }
 
+int
+MetadataCache::getBank(Addr addr) const
+{
+    return (addr / blockSize) % numBanks;
+}
+
+Tick
+MetadataCache::reserveBank(int bank)
+{
+    // Each bank is pipelined: it starts a new access every
+    // bankIssueLatency and finishes it accessLatency later
+    Tick start = std::max(curTick(), bankFreeAt[bank]);
+    if (start > curTick()) {
+        stats.bankConflicts++;
+        stats.bankConflictStallTicks += start - curTick();
+        stats.bankConflictStall.sample(start - curTick());
+    }
+    bankFreeAt[bank] = start + bankIssueLatency;
+    stats.bankAccesses[bank]++;
+    return start + accessLatency;
+}
+
+bool
+MetadataCache::peekCounter(Addr addr, uint64_t &data) const
+{
+    const CacheSet &set = cacheSets[getSetIndex(addr)];
+    Addr tag = getTag(addr);
+    for (int i = 0; i < numWays; i++) {
+        if (set.ways[i].valid && set.ways[i].tag == tag) {
+            data = set.ways[i].data[getOffset(addr)];
+            return true;
+        }
+    }
+    return false;
+}
+
+void
+MetadataCache::updateTree(Addr addr, uint64_t data)
+{
+    // Walk from the counter's leaf hash to the child of the on-chip root.
+    // Each node is read (fetched from NVM on a miss), its slot rehashed,
+    // and the new 8B hash written through the PCB. The accesses occupy
+    // the cache banks after the counter write's own access, so they
+    // hold up later requests to those banks, not the counter write.
+    stats.treeCounterWrites++;
+    uint64_t value = data;
+    for (Addr slot : tree->path(addr)) {
+        uint64_t old;
+        if (lookup(slot, old)) {
+            stats.treeNodeHits++;
+        } else {
+            stats.treeNodeMisses++;
+        }
+        value = IntegrityTree::hash(slot, value);
+        coalescePartial(slot, value);
+        insert(slot, value);
+        reserveBank(getBank(slot));
+        stats.treeUpdates++;
+    }
+    DPRINTF(MetadataCache, "Tree update: counter=%#x, levels=%d\n",
+            addr, tree->levels());
+}
+
 void
-MetadataCache::insert(Addr addr, uint64_t data)
+MetadataCache::verifyTree(Addr addr)
+{
+    // Cached nodes are trusted, so verification stops at the first
+    // ancestor found on chip (or at the root)
+    for (Addr slot : tree->path(addr)) {
+        uint64_t value;
+        reserveBank(getBank(slot));
+        if (lookup(slot, value)) {
+            stats.treeNodeHits++;
+            return;
+        }
+        stats.treeNodeMisses++;
+        stats.treeVerifyFetches++;
+        insert(slot, 0, false);  // Fetched clean: no write-back on evict
+    }
+}
+
+void
+MetadataCache::insert(Addr addr, uint64_t data, bool dirty)
 {
     int setIdx = getSetIndex(addr);
     Addr tag = getTag(addr);
@@ -233,7 +401,7 @@ MetadataCache::insert(Addr addr, uint64_t data)
     for (int i = 0; i < numWays; i++) {
         if (set.ways[i].valid && set.ways[i].tag == tag) {
             set.ways[i].data[offset] = data;
-            set.ways[i].dirty = true;
+            set.ways[i].dirty |= dirty;
             set.ways[i].lastAccess = curTick();
             DPRINTF(MetadataCache, "Cache update: addr=%#x, data=%#x\n",
                     addr, data);
@@ -247,7 +415,7 @@ MetadataCache::insert(Addr addr, uint64_t data)
             set.ways[i].valid = true;
             set.ways[i].tag = tag;
             set.ways[i].data[offset] = data;
-            set.ways[i].dirty = true;
+            set.ways[i].dirty = dirty;
             set.ways[i].lastAccess = curTick();
             DPRINTF(MetadataCache, "Cache insert: addr=%#x, way=%d\n",
                     addr, i);
@@ -262,7 +430,7 @@ MetadataCache::insert(Addr addr, uint64_t data)
     set.ways[victimWay].valid = true;
     set.ways[victimWay].tag = tag;
     set.ways[victimWay].data[offset] = data;
-    set.ways[victimWay].dirty = true;
+    set.ways[victimWay].dirty = dirty;
     set.ways[victimWay].lastAccess = curTick();
 
     DPRINTF(MetadataCache, "Cache insert with eviction: addr=%#x, victim=%d\n",
@@ -377,6 +545,10 @@ MetadataCache::flushPCB()
     
     pcbMap.clear();
 
+    // Everything logged so far is now in place: the log is truncated
+    plubLog.clear();
+    plubLogPartials = 0;
+
     // Schedule next flush
     schedule(flushEvent, curTick() + flushInterval);
 }
@@ -384,45 +556,262 @@ MetadataCache::flushPCB()
 void
 MetadataCache::sendToNVMain(const PCBEntry &entry)
 {
-    // NVMain port might not be connected or packets might have wrong address range
-    // For now, just use write queue for evictions
-    // TODO: Proper NVMain integration requires correct address translation
-    
-    if (writeQueue.size() < (size_t)writeQueueCapacity) {
-        for (int i = 0; i < 8; i++) {
-            if (entry.validMask & (1 << i)) {
-                uint64_t partial;
-                memcpy(&partial, &entry.data[i * 8], 8);
-                writeQueue.push({entry.baseAddr + i * 8, partial});
-            }
-        }
-        
-        // Track NVM writes and bytes
+    WriteQueueEntry *pending = enqueueWrite(entry.baseAddr, entry.data,
+                                            entry.validMask);
+    if (!pending) {
+        return;
+    }
+
+    // Track NVM writes and bytes; a block merged into a line that is
+    // already queued rides along with that line's write
+    if (!pending->accounted) {
+        pending->accounted = true;
         stats.nvmWrites++;
         stats.nvmBytesWritten += 64;  // 64B block written
-        
-        DPRINTF(MetadataCache, "Sent coalesced block to write queue: baseAddr=%#x, mask=%#x\n",
-                entry.baseAddr, entry.validMask);
-    } else {
-        stats.writeQueueFull++;
     }
+
+    DPRINTF(MetadataCache, "Sent coalesced block to write queue: baseAddr=%#x, mask=%#x\n",
+            entry.baseAddr, entry.validMask);
+
+    issueWriteQueue();
 }
 
 void
 MetadataCache::sendToPLUB(Addr addr, uint64_t data)
 {
     // PLUB (Partial Log Update Buffer) - overflow path for uncoalesced partials
-    // In full implementation, this would send directly to NVMain bypassing coalescing
-    if (writeQueue.size() < (size_t)writeQueueCapacity) {
-        writeQueue.push({addr, data});
+    Addr baseAddr = PCBEntry::getBase(addr);
+    int offset = (addr - baseAddr) / 8;
+    uint8_t line[64] = {};
+    memcpy(&line[offset * 8], &data, 8);
+
+    if (enqueueWrite(baseAddr, line, 1 << offset)) {
         stats.plubPartials++;  // Track PLUB usage
+        plubLog[baseAddr] |= 1 << offset;
+        plubLogPartials++;
         DPRINTF(MetadataCache, "Sent to PLUB: addr=%#x\n", addr);
-    } else {
+        issueWriteQueue();
+    }
+}
+
+MetadataCache::RecoveryEstimate
+MetadataCache::estimateRecovery() const
+{
+    RecoveryEstimate est;
+
+    // Home lines the replay must bring up to date, with the partials it
+    // writes into each
+    std::unordered_map<Addr, uint8_t> home(plubLog);
+    est.logEntries = plubLogPartials;
+    for (const auto &pair : pcbMap) {
+        const PCBEntry &entry = pair.second;
+        if (entry.numPartials() == 0) {
+            continue;
+        }
+        est.pcbEntries++;
+        est.logEntries += entry.numPartials();
+        home[entry.baseAddr] |= entry.validMask;
+    }
+    for (const auto &pair : writeQueue) {
+        est.writeQueueLines++;
+        // PLUB partials still queued are already in the log
+        uint8_t mask = pair.second.validMask;
+        auto logged = plubLog.find(pair.first);
+        if (logged != plubLog.end()) {
+            mask &= ~logged->second;
+        }
+        est.logEntries += __builtin_popcount(mask);
+        home[pair.first] |= pair.second.validMask;
+    }
+    est.homeLines = home.size();
+
+    // Read the log, then read-modify-write every partially replayed line
+    uint64_t readLines = divCeil(est.logEntries * LOG_ENTRY_BYTES, 64);
+    uint64_t writeLines = est.homeLines;
+    for (const auto &pair : home) {
+        if (pair.second != 0xFF) {
+            readLines++;
+        }
+    }
+
+    // Each tree line above a replayed counter is recomputed from its
+    // children and written back
+    if (tree) {
+        std::set<std::pair<unsigned, Addr>> treeLines;
+        for (const auto &pair : home) {
+            if (!tree->covers(pair.first)) {
+                continue;
+            }
+            std::vector<Addr> path = tree->path(pair.first);
+            for (unsigned level = 0; level < path.size(); level++) {
+                treeLines.insert({level, path[level] & ~Addr(63)});
+            }
+        }
+        est.treeLines = treeLines.size();
+        for (const auto &line : treeLines) {
+            readLines += divCeil(tree->childBytes(line.first), 64);
+        }
+        writeLines += est.treeLines;
+    }
+
+    est.bytesRead = readLines * 64;
+    est.bytesWritten = writeLines * 64;
+
+    // Lines interleave across the channels, which recover in parallel
+    const NVMainControl *nvm = nvmChannels.front();
+    Tick serial = readLines * nvm->readLatency() +
+                  writeLines * nvm->writeLatency();
+    est.time = divCeil(serial, nvmChannels.size());
+    return est;
+}
+
+void
+MetadataCache::injectCrash()
+{
+    RecoveryEstimate est = estimateRecovery();
+
+    stats.crashSnapshots++;
+    stats.recoveryTime.sample(est.time);
+    stats.recoveryLogEntries.sample(est.logEntries);
+    stats.recoveryTimeTotal += est.time;
+    if (est.time > stats.recoveryTimeMax.value()) {
+        stats.recoveryTimeMax = est.time;
+    }
+    stats.recoveryBytesRead += est.bytesRead;
+    stats.recoveryBytesWritten += est.bytesWritten;
+    stats.recoveryTreeLines += est.treeLines;
+
+    *crashLog->stream() << curTick() << "," << est.pcbEntries << ","
+        << est.logEntries << "," << est.writeQueueLines << ","
+        << est.homeLines << "," << est.treeLines << "," << est.bytesRead
+        << "," << est.bytesWritten << "," << est.time << "\n";
+    DPRINTF(MetadataCache, "Crash at %d: %d log entries, %d home lines, "
+            "%d tree lines, recovery %d ticks\n", curTick(), est.logEntries,
+            est.homeLines, est.treeLines, est.time);
+
+    while (nextCrash < crashTicks.size() &&
+           crashTicks[nextCrash] <= curTick()) {
+        nextCrash++;
+    }
+    if (crashInterval > 0 &&
+        lastPeriodicCrash + crashInterval <= curTick()) {
+        lastPeriodicCrash = curTick();
+    }
+    scheduleCrash();
+}
+
+void
+MetadataCache::scheduleCrash()
+{
+    // Next explicit or periodic crash point, whichever comes first
+    Tick when = MaxTick;
+    if (nextCrash < crashTicks.size()) {
+        when = crashTicks[nextCrash];
+    }
+    if (crashInterval > 0) {
+        when = std::min(when, lastPeriodicCrash + crashInterval);
+    }
+    if (when != MaxTick) {
+        schedule(crashEvent, std::max(when, curTick()));
+    }
+}
+
+MetadataCache::WriteQueueEntry *
+MetadataCache::enqueueWrite(Addr baseAddr, const uint8_t *data, uint8_t mask)
+{
+    auto it = writeQueue.find(baseAddr);
+    if (it != writeQueue.end()) {
+        // Line still waiting for NVM: merge instead of queueing a new write
+        WriteQueueEntry &pending = it->second;
+        for (int i = 0; i < 8; i++) {
+            if (mask & (1 << i)) {
+                memcpy(&pending.data[i * 8], &data[i * 8], 8);
+            }
+        }
+        stats.writeQueueMergedPartials +=
+            __builtin_popcount(pending.validMask & mask);
+        pending.validMask |= mask;
+        stats.writeQueueMerges++;
+        DPRINTF(MetadataCache, "Write queue merge: baseAddr=%#x, mask=%#x\n",
+                baseAddr, pending.validMask);
+        return &pending;
+    }
+
+    if (writeQueue.size() >= (size_t)writeQueueCapacity) {
         stats.writeQueueFull++;
+        return nullptr;
     }
+
+    WriteQueueEntry &pending = writeQueue[baseAddr];
+    pending.baseAddr = baseAddr;
+    for (int i = 0; i < 8; i++) {
+        if (mask & (1 << i)) {
+            memcpy(&pending.data[i * 8], &data[i * 8], 8);
+        }
+    }
+    pending.validMask = mask;
+    pending.enqueueTick = curTick();
+    writeQueueOrder.push_back(baseAddr);
+    return &pending;
 }
 
-MetadataCache::MetadataCacheStats::MetadataCacheStats(statistics::Group *parent)
+Addr
+MetadataCache::toNVMAddr(Addr baseAddr) const
+{
+    return nvmRange.start() + (baseAddr % nvmRange.size());
+}
+
+void
+MetadataCache::issueWriteQueue()
+{
+    // Up to max_outstanding_writes lines in flight (one per NVM channel
+    // keeps every channel busy); everything behind them keeps merging.
+    // While a refused packet waits for its retry nothing new is sent.
+    if (!nvmainPort.isConnected() || !nvmRange.valid() ||
+        nvmainPort.hasQueuedPackets() ||
+        writesInFlight >= maxOutstandingWrites || writeQueueOrder.empty()) {
+        return;
+    }
+
+    Addr baseAddr = writeQueueOrder.front();
+    writeQueueOrder.pop_front();
+    auto it = writeQueue.find(baseAddr);
+    assert(it != writeQueue.end());
+    const WriteQueueEntry &pending = it->second;
+
+    RequestPtr req = std::make_shared<Request>(
+        toNVMAddr(baseAddr), 64, 0, requestorId);
+    if (pending.validMask != 0xFF) {
+        // Only the valid partials may overwrite the line in NVM
+        std::vector<bool> byteEnable(64, false);
+        for (int i = 0; i < 64; i++) {
+            byteEnable[i] = pending.validMask & (1 << (i / 8));
+        }
+        req->setByteEnable(byteEnable);
+    }
+
+    PacketPtr pkt = new Packet(req, MemCmd::WriteReq);
+    pkt->allocate();
+    pkt->setData(pending.data);
+
+    stats.writeQueueIssued++;
+    stats.writeQueueDelay.sample(curTick() - pending.enqueueTick);
+    DPRINTF(MetadataCache, "Write queue issue: baseAddr=%#x, mask=%#x, "
+            "nvmAddr=%#x\n", baseAddr, pending.validMask, pkt->getAddr());
+
+    writeQueue.erase(it);
+    writesInFlight++;
+    nvmainPort.sendTimingReq(pkt);  // Queued by the port if NVMain is busy
+
+    // Fill the remaining channel slots unless the port is backed up
+    if (!nvmainPort.hasQueuedPackets()) {
+        issueWriteQueue();
+    }
+}
+
+MetadataCache::MetadataCacheStats::MetadataCacheStats(statistics::Group *parent,
+                                                      int numBanks,
+                                                      int numPorts)
     : statistics::Group(parent),
       ADD_STAT(hits, statistics::units::Count::get(),
                "Number of cache hits"),
@@ -458,7 +847,61 @@ MetadataCache::MetadataCacheStats::MetadataCacheStats(statistics::Group *parent)
       ADD_STAT(writeAmplification, statistics::units::Ratio::get(),
                "Write Amplification = NVM writes / (Partial Bytes/64B)"),
       ADD_STAT(plubOverhead, statistics::units::Ratio::get(),
-               "PLUB Overhead = (PLUB Partials / Total Partials) × 100")
+               "PLUB Overhead = (PLUB Partials / Total Partials) × 100"),
+      ADD_STAT(writeQueueMerges, statistics::units::Count::get(),
+               "Writes merged into a line already pending in the write queue"),
+      ADD_STAT(writeQueueMergedPartials, statistics::units::Count::get(),
+               "8B partials that overwrote a pending partial in the write queue"),
+      ADD_STAT(writeQueueIssued, statistics::units::Count::get(),
+               "Lines issued from the write queue to NVMain"),
+      ADD_STAT(writeQueueDelay, statistics::units::Tick::get(),
+               "Ticks a line waits in the write queue before issue"),
+      ADD_STAT(writeQueueMergeRate, statistics::units::Ratio::get(),
+               "Write queue merges / (merges + issued lines)"),
+      ADD_STAT(bankAccesses, statistics::units::Count::get(),
+               "Accesses per cache/PCB bank"),
+      ADD_STAT(portRequests, statistics::units::Count::get(),
+               "Requests received per CPU-side port"),
+      ADD_STAT(bankConflicts, statistics::units::Count::get(),
+               "Accesses that stalled because their bank was busy"),
+      ADD_STAT(bankConflictStallTicks, statistics::units::Tick::get(),
+               "Total ticks accesses stalled on busy banks"),
+      ADD_STAT(bankConflictStall, statistics::units::Tick::get(),
+               "Stall per conflicting access"),
+      ADD_STAT(bankConflictRate, statistics::units::Ratio::get(),
+               "Bank conflicts / total bank accesses"),
+      ADD_STAT(treeCounterWrites, statistics::units::Count::get(),
+               "Counter writes covered by the integrity tree"),
+      ADD_STAT(treeUpdates, statistics::units::Count::get(),
+               "8B integrity-tree node partials sent through the PCB"),
+      ADD_STAT(treeNodeHits, statistics::units::Count::get(),
+               "Integrity-tree nodes found in the cache"),
+      ADD_STAT(treeNodeMisses, statistics::units::Count::get(),
+               "Integrity-tree nodes fetched from NVM"),
+      ADD_STAT(treeVerifyFetches, statistics::units::Count::get(),
+               "Tree nodes fetched to verify a counter read miss"),
+      ADD_STAT(treeUpdatesPerWrite, statistics::units::Ratio::get(),
+               "Integrity-tree partials per counter write"),
+      ADD_STAT(treeNodeHitRate, statistics::units::Ratio::get(),
+               "Tree node hits / tree node accesses"),
+      ADD_STAT(crashSnapshots, statistics::units::Count::get(),
+               "Crashes injected (crash_points / crash_interval)"),
+      ADD_STAT(recoveryTime, statistics::units::Tick::get(),
+               "Estimated recovery time per injected crash"),
+      ADD_STAT(recoveryLogEntries, statistics::units::Count::get(),
+               "Partials to replay per injected crash"),
+      ADD_STAT(recoveryTimeTotal, statistics::units::Tick::get(),
+               "Estimated recovery time summed over injected crashes"),
+      ADD_STAT(recoveryTimeMax, statistics::units::Tick::get(),
+               "Worst estimated recovery time of any injected crash"),
+      ADD_STAT(recoveryBytesRead, statistics::units::Byte::get(),
+               "NVM bytes recovery reads, summed over injected crashes"),
+      ADD_STAT(recoveryBytesWritten, statistics::units::Byte::get(),
+               "NVM bytes recovery writes, summed over injected crashes"),
+      ADD_STAT(recoveryTreeLines, statistics::units::Count::get(),
+               "Tree lines recomputed, summed over injected crashes"),
+      ADD_STAT(avgRecoveryTime, statistics::units::Tick::get(),
+               "Mean estimated recovery time per injected crash")
 {
     hitRate = hits / (hits + misses);
     pcbCoalescingRate = pcbCoalescedBlocks * 8 / pcbTotalPartials;
@@ -467,6 +910,20 @@ MetadataCache::MetadataCacheStats::MetadataCacheStats(statistics::Group *parent)
     overflowRate = (pcbOverflows / pcbTotalPartials) * 100;
     writeAmplification = nvmWrites / ((pcbTotalPartials * 8) / 64);
     plubOverhead = (plubPartials / pcbTotalPartials) * 100;
+
+    writeQueueDelay.init(20);
+
+    bankAccesses.init(numBanks);
+    portRequests.init(std::max(numPorts, 1));
+    bankConflictStall.init(20);
+    bankConflictRate = bankConflicts / sum(bankAccesses);
+    writeQueueMergeRate = writeQueueMerges / (writeQueueMerges + writeQueueIssued);
+    treeUpdatesPerWrite = treeUpdates / treeCounterWrites;
+    treeNodeHitRate = treeNodeHits / (treeNodeHits + treeNodeMisses);
+
+    recoveryTime.init(20);
+    recoveryLogEntries.init(20);
+    avgRecoveryTime = recoveryTimeTotal / crashSnapshots;
 }
 
 } // namespace memory
@@ -1,15 +1,21 @@
 #ifndef __MEM_SECURITY_METADATA_CACHE_HH__
 #define __MEM_SECURITY_METADATA_CACHE_HH__
 
+#include "base/output.hh"
 #include "base/statistics.hh"
 #include "base/types.hh"
+#include "mem/nvmain_control.hh"
 #include "mem/port.hh"
+#include "mem/qport.hh"
+#include "mem/security/integrity_tree.hh"
 #include "params/MetadataCache.hh"
 #include "sim/clocked_object.hh"
 
 #include <deque>
 #include <map>
-#include <queue>
+#include <memory>
+#include <set>
+#include <unordered_map>
 #include <vector>
 
 namespace gem5
@@ -27,6 +33,19 @@ namespace memory
  * - Granularity: 8B entries (8 entries per 64B line)
  * - Eviction: CLRU (Clock-based LRU) policy
  * - Outputs evicted partials to Write Queue on full
+ * - Vector CPU-side port: one port per connected traffic source
+ * - num_banks independently pipelined cache/PCB banks selected by the
+ *   line address; each accepts an access every bank_issue_cycles and a
+ *   request to a busy bank stalls (bank conflict)
+ * - With tree_arity set, counter writes in tree_counters also update
+ *   their Bonsai Merkle tree path: each tree node is looked up in (and
+ *   cached by) this cache and its new 8B hash goes through the PCB like
+ *   any other partial. Counter read misses verify up to the first cached
+ *   ancestor.
+ * - crash_points / crash_interval inject crashes: each snapshots the PCB,
+ *   the PLUB log and the write queue, and estimates the recovery work
+ *   and time from the latencies of the nvm_channels, without disturbing
+ *   the simulation
  */
 class MetadataCache : public ClockedObject
 {
@@ -38,7 +57,17 @@ class MetadataCache : public ClockedObject
 
     void startup() override;
 
+    /**
+     * Read the 8B counter at addr if its line is cached, without touching
+     * replacement state or hit/miss stats. Used by the AES-CTR stage to
+     * predict upcoming counter values.
+     */
+    bool peekCounter(Addr addr, uint64_t &data) const;
+
   private:
+    /** Requestor of the write packets sent to NVMain */
+    const RequestorID requestorId;
+
     /** Cache line structure (64 bytes) */
     struct CacheLine {
         bool valid;
@@ -71,11 +100,44 @@ class MetadataCache : public ClockedObject
     const Tick accessLatency;
     const int writeQueueCapacity;
 
+    // Banking: tick at which each bank can accept its next access
+    const int numBanks;
+    const Tick bankIssueLatency;
+    std::vector<Tick> bankFreeAt;
+
     // Cache storage
     std::vector<CacheSet> cacheSets;
 
-    // Write queue for evicted partials
-    std::queue<std::pair<Addr, uint64_t>> writeQueue;
+    // Integrity tree over the counters (null with tree_arity 0)
+    std::unique_ptr<IntegrityTree> tree;
+
+    /**
+     * Pending NVM write for one 64B line. Later writes to the same line
+     * are merged into the entry while it waits, so each entry costs one
+     * PCM write however many partials it collects.
+     */
+    struct WriteQueueEntry {
+        Addr baseAddr;           // 64B-aligned line address
+        uint8_t data[64];        // Merged line contents
+        uint8_t validMask;       // Which 8B partials carry data
+        bool accounted;          // Already counted in nvmWrites
+        Tick enqueueTick;        // Arrival of the first write
+
+        WriteQueueEntry()
+            : baseAddr(0), validMask(0), accounted(false), enqueueTick(0)
+        {
+            memset(data, 0, 64);
+        }
+    };
+
+    // Write queue for coalesced blocks and PLUB partials, indexed by 64B
+    // line. writeQueueOrder keeps lines in first-arrival order so they
+    // are issued to NVM FIFO; merging never reorders a pending line.
+    std::unordered_map<Addr, WriteQueueEntry> writeQueue;
+    std::deque<Addr> writeQueueOrder;
+    const int maxOutstandingWrites;  // Lines in flight to NVM channels
+    int writesInFlight;
+    AddrRange nvmRange;
 
     /** PCB (Partial Coalescing Buffer) for merging 8B partials into 64B blocks */
     struct PCBEntry {
@@ -99,39 +161,89 @@ class MetadataCache : public ClockedObject
 
     // PCB storage: map from 64B-aligned base address to coalescing entry
     std::map<Addr, PCBEntry> pcbMap;
-    const int pcbCapacity = 256;  // Max 256 entries in PCB (16KB buffer)
-    const Tick flushInterval = 10000000000;  // 10ms in picoseconds (ADR flush)
+    const int pcbCapacity;      // PCB entries (default 256 = 16KB buffer)
+    const Tick flushInterval;   // ADR flush period (default 10ms)
     EventFunctionWrapper flushEvent;
 
     // Helper functions for PCB
     void coalescePartial(Addr addr, uint64_t data);
     void flushPCB();
+
+    /**
+     * Work and time to recover from a power loss at the current tick.
+     * ADR drains the PCB and write queue into the log; recovery replays
+     * every log entry written since the last periodic flush into its
+     * home line and recomputes the tree nodes above the replayed
+     * counters.
+     */
+    struct RecoveryEstimate {
+        uint64_t pcbEntries = 0;     // PCB lines drained at ADR time
+        uint64_t logEntries = 0;     // 8B partials to replay
+        uint64_t writeQueueLines = 0; // Lines pending NVM at ADR time
+        uint64_t homeLines = 0;      // Distinct lines the replay writes
+        uint64_t treeLines = 0;      // Tree lines recomputed
+        uint64_t bytesRead = 0;
+        uint64_t bytesWritten = 0;
+        Tick time = 0;
+    };
+    RecoveryEstimate estimateRecovery() const;
+    void injectCrash();
+    void scheduleCrash();
+
+    // Crash injection
+    std::vector<NVMainControl *> nvmChannels;
+    std::vector<Tick> crashTicks;    // Sorted explicit crash points
+    size_t nextCrash;
+    const Tick crashInterval;        // Periodic crash points (0 = off)
+    Tick lastPeriodicCrash;
+    EventFunctionWrapper crashEvent;
+    OutputStream *crashLog;
+
+    // PLUB log since the last periodic flush: 64B line -> partial mask
+    std::unordered_map<Addr, uint8_t> plubLog;
+    uint64_t plubLogPartials;
     void sendToNVMain(const PCBEntry &entry);
     void sendToPLUB(Addr addr, uint64_t data);  // Overflow path
     bool trySendPacket(PacketPtr pkt);  // Try to send packet to NVMain
 
+    // Helper functions for the write queue
+    WriteQueueEntry *enqueueWrite(Addr baseAddr, const uint8_t *data,
+                                  uint8_t mask);
+    void issueWriteQueue();
+    Addr toNVMAddr(Addr baseAddr) const;
+
     // Helper functions
     Addr getSetIndex(Addr addr) const;
     Addr getTag(Addr addr) const;
     int getOffset(Addr addr) const;
     int findVictim(int setIdx);
     bool lookup(Addr addr, uint64_t &data);
-    void insert(Addr addr, uint64_t data);
+    void insert(Addr addr, uint64_t data, bool dirty=true);
     void evict(int setIdx, int wayIdx);
 
-    // Port for communication
-    class MemoryPort : public ResponsePort
+    // Helper functions for banking
+    int getBank(Addr addr) const;
+    Tick reserveBank(int bank);
+
+    // Helper functions for the integrity tree
+    void updateTree(Addr addr, uint64_t data);
+    void verifyTree(Addr addr);
+
+    // CPU-side port, one per traffic source; responses are queued until
+    // the bank has finished the access
+    class MemoryPort : public QueuedResponsePort
     {
       private:
+        RespPacketQueue queue;
         MetadataCache &cache;
 
       public:
-        MemoryPort(const std::string &name, MetadataCache &cache);
+        MemoryPort(const std::string &name, MetadataCache &cache,
+                   PortID id);
 
         Tick recvAtomic(PacketPtr pkt) override;
         void recvFunctional(PacketPtr pkt) override;
         bool recvTimingReq(PacketPtr pkt) override;
-        void recvRespRetry() override;
         AddrRangeList getAddrRanges() const override;
     };
 
@@ -152,13 +264,14 @@ class MetadataCache : public ClockedObject
         bool hasQueuedPackets() const { return !queuedPackets.empty(); }
     };
 
-    MemoryPort port;
+    std::vector<std::unique_ptr<MemoryPort>> cpuPorts;
     NVMainPort nvmainPort;
 
     // Statistics
     struct MetadataCacheStats : public statistics::Group
     {
-        MetadataCacheStats(statistics::Group *parent);
+        MetadataCacheStats(statistics::Group *parent, int numBanks,
+                           int numPorts);
 
         statistics::Scalar hits;
         statistics::Scalar misses;
@@ -181,6 +294,41 @@ class MetadataCache : public ClockedObject
         statistics::Formula overflowRate;        // (Overflows / Total) × 100
         statistics::Formula writeAmplification;  // NVM writes / (Partial Bytes/64B)
         statistics::Formula plubOverhead;        // (PLUB Partials / Total) × 100
+
+        // Write queue statistics
+        statistics::Scalar writeQueueMerges;     // Writes merged into a pending line
+        statistics::Scalar writeQueueMergedPartials; // 8B partials overwritten while pending
+        statistics::Scalar writeQueueIssued;     // Lines issued to NVMain
+        statistics::Histogram writeQueueDelay;   // Enqueue-to-issue ticks
+        statistics::Formula writeQueueMergeRate; // Merges / (merges + issued lines)
+
+        // Banking and port statistics
+        statistics::Vector bankAccesses;         // Accesses per bank
+        statistics::Vector portRequests;         // Requests per CPU-side port
+        statistics::Scalar bankConflicts;        // Accesses that found their bank busy
+        statistics::Scalar bankConflictStallTicks; // Total ticks stalled on busy banks
+        statistics::Histogram bankConflictStall; // Stall per conflicting access
+        statistics::Formula bankConflictRate;    // Conflicts / total accesses
+
+        // Integrity tree statistics
+        statistics::Scalar treeCounterWrites;    // Counter writes the tree covers
+        statistics::Scalar treeUpdates;          // 8B tree-node partials sent to PCB
+        statistics::Scalar treeNodeHits;         // Tree nodes found in the cache
+        statistics::Scalar treeNodeMisses;       // Tree nodes fetched from NVM
+        statistics::Scalar treeVerifyFetches;    // Misses while verifying a counter read
+        statistics::Formula treeUpdatesPerWrite; // Tree partials per counter write
+        statistics::Formula treeNodeHitRate;     // Hits / tree node accesses
+
+        // Crash-recovery statistics
+        statistics::Scalar crashSnapshots;       // Crashes injected
+        statistics::Histogram recoveryTime;      // Estimated recovery ticks
+        statistics::Histogram recoveryLogEntries; // Partials to replay
+        statistics::Scalar recoveryTimeTotal;    // Sum over snapshots
+        statistics::Scalar recoveryTimeMax;      // Worst snapshot
+        statistics::Scalar recoveryBytesRead;    // NVM bytes read, all snapshots
+        statistics::Scalar recoveryBytesWritten; // NVM bytes written, all snapshots
+        statistics::Scalar recoveryTreeLines;    // Tree lines recomputed, all snapshots
+        statistics::Formula avgRecoveryTime;     // Mean recovery ticks
     } stats;
 };
 
@@ -4,11 +4,15 @@
 
 #include "mem/security/metadata_traffic_gen.hh"
 
+#include <algorithm>
+
+#include "base/logging.hh"
 #include "base/random.hh"
 #include "base/trace.hh"
 #include "debug/MetadataTrafficGen.hh"
 #include "mem/packet.hh"
 #include "mem/request.hh"
+#include "sim/stats.hh"
 
 namespace gem5
 {
@@ -25,13 +29,7 @@ MetadataTrafficGen::GeneratorPort::GeneratorPort(
 bool
 MetadataTrafficGen::GeneratorPort::recvTimingResp(PacketPtr pkt)
 {
-    generator.totalRequestsCompleted++;
-    generator.stats.requestsCompleted++;
-    
-    DPRINTF(MetadataTrafficGen, "Received response for addr %#x\n",
-            pkt->getAddr());
-    
-    delete pkt;
+    generator.completeRequest(pkt);
     return true;
 }
 
@@ -41,7 +39,9 @@ MetadataTrafficGen::GeneratorPort::recvReqRetry()
     DPRINTF(MetadataTrafficGen, "Received retry signal\n");
     generator.stats.retries++;
     generator.waitingForRetry = false;
-    generator.generateNextRequest();
+    if (generator.sendRmwWrites()) {
+        generator.generateNextRequest();
+    }
 }
 
 MetadataTrafficGen::MetadataTrafficGen(const Params &p)
@@ -52,11 +52,18 @@ MetadataTrafficGen::MetadataTrafficGen(const Params &p)
       burstSize(p.burst_size),
       burstInterval(p.burst_interval),
       requestLatency(p.request_latency),
+      maxOutstanding(p.max_outstanding),
+      readFraction(p.read_fraction),
+      rmw(p.rmw),
       currentAddr(p.start_addr),
       requestsInBurst(0),
       totalRequestsSent(0),
       totalRequestsCompleted(0),
       waitingForRetry(false),
+      waitingForResponse(false),
+      windowStallStart(0),
+      rng(p.seed),
+      readDist(std::clamp(p.read_fraction, 0.0, 1.0)),
       nextRequestEvent([this]{ generateNextRequest(); }, name()),
       nextBurstEvent([this]{ generateNextBurst(); }, name()),
       stats(this)
@@ -65,6 +72,10 @@ MetadataTrafficGen::MetadataTrafficGen(const Params &p)
             "Created MetadataTrafficGen: addr range [%#x, %#x), "
             "burst size %d, burst interval %llu ticks\n",
             startAddr, endAddr, burstSize, burstInterval);
+
+    fatal_if(readFraction < 0.0 || readFraction > 1.0,
+             "%s: read_fraction must be in [0, 1], got %f",
+             name(), readFraction);
 }
 
 Port&
@@ -104,31 +115,57 @@ MetadataTrafficGen::generateNextRequest()
         return; // Will be called again on retry
     }
 
+    if (nextRequestEvent.scheduled() || nextBurstEvent.scheduled()) {
+        return; // A retry or response raced the timer; let the timer run
+    }
+
+    if (maxOutstanding > 0 &&
+        totalRequestsSent - totalRequestsCompleted >= maxOutstanding) {
+        // Window full: the next response resumes generation
+        if (!waitingForResponse) {
+            stats.windowStalls++;
+            windowStallStart = curTick();
+        }
+        waitingForResponse = true;
+        return;
+    }
+
+    if (waitingForResponse) {
+        waitingForResponse = false;
+        stats.windowStallTicks += curTick() - windowStallStart;
+    }
+
     if (requestsInBurst >= burstSize) {
         // Burst complete, schedule next burst
         schedule(nextBurstEvent, curTick() + burstInterval);
         return;
     }
 
-    // Create metadata write request (8-byte partial)
-    RequestPtr req = std::make_shared<Request>(
-        currentAddr, 8, Request::UNCACHEABLE, Request::funcRequestorId);
-    
-    PacketPtr pkt = new Packet(req, MemCmd::WriteReq);
-    pkt->allocate();
-    
-    // Fill with dummy metadata (counter or OTAC partial)
+    // Plain reads look up the counter; updates write it, or read it first
+    // and write back the increment when rmw is set
+    bool is_read = readDist(rng);
+    bool rmw_read = !is_read && rmw;
+
+    // Fill writes with dummy metadata (counter or OTAC partial)
     uint64_t metadata = (totalRequestsSent << 32) | currentAddr;
-    pkt->setData((uint8_t*)&metadata);
+    PacketPtr pkt = makePacket(currentAddr, is_read || rmw_read, metadata);
 
     DPRINTF(MetadataTrafficGen,
-            "Generating request %d in burst: addr %#x, data %#x\n",
-            requestsInBurst, currentAddr, metadata);
+            "Generating %s %d in burst: addr %#x\n",
+            is_read ? "read" : (rmw_read ? "RMW read" : "write"),
+            requestsInBurst, currentAddr);
 
+    const Request *sentReq = pkt->req.get();
     if (sendPacket(pkt)) {
         // Packet sent successfully
+        inFlight[sentReq] = InFlight{curTick(), rmw_read, 0};
         totalRequestsSent++;
         stats.requestsSent++;
+        if (is_read || rmw_read) {
+            stats.readsSent++;
+        } else {
+            stats.writesSent++;
+        }
         requestsInBurst++;
         
         // Move to next address (wrap around if needed)
@@ -145,11 +182,94 @@ MetadataTrafficGen::generateNextRequest()
             schedule(nextBurstEvent, curTick() + burstInterval);
         }
     } else {
-        // Packet blocked, wait for retry
+        // Packet blocked, wait for retry; it is regenerated on retry
+        delete pkt;
         waitingForRetry = true;
     }
 }
 
+PacketPtr
+MetadataTrafficGen::makePacket(Addr addr, bool is_read, uint64_t data)
+{
+    RequestPtr req = std::make_shared<Request>(
+        addr, 8, Request::UNCACHEABLE, Request::funcRequestorId);
+
+    PacketPtr pkt = new Packet(req, is_read ? MemCmd::ReadReq :
+                                              MemCmd::WriteReq);
+    pkt->allocate();
+    if (!is_read) {
+        pkt->setData((uint8_t*)&data);
+    }
+    return pkt;
+}
+
+bool
+MetadataTrafficGen::sendRmwWrites()
+{
+    while (!rmwWrites.empty() && !waitingForRetry) {
+        auto [addr, value, read_tick] = rmwWrites.front();
+        PacketPtr pkt = makePacket(addr, false, value);
+        const Request *sentReq = pkt->req.get();
+
+        if (!sendPacket(pkt)) {
+            delete pkt;
+            waitingForRetry = true;
+            return false;
+        }
+
+        // The write-back replaces its read in the outstanding window
+        inFlight[sentReq] = InFlight{curTick(), false, read_tick};
+        totalRequestsSent++;
+        stats.requestsSent++;
+        stats.writesSent++;
+        rmwWrites.pop_front();
+    }
+    return !waitingForRetry;
+}
+
+void
+MetadataTrafficGen::completeRequest(PacketPtr pkt)
+{
+    totalRequestsCompleted++;
+    stats.requestsCompleted++;
+
+    auto it = inFlight.find(pkt->req.get());
+    if (it != inFlight.end()) {
+        const InFlight &entry = it->second;
+        Tick latency = curTick() - entry.sendTick;
+        stats.requestLatency.sample(latency);
+        if (pkt->isRead()) {
+            stats.readLatency.sample(latency);
+        } else {
+            stats.writeLatency.sample(latency);
+        }
+
+        if (entry.rmwRead) {
+            // Write the incremented counter back to the same slot
+            rmwWrites.emplace_back(pkt->getAddr(),
+                                   pkt->getLE<uint64_t>() + 1,
+                                   entry.sendTick);
+        } else if (entry.rmwStart) {
+            stats.rmwCompleted++;
+            stats.rmwLatency.sample(curTick() - entry.rmwStart);
+        }
+        inFlight.erase(it);
+    }
+
+    DPRINTF(MetadataTrafficGen, "Received %s response for addr %#x\n",
+            pkt->isRead() ? "read" : "write", pkt->getAddr());
+
+    delete pkt;
+
+    if (!sendRmwWrites()) {
+        return; // Retry drains the write-backs, then resumes generation
+    }
+
+    if (waitingForResponse) {
+        generateNextRequest();
+    }
+}
+
 bool
 MetadataTrafficGen::sendPacket(PacketPtr pkt)
 {
@@ -170,8 +290,34 @@ MetadataTrafficGen::MetadataTrafficGenStats::MetadataTrafficGenStats(
       ADD_STAT(burstsCompleted, statistics::units::Count::get(),
                "Number of bursts completed"),
       ADD_STAT(retries, statistics::units::Count::get(),
-               "Number of retry events")
+               "Number of retry events"),
+      ADD_STAT(windowStalls, statistics::units::Count::get(),
+               "Times generation stalled on a full outstanding window"),
+      ADD_STAT(windowStallTicks, statistics::units::Tick::get(),
+               "Ticks spent stalled on a full outstanding window"),
+      ADD_STAT(requestLatency, statistics::units::Tick::get(),
+               "Latency from send to response per request"),
+      ADD_STAT(achievedThroughput, statistics::units::Rate<
+                    statistics::units::Count, statistics::units::Second>::get(),
+               "Completed requests per simulated second"),
+      ADD_STAT(readsSent, statistics::units::Count::get(),
+               "Number of 8B counter reads sent"),
+      ADD_STAT(writesSent, statistics::units::Count::get(),
+               "Number of 8B metadata writes sent"),
+      ADD_STAT(rmwCompleted, statistics::units::Count::get(),
+               "Counter read-modify-writes completed"),
+      ADD_STAT(readLatency, statistics::units::Tick::get(),
+               "Latency from send to response per read"),
+      ADD_STAT(writeLatency, statistics::units::Tick::get(),
+               "Latency from send to response per write"),
+      ADD_STAT(rmwLatency, statistics::units::Tick::get(),
+               "Latency from counter read to write-back response")
 {
+    requestLatency.init(32);
+    readLatency.init(32);
+    writeLatency.init(32);
+    rmwLatency.init(32);
+    achievedThroughput = requestsCompleted / simSeconds;
 }
 
 } // namespace memory
@@ -4,11 +4,26 @@
  * Generates realistic burst traffic patterns (100-500 partials/ms) for
  * metadata cache evaluation. Simulates write-heavy workload typical of
  * secure memory systems with OTAC/Counter updates.
+ *
+ * Each request is a read with probability read_fraction and an update
+ * otherwise. An update is a plain 8B write, or with rmw set a counter
+ * increment: read the counter, then write back value + 1 when the read
+ * response arrives.
+ *
+ * Open loop by default. With max_outstanding > 0 the generator is closed
+ * loop: it stops issuing once that many requests await a response and
+ * resumes on the next response, so achieved throughput saturates at what
+ * the cache+PCB+NVM path can sustain.
  */
 
 #ifndef __MEM_SECURITY_METADATA_TRAFFIC_GEN_HH__
 #define __MEM_SECURITY_METADATA_TRAFFIC_GEN_HH__
 
+#include <deque>
+#include <random>
+#include <tuple>
+#include <unordered_map>
+
 #include "mem/port.hh"
 #include "params/MetadataTrafficGen.hh"
 #include "sim/clocked_object.hh"
@@ -45,6 +60,9 @@ class MetadataTrafficGen : public ClockedObject
     const uint64_t burstSize;      // Number of requests per burst
     const Tick burstInterval;      // Time between bursts
     const Tick requestLatency;     // Time between requests in a burst
+    const uint64_t maxOutstanding; // Closed-loop window (0 = open loop)
+    const double readFraction;     // Probability a request is a read
+    const bool rmw;                // Updates are counter read-modify-writes
 
     /** State tracking */
     uint64_t currentAddr;
@@ -52,6 +70,24 @@ class MetadataTrafficGen : public ClockedObject
     uint64_t totalRequestsSent;
     uint64_t totalRequestsCompleted;
     bool waitingForRetry;
+    bool waitingForResponse;       // Stalled on a full outstanding window
+    Tick windowStallStart;
+
+    /** Operation mix, seeded for reproducible runs */
+    std::mt19937_64 rng;
+    std::bernoulli_distribution readDist;
+
+    /** Bookkeeping for a request still awaiting its response */
+    struct InFlight
+    {
+        Tick sendTick;
+        bool rmwRead;    // Read half of a read-modify-write
+        Tick rmwStart;   // Send tick of the read for an RMW write, else 0
+    };
+    std::unordered_map<const Request *, InFlight> inFlight;
+
+    /** RMW write-backs (addr, value, read send tick) waiting to be sent */
+    std::deque<std::tuple<Addr, uint64_t, Tick>> rmwWrites;
 
     /** Event for generating next request */
     EventFunctionWrapper nextRequestEvent;
@@ -63,9 +99,18 @@ class MetadataTrafficGen : public ClockedObject
     /** Start next burst of requests */
     void generateNextBurst();
 
+    /** Build an 8B read or write packet for addr */
+    PacketPtr makePacket(Addr addr, bool is_read, uint64_t data);
+
     /** Send a packet to the metadata cache */
     bool sendPacket(PacketPtr pkt);
 
+    /** Send queued RMW write-backs; false if the port blocked */
+    bool sendRmwWrites();
+
+    /** Account for a response and resume if the window was full */
+    void completeRequest(PacketPtr pkt);
+
   public:
     PARAMS(MetadataTrafficGen);
     MetadataTrafficGen(const Params &p);
@@ -86,6 +131,20 @@ class MetadataTrafficGen : public ClockedObject
         statistics::Scalar requestsCompleted;
         statistics::Scalar burstsCompleted;
         statistics::Scalar retries;
+
+        // Closed-loop statistics
+        statistics::Scalar windowStalls;
+        statistics::Scalar windowStallTicks;
+        statistics::Histogram requestLatency;
+        statistics::Formula achievedThroughput;
+
+        // Read/write mix statistics
+        statistics::Scalar readsSent;
+        statistics::Scalar writesSent;
+        statistics::Scalar rmwCompleted;
+        statistics::Histogram readLatency;
+        statistics::Histogram writeLatency;
+        statistics::Histogram rmwLatency;
     } stats;
 };
 
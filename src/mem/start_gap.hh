@@ -0,0 +1,76 @@
+/*
+ * Start-Gap wear leveling (Qureshi et al., MICRO 2009)
+ *
+ * Maps the N logical lines of a region onto N + 1 physical lines, one of
+ * which (the gap) is unused. Every gap_interval writes the line below the
+ * gap is copied into it and the gap moves down by one; once it reaches
+ * the bottom it wraps to the top and the start register advances, so
+ * over time every logical line rotates through every physical line:
+ *
+ *     PA = (LA + start) mod N,  plus one if PA >= gap
+ *
+ * Two registers per region, no table. NVMainControl keeps one StartGap
+ * per wear region.
+ */
+
+#ifndef __MEM_START_GAP_HH__
+#define __MEM_START_GAP_HH__
+
+#include <cstdint>
+
+namespace gem5
+{
+namespace memory
+{
+
+class StartGap
+{
+  public:
+    StartGap(uint64_t lines, unsigned gap_interval)
+        : lines(lines), interval(gap_interval), start(0), gap(lines),
+          writes(0)
+    {}
+
+    /** Physical line, in [0, lines], holding logical line la */
+    uint64_t
+    map(uint64_t la) const
+    {
+        uint64_t pa = (la + start) % lines;
+        return pa >= gap ? pa + 1 : pa;
+    }
+
+    /**
+     * Count one write to the region. Returns true if it triggered a gap
+     * move, with the physical line the move wrote in moved_to.
+     */
+    bool
+    write(uint64_t &moved_to)
+    {
+        if (++writes < interval) {
+            return false;
+        }
+        writes = 0;
+        if (gap == 0) {
+            // Line N wraps around into line 0; everything shifts by one
+            moved_to = 0;
+            gap = lines;
+            start = (start + 1) % lines;
+        } else {
+            moved_to = gap;
+            gap--;
+        }
+        return true;
+    }
+
+  private:
+    const uint64_t lines;
+    const unsigned interval;
+    uint64_t start;
+    uint64_t gap;
+    unsigned writes;
+};
+
+} // namespace memory
+} // namespace gem5
+
+#endif // __MEM_START_GAP_HH__
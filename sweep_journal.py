@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+On-disk job journal for Thoth sweeps
+
+Records the state of every run of a sweep in experiment_results/journal.json:
+pending, running, done or failed, with its parameters, attempts, last exit
+code and timing. The file is rewritten atomically after every change, so
+a sweep killed at any point (preemption, Ctrl-C, a crash of the runner)
+leaves a journal that says exactly which runs finished.
+
+On restart, run_experiments.py --resume skips runs the journal has as done
+with the same parameters and retries failed ones once their backoff has
+elapsed. A run left "running" was interrupted rather than failed; it is
+simply run again without counting an attempt.
+
+Usage:
+    ./sweep_journal.py                          # state of every journaled run
+    ./sweep_journal.py exp1_burst_size          # one experiment set
+"""
+
+import json
+import os
+import sys
+import time
+
+JOURNAL_FILE = "experiment_results/journal.json"
+
+STATES = ("pending", "running", "done", "failed")
+
+# Failed attempt n waits retry_delay * 2**(n - 1), up to this long
+MAX_BACKOFF = 3600.0
+
+
+class JobJournal:
+    """Persistent per-run state of a sweep, keyed by experiment and run"""
+
+    def __init__(self, path=JOURNAL_FILE, retry_delay=30.0):
+        self.path = path
+        self.retry_delay = retry_delay
+        self.jobs = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.jobs = json.load(f).get("jobs", {})
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": 1, "jobs": self.jobs}, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def entry(self, experiment, name):
+        return self.jobs.get(experiment, {}).get(name)
+
+    # ------------------------------------------------------------------
+    # Transitions
+    # ------------------------------------------------------------------
+
+    def add(self, experiment, name, params, reset=False):
+        """Register a run as pending unless it is already journaled
+
+        A run whose parameters changed since it was journaled, or any run
+        with reset set, starts over. Call save() after adding.
+        """
+        runs = self.jobs.setdefault(experiment, {})
+        entry = runs.get(name)
+        if reset or entry is None or entry["params"] != params:
+            runs[name] = {"state": "pending", "params": params,
+                          "attempts": 0, "exit_code": None}
+
+    def start(self, experiment, names):
+        now = time.time()
+        for name in names:
+            entry = self.jobs[experiment][name]
+            entry.update(state="running", started=now, finished=None)
+        self.save()
+
+    def finish(self, experiment, name, exit_code, elapsed=None):
+        entry = self.jobs[experiment][name]
+        now = time.time()
+        entry.update(state="done" if exit_code == 0 else "failed",
+                     exit_code=exit_code, finished=now,
+                     elapsed=elapsed if elapsed is not None
+                     else now - entry.get("started", now))
+        if exit_code != 0:
+            entry["attempts"] += 1
+            entry["retry_at"] = now + self.backoff(entry["attempts"])
+        self.save()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def backoff(self, attempts):
+        return min(self.retry_delay * 2 ** max(attempts - 1, 0), MAX_BACKOFF)
+
+    def is_done(self, experiment, name, params):
+        entry = self.entry(experiment, name)
+        return bool(entry) and entry["state"] == "done" and \
+            entry["params"] == params
+
+    def retry_wait(self, experiment, names):
+        """Seconds until every failed run among names may be retried"""
+        now = time.time()
+        waits = [self.entry(experiment, name).get("retry_at", now) - now
+                 for name in names
+                 if self.entry(experiment, name)["state"] == "failed"]
+        return max([0.0] + waits)
+
+    def counts(self, experiment=None):
+        counts = {state: 0 for state in STATES}
+        for exp, runs in self.jobs.items():
+            if experiment and exp != experiment:
+                continue
+            for entry in runs.values():
+                counts[entry["state"]] += 1
+        return counts
+
+
+def print_journal(journal, experiment=None):
+    print(f"{'Experiment':22s} {'Run':16s} {'State':8s} {'Tries':>5s} "
+          f"{'Exit':>5s} {'Time s':>8s}")
+    for exp, runs in journal.jobs.items():
+        if experiment and exp != experiment:
+            continue
+        for name, entry in runs.items():
+            exit_code = entry.get("exit_code")
+            elapsed = entry.get("elapsed")
+            print(f"{exp:22s} {name:16s} {entry['state']:8s} "
+                  f"{entry['attempts']:5d} "
+                  f"{'-' if exit_code is None else exit_code:>5} "
+                  f"{'-' if elapsed is None else f'{elapsed:.1f}':>8s}")
+    counts = journal.counts(experiment)
+    print(", ".join(f"{n} {state}" for state, n in counts.items() if n))
+
+
+def main(argv):
+    if not os.path.exists(JOURNAL_FILE):
+        print(f"No journal at {JOURNAL_FILE}")
+        return 1
+    print_journal(JobJournal(), argv[0] if argv else None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,193 @@
+"""
+Live progress for Thoth sweeps
+
+Runs started with run.progress_interval print ThothConfig progress lines
+(simulated ticks, host seconds, partials, coalescing rate). SweepProgress
+keeps the latest line per job and draws a table of the running (and
+failed) jobs under a count of every state.
+On a terminal the table is redrawn in place; in a log file (overnight
+runs) a snapshot is appended every log_every seconds instead. A running
+job that has not reported for stall_seconds is marked STALLED, so a stuck
+simulation shows up long before its timeout.
+"""
+
+import json
+import os
+import sys
+import time
+
+# Must match configs/common/ThothConfig.py
+PROGRESS_PREFIX = "thoth-progress: "
+
+
+def parse_progress(line):
+    """The progress dict of a ThothConfig progress line, else None"""
+    if not line.startswith(PROGRESS_PREFIX):
+        return None
+    try:
+        return json.loads(line[len(PROGRESS_PREFIX):])
+    except ValueError:
+        return None
+
+
+class FileTail:
+    """Complete lines appended to a file since the last call"""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.partial = ""
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def lines(self):
+        try:
+            with open(self.path) as f:
+                f.seek(self.offset)
+                data = f.read()
+                self.offset = f.tell()
+        except OSError:
+            return []
+        data = self.partial + data
+        lines = data.split("\n")
+        self.partial = lines.pop()
+        return lines
+
+
+class SweepProgress:
+    """Per-job progress table for one experiment set"""
+
+    STATES = ("queued", "running", "done", "failed", "skipped")
+
+    def __init__(self, names, title="", stall_seconds=300, refresh=2.0,
+                 log_every=60.0, stream=None):
+        self.title = title
+        self.jobs = {name: {"state": "queued"} for name in names}
+        self.stall_seconds = stall_seconds
+        self.stream = stream or sys.stdout
+        self.tty = self.stream.isatty()
+        self.interval = refresh if self.tty else log_every
+        self.last_draw = 0.0
+        self.drawn = 0
+
+    # ------------------------------------------------------------------
+    # Job events
+    # ------------------------------------------------------------------
+
+    def start(self, name):
+        job = self.jobs[name]
+        if job["state"] == "queued":
+            job.update(state="running", started=time.time(),
+                       updated=time.time())
+
+    def update(self, name, progress):
+        self.start(name)
+        self.jobs[name].update(progress, updated=time.time())
+
+    def finish(self, name, success):
+        self.jobs[name]["state"] = "done" if success else "failed"
+        self.refresh(force=self.tty)
+
+    def requeue(self, name):
+        """Queue a finished job again (a retry)"""
+        job = self.jobs[name]
+        job.clear()
+        job["state"] = "queued"
+
+    def skip(self, name):
+        self.jobs[name]["state"] = "skipped"
+
+    def feed(self, name, line):
+        """Take one output line of job name; returns True if it was progress"""
+        progress = parse_progress(line)
+        if progress is None:
+            return False
+        self.update(name, progress)
+        self.refresh()
+        return True
+
+    # ------------------------------------------------------------------
+    # Display
+    # ------------------------------------------------------------------
+
+    def log(self, *lines):
+        """Print lines without tearing the in-place table"""
+        self._clear()
+        for line in lines:
+            print(line, file=self.stream)
+        if self.tty:
+            self._draw()
+
+    def refresh(self, force=False):
+        if not force and time.time() - self.last_draw < self.interval:
+            return
+        self._clear()
+        self._draw()
+
+    def close(self):
+        """Leave the final table on screen (or in the log)"""
+        self._clear()
+        self._draw()
+        self.drawn = 0
+
+    def _clear(self):
+        if self.tty and self.drawn:
+            # Cursor up over the old table and erase to the end of screen
+            self.stream.write(f"\x1b[{self.drawn}F\x1b[J")
+        self.drawn = 0
+
+    def _draw(self):
+        lines = self.table()
+        self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+        self.drawn = len(lines) if self.tty else 0
+        self.last_draw = time.time()
+
+    def table(self):
+        now = time.time()
+        counts = {state: 0 for state in self.STATES}
+        rows = []
+        for name, job in self.jobs.items():
+            state = job["state"]
+            counts[state] += 1
+            if state == "running" and \
+               now - job["updated"] > self.stall_seconds:
+                state = "STALLED"
+            # Queued and finished jobs only count towards the summary
+            if state in ("running", "STALLED", "failed"):
+                rows.append(self._row(name, job, state, now))
+
+        header = (f"{'Job':18s} {'State':8s} {'Sim ms':>14s} {'Done':>5s} "
+                  f"{'Host s':>7s} {'Sim µs/s':>9s} {'Partials':>9s} "
+                  f"{'Coal.':>6s}")
+        summary = ", ".join(f"{counts[s]} {s}" for s in self.STATES
+                            if counts[s])
+        title = f"⏳ {self.title}: {summary}" if self.title else f"⏳ {summary}"
+        return [title, header] + rows
+
+    @staticmethod
+    def _row(name, job, state, now):
+        ticks = job.get("sim_ticks")
+        limit = job.get("max_ticks")
+        host = job.get("host_seconds")
+        if state in ("running", "STALLED") and "started" in job:
+            host = now - job["started"]
+
+        sim = "-"
+        done = "-"
+        speed = "-"
+        if ticks is not None:
+            sim = f"{ticks / 1e9:.2f}"
+            if limit:
+                sim += f"/{limit / 1e9:.0f}"
+                done = f"{min(ticks / limit, 1.0):.0%}"
+            if job.get("host_seconds"):
+                # Simulated microseconds per host second
+                speed = f"{ticks / 1e6 / job['host_seconds']:.1f}"
+        partials = f"{job['partials']:,}" if "partials" in job else "-"
+        rate = (f"{job['coalescingRate']:.1%}"
+                if "coalescingRate" in job else "-")
+        host = f"{host:.0f}" if host is not None else "-"
+        return (f"{name[:18]:18s} {state:8s} {sim:>14s} {done:>5s} "
+                f"{host:>7s} {speed:>9s} {partials:>9s} {rate:>6s}")
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Directory work queue for running Thoth sweeps on many hosts
+
+Runners (run_experiments.py --queue DIR, run_benchmarks.py --queue DIR)
+submit one job per simulation into a queue directory on a shared
+filesystem. Worker daemons on any number of nodes pull jobs from it and
+run them. Each job is a JSON file that moves between subdirectories:
+
+    pending/   submitted, not yet claimed
+    claimed/   being run; the worker touches the file as a heartbeat
+    done/      result (exit code, host metrics, worker) for the submitter
+
+Claiming is an atomic rename from pending/ to claimed/, so exactly one
+worker wins each job no matter how many race for it. A claim whose
+heartbeat is older than the lease (the worker's node died) is renamed
+back to pending/ by the next idle worker. Workers only run gem5; the
+submitter reads each finished run's stats.txt and records it, so the
+SQLite results store keeps a single writer.
+
+Jobs carry gem5's command line with an absolute --outdir. The queue
+directory and the output directories must therefore be at the same path
+on every node. Start workers from the gem5 root (where build/RISCV/gem5.opt
+and configs/ live):
+
+    ./sweep_queue.py worker /shared/thoth-queue --workers 8
+    ./run_experiments.py --queue /shared/thoth-queue
+    ./sweep_queue.py status /shared/thoth-queue
+
+Several workers on one box see the same directory protocol as workers on
+many nodes, so a local queue exercises the full multi-node path.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+
+from results_store import run_measured
+
+SUBDIRS = ("pending", "claimed", "done")
+
+# A claim not touched for this long belongs to a dead worker
+DEFAULT_LEASE = 600.0
+
+HEARTBEAT_INTERVAL = 30.0
+
+
+class WorkQueue:
+    """A job queue kept as files in a (shared) directory"""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        for sub in SUBDIRS:
+            os.makedirs(os.path.join(self.root, sub), exist_ok=True)
+
+    def path(self, sub, job_id):
+        return os.path.join(self.root, sub, f"{job_id}.json")
+
+    def _write(self, sub, job_id, data):
+        # Write under a dot-name, then rename: readers never see half a file
+        tmp = os.path.join(self.root, sub, f".{job_id}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, self.path(sub, job_id))
+
+    # ------------------------------------------------------------------
+    # Submitter side
+    # ------------------------------------------------------------------
+
+    def submit(self, cmd, outdir, label="", timeout=None, log=None):
+        """Queue one gem5 run; returns its job id
+
+        The worker writes the run's stdout to <outdir>/simout and stderr
+        to <outdir>/simerr, or both to <outdir>/<log> if log is given.
+        """
+        safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in label)
+        # Millisecond prefix: workers take jobs in submission order
+        job_id = f"{int(time.time() * 1000):013d}-{safe}-{uuid.uuid4().hex[:8]}"
+        self._write("pending", job_id, {
+            "id": job_id, "label": label, "cmd": cmd,
+            "outdir": os.path.abspath(outdir), "timeout": timeout,
+            "log": log, "submitted": time.time(),
+        })
+        return job_id
+
+    def collect(self, job_id):
+        """The job's result, removed from the queue, or None if unfinished"""
+        path = self.path("done", job_id)
+        try:
+            with open(path) as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        os.remove(path)
+        return result
+
+    def cancel(self, job_id):
+        """Withdraw a job nobody has claimed yet"""
+        try:
+            os.remove(self.path("pending", job_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def claim(self):
+        """Atomically take the oldest pending job; returns it or None"""
+        pending = os.path.join(self.root, "pending")
+        for name in sorted(os.listdir(pending)):
+            if name.startswith(".") or not name.endswith(".json"):
+                continue
+            job_id = name[:-len(".json")]
+            try:
+                os.rename(self.path("pending", job_id),
+                          self.path("claimed", job_id))
+            except FileNotFoundError:
+                continue    # Another worker got it first
+            with open(self.path("claimed", job_id)) as f:
+                return json.load(f)
+        return None
+
+    def heartbeat(self, job_id):
+        try:
+            os.utime(self.path("claimed", job_id))
+        except FileNotFoundError:
+            pass
+
+    def complete(self, job_id, result):
+        self._write("done", job_id, result)
+        try:
+            os.remove(self.path("claimed", job_id))
+        except FileNotFoundError:
+            pass
+
+    def requeue_stale(self, lease=DEFAULT_LEASE):
+        """Return claims with no heartbeat for lease seconds to pending/"""
+        claimed = os.path.join(self.root, "claimed")
+        now = time.time()
+        requeued = []
+        for name in os.listdir(claimed):
+            if name.startswith(".") or not name.endswith(".json"):
+                continue
+            job_id = name[:-len(".json")]
+            try:
+                if now - os.path.getmtime(self.path("claimed", job_id)) < lease:
+                    continue
+                os.rename(self.path("claimed", job_id),
+                          self.path("pending", job_id))
+                requeued.append(job_id)
+            except FileNotFoundError:
+                pass
+        return requeued
+
+    def counts(self):
+        return {sub: sum(1 for name in os.listdir(os.path.join(self.root, sub))
+                         if name.endswith(".json") and not name.startswith("."))
+                for sub in SUBDIRS}
+
+
+def run_job(queue, job):
+    """Run one claimed job and report its result to the queue"""
+    os.makedirs(job["outdir"], exist_ok=True)
+    out_name = job.get("log") or "simout"
+    last_beat = [time.time()]
+
+    with open(os.path.join(job["outdir"], out_name), "w") as out:
+        def on_line(line):
+            # stdout goes to the shared outdir as it arrives, so the
+            # submitter can tail progress lines like a local run's
+            if line is not None:
+                out.write(line + "\n")
+                out.flush()
+            if time.time() - last_beat[0] >= HEARTBEAT_INTERVAL:
+                queue.heartbeat(job["id"])
+                last_beat[0] = time.time()
+
+        try:
+            exit_code, _, stderr, host = run_measured(
+                job["cmd"], timeout=job.get("timeout"), on_line=on_line)
+        except subprocess.TimeoutExpired:
+            exit_code, stderr, host = None, "timeout\n", {}
+        except OSError as e:
+            exit_code, stderr, host = None, f"{e}\n", {}
+
+    err_name = job.get("log") or "simerr"
+    with open(os.path.join(job["outdir"], err_name),
+              "a" if job.get("log") else "w") as err:
+        err.write(stderr)
+
+    queue.complete(job["id"], {
+        "id": job["id"], "exit_code": exit_code, "host": host,
+        "worker": f"{socket.gethostname()}:{os.getpid()}",
+        "finished": time.time(),
+    })
+    return exit_code
+
+
+def worker_loop(root, lease=DEFAULT_LEASE, poll=2.0, idle_exit=None):
+    """Claim and run jobs until idle for idle_exit seconds (None: forever)"""
+    queue = WorkQueue(root)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    idle_since = time.time()
+    while True:
+        job = queue.claim()
+        if job is None:
+            for job_id in queue.requeue_stale(lease):
+                print(f"♻️  {worker}: requeued stale job {job_id}", flush=True)
+            if idle_exit is not None and time.time() - idle_since >= idle_exit:
+                return
+            time.sleep(poll)
+            continue
+        print(f"▶️  {worker}: {job['label'] or job['id']}", flush=True)
+        exit_code = run_job(queue, job)
+        print(f"{'✅' if exit_code == 0 else '❌'} {worker}: "
+              f"{job['label'] or job['id']} (exit {exit_code})", flush=True)
+        idle_since = time.time()
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Thoth sweep work queue")
+    sub = parser.add_subparsers(dest="command", required=True)
+    worker = sub.add_parser("worker", help="Run jobs from a queue directory")
+    worker.add_argument("queue", help="Queue directory (shared filesystem)")
+    worker.add_argument("--workers", type=int, default=1,
+                        help="Worker processes on this node")
+    worker.add_argument("--lease", type=float, default=DEFAULT_LEASE,
+                        help="Seconds without heartbeat before a claim is requeued")
+    worker.add_argument("--idle-exit", type=float, default=None,
+                        help="Exit after this many seconds with no work")
+    status = sub.add_parser("status", help="Count jobs in each state")
+    status.add_argument("queue", help="Queue directory")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        counts = WorkQueue(args.queue).counts()
+        print(", ".join(f"{n} {state}" for state, n in counts.items()))
+        return 0
+
+    procs = [multiprocessing.Process(target=worker_loop,
+                                     args=(args.queue, args.lease),
+                                     kwargs={"idle_exit": args.idle_exit})
+             for _ in range(max(1, args.workers))]
+    for proc in procs:
+        proc.start()
+    try:
+        for proc in procs:
+            proc.join()
+    except KeyboardInterrupt:
+        for proc in procs:
+            proc.terminate()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))